@@ -1,49 +1,114 @@
-from flask import Flask, request
+from flask import Flask, Response, request
 from werkzeug.middleware.proxy_fix import ProxyFix
-from dotenv import load_dotenv
-import os
-from authlib.integrations.flask_client import OAuth  # Add this import
+from pymongo.errors import PyMongoError
+import threading
+import click
+from config import Config
+
+
+def _ensure_indexes_in_background(database_manager):
+    """
+    Crea los índices requeridos (idempotente) en un hilo aparte, para que el
+    arranque no espere a la base de datos.
+    """
+    def run():
+        try:
+            database_manager.ensure_indexes()
+        except PyMongoError as e:
+            print(f"No se pudieron crear los índices: {e}")
+
+    thread = threading.Thread(target=run, name='ensure-indexes', daemon=True)
+    thread.start()
+    return thread
 
-# Create OAuth object
-oauth = OAuth()
 
 def create_app():
     app = Flask(__name__)
 
-    load_dotenv()
-    
-    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
-    
-    # Configure Auth0
-    oauth.init_app(app)
-    oauth.register(
-        "auth0",
-        client_id=os.getenv("AUTH0_CLIENT_ID"),
-        client_secret=os.getenv("AUTH0_CLIENT_SECRET"),
-        client_kwargs={
-            "scope": "openid profile email",
-            "prompt": "login"
-        },
-        authorize_url=f'https://{os.getenv("AUTH0_DOMAIN")}/authorize',
-        access_token_url=f'https://{os.getenv("AUTH0_DOMAIN")}/oauth/token',
-        server_metadata_url=f'https://{os.getenv("AUTH0_DOMAIN")}/.well-known/openid-configuration'
-    )
-    
+    app.config['SECRET_KEY'] = Config.SECRET_KEY
+
     @app.before_request
     def before_request():
         if request.method == 'POST' and '_method' in request.form:
             request.method = request.form['_method'].upper()
-    
+
+    from database.database_manager import database_manager
+    from app.db_accounting import init_db_accounting
+    from app.sessions import init_sessions
+    init_db_accounting(app, database_manager)
+    init_sessions(app, database_manager)
+    if Config.ENSURE_INDEXES_ON_STARTUP:
+        _ensure_indexes_in_background(database_manager)
+
+    @app.route('/metrics')
+    def metrics():
+        """
+        Métricas del acceso a la base de datos en formato de texto de Prometheus.
+        """
+        return Response(database_manager.render_metrics(), mimetype='text/plain; version=0.0.4')
+
+    @app.cli.command('check-indexes')
+    def check_indexes():
+        """
+        Ejecuta explain() sobre las consultas registradas e informa si alguna hace COLLSCAN
+        u ordena en memoria.
+        """
+        report = database_manager.explain_query_shapes()
+        for entry in report:
+            status = 'COLLSCAN' if entry['collscan'] else 'SORT' if entry['in_memory_sort'] else 'OK'
+            click.echo(f"{status:8} {entry['name']}: {' -> '.join(entry['stages'])}")
+        if any(entry['collscan'] or entry['in_memory_sort'] for entry in report):
+            raise SystemExit(1)
+
+    @app.cli.command('migrate')
+    @click.option('--batch-size', default=500, show_default=True, help='Documentos por lote.')
+    @click.option('--pause', default=0.1, show_default=True, help='Segundos de espera entre lotes.')
+    @click.option('--target', default=None, help='Última versión que se aplica (por defecto, todas).')
+    def migrate(batch_size, pause, target):
+        """
+        Aplica las migraciones de datos pendientes. Se puede interrumpir y volver a lanzar:
+        cada migración continúa desde su último lote guardado.
+        """
+        from database.migrations import MIGRATIONS, MigrationRunner
+        runner = MigrationRunner(database_manager, MIGRATIONS, batch_size=batch_size, pause=pause)
+        try:
+            applied = runner.run(target=target)
+        except RuntimeError as e:
+            click.echo(str(e), err=True)
+            raise SystemExit(1)
+        click.echo(f"Migraciones aplicadas: {', '.join(applied) if applied else 'ninguna'}")
+
+    @app.cli.command('migrate-status')
+    def migrate_status():
+        """
+        Muestra el estado de cada migración de datos.
+        """
+        from database.migrations import MIGRATIONS, MigrationRunner
+        for entry in MigrationRunner(database_manager, MIGRATIONS).status():
+            click.echo(f"{entry['version']} {entry['name']:24} {entry['status']:8} "
+                       f"procesados={entry['processed']} modificados={entry['modified']}")
+
+    @app.cli.command('purge-sessions')
+    @click.option('--user', 'user_email', default=None, help='Cierra todas las sesiones de este usuario.')
+    def purge_sessions(user_email):
+        """
+        Elimina de una vez las sesiones caducadas, o todas las de un usuario.
+        """
+        count = app.session_interface.store.expire(user_email)
+        click.echo(f"Sesiones eliminadas: {count}")
+
     # Importar y registrar rutas
     with app.app_context():
         from app.routes.home import home_bp
         from app.routes.user import user_bp
         from app.routes.tasks import task_bp
         from app.routes.index import index_bp
+        from app.routes.admin import admin_bp
         
         app.register_blueprint(home_bp)
         app.register_blueprint(user_bp)
         app.register_blueprint(task_bp)
         app.register_blueprint(index_bp)
+        app.register_blueprint(admin_bp)
 
-    return app
\ No newline at end of file
+    return app
@@ -0,0 +1,58 @@
+import time
+from flask import g, request
+from config import Config
+from database.request_stats import begin_request_stats, end_request_stats
+
+
+def round_trip_budget(endpoint):
+    """
+    Devuelve el número máximo de llamadas a la base de datos permitido para un endpoint.
+    :param endpoint: Nombre del endpoint de Flask (p. ej. 'task.add_task').
+    :return: Presupuesto, o 0 si el endpoint no tiene límite.
+    """
+    return Config.DB_ROUND_TRIP_BUDGETS.get(endpoint, Config.DB_ROUND_TRIP_BUDGET)
+
+
+def init_db_accounting(app, database_manager):
+    """
+    Contabiliza las llamadas a la base de datos de cada petición: añade los totales en
+    la cabecera Server-Timing, los acumula en las métricas por endpoint y registra un
+    aviso cuando una ruta supera su presupuesto de viajes a la base de datos (N+1).
+    Las llamadas hechas mientras se transmite una respuesta en streaming no se cuentan.
+    :param app: Aplicación Flask.
+    :param database_manager: DatabaseManager cuyas métricas se actualizan.
+    """
+
+    @app.before_request
+    def start_db_accounting():
+        g.db_stats, g.db_stats_token = begin_request_stats()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_db_accounting(response):
+        stats = g.pop('db_stats', None)
+        if stats is None:
+            return response
+        endpoint = request.endpoint or 'unknown'
+        total_ms = (time.perf_counter() - g.pop('request_started')) * 1000
+
+        response.headers.add('Server-Timing', f'db;desc="{stats.calls} calls";dur={stats.duration * 1000:.2f}')
+        response.headers.add('Server-Timing', f'total;dur={total_ms:.2f}')
+
+        database_manager.metrics.request_db_calls.observe((endpoint,), stats.calls)
+        database_manager.metrics.request_db_duration.observe((endpoint,), stats.duration)
+
+        budget = round_trip_budget(endpoint)
+        if budget and stats.calls > budget:
+            operations = ', '.join(f'{key} x{count}' for key, count in sorted(stats.operations.items()))
+            app.logger.warning(
+                f"{request.method} {request.path} ({endpoint}) hizo {stats.calls} llamadas a la base de datos "
+                f"(presupuesto {budget}): {operations}"
+            )
+        return response
+
+    @app.teardown_request
+    def stop_db_accounting(exception=None):
+        token = g.pop('db_stats_token', None)
+        if token is not None:
+            end_request_stats(token)
@@ -0,0 +1,127 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from database.database_manager import database_manager
+from app.logic.etag_logic import bump_tasks_version
+from app.logic.import_logic import VALID_PRIORITIES
+from app.logic.search_logic import task_name_key
+from app.logic.records import priority_rank
+
+# Número máximo de operaciones por lote
+MAX_BATCH_OPERATIONS = 500
+# Acciones admitidas en un lote
+BATCH_ACTIONS = ('edit', 'priority', 'delete')
+
+
+def parse_batch_operation(operation):
+    """
+    Valida una operación del lote.
+    :param operation: Diccionario con 'op' ('edit', 'priority' o 'delete'), 'id' y,
+                      según la acción, 'name' y/o 'priority'.
+    :return: Tupla (id de la tarea, campos a asignar o None si es una eliminación).
+    :raises ValueError: Si la operación no es válida.
+    """
+    if not isinstance(operation, dict):
+        raise ValueError("Cada operación debe ser un objeto JSON.")
+    action = operation.get('op')
+    if action not in BATCH_ACTIONS:
+        raise ValueError(f"Operación no soportada: {action!r}.")
+    try:
+        task_id = ObjectId(operation.get('id'))
+    except (InvalidId, TypeError):
+        raise ValueError("Id de tarea inválido.")
+    if action == 'delete':
+        return task_id, None
+
+    set_data = {}
+    name = operation.get('name')
+    if action == 'edit' and name is not None:
+        if not isinstance(name, str) or not name.strip():
+            raise ValueError("El nombre de la tarea no puede estar vacío.")
+        set_data['name'] = name.strip()
+        set_data['name_key'] = task_name_key(name)
+    priority = operation.get('priority')
+    if action == 'priority' or priority is not None:
+        if not isinstance(priority, str) or priority.strip().lower() not in VALID_PRIORITIES:
+            raise ValueError(f"Prioridad inválida: {priority!r}.")
+        set_data['priority'] = priority.strip().lower()
+        set_data['priority_rank'] = priority_rank(set_data['priority'])
+    if not set_data:
+        raise ValueError("No hay nada que actualizar.")
+    return task_id, set_data
+
+
+def batch_tasks_logic(user_email, operations, ordered=True):
+    """
+    Aplica muchas ediciones, cambios de prioridad y eliminaciones de tareas de un
+    usuario con una consulta (qué tareas le pertenecen) y un único bulk_write.
+    :param user_email: Email del usuario dueño de las tareas.
+    :param operations: Lista de operaciones (ver parse_batch_operation).
+    :param ordered: Si es True, las operaciones se aplican en orden y el lote se detiene
+                    en la primera operación inválida, no encontrada o fallida; las
+                    siguientes quedan como 'skipped'.
+    :return: Diccionario con 'results' (por operación: index, id, status ('ok',
+             'not_found', 'invalid', 'error' o 'skipped') y error si lo hay) y los
+             totales 'matched', 'modified' y 'deleted'.
+    :raises ValueError: Si el lote está vacío o supera MAX_BATCH_OPERATIONS.
+    """
+    if not operations:
+        raise ValueError("El lote no contiene operaciones.")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"El lote admite como máximo {MAX_BATCH_OPERATIONS} operaciones.")
+
+    results = []
+    parsed = []
+    stopped = False
+    for index, operation in enumerate(operations):
+        raw_id = operation.get('id') if isinstance(operation, dict) else None
+        results.append({'index': index, 'id': raw_id if isinstance(raw_id, str) else None, 'status': 'skipped'})
+        if stopped:
+            continue
+        try:
+            parsed.append((index, *parse_batch_operation(operation)))
+        except ValueError as e:
+            results[index].update(status='invalid', error=str(e))
+            stopped = ordered
+
+    # Solo se escriben las tareas del usuario; el resto se informa como no encontradas
+    owned = set()
+    if parsed:
+        owned = {task['_id'] for task in database_manager.select(
+            db_name=None,
+            collection_name='tasks',
+            query={'_id': {'$in': list({task_id for _, task_id, _ in parsed})}, 'user_email': user_email},
+            projection={'_id': 1}
+        )}
+
+    writes, write_indexes = [], []
+    for index, task_id, set_data in parsed:
+        if task_id not in owned:
+            results[index]['status'] = 'not_found'
+            if ordered:
+                break
+            continue
+        query = {'_id': task_id, 'user_email': user_email}
+        if set_data is None:
+            writes.append({'delete_one': {'query': query}})
+        else:
+            writes.append({'update_one': {'query': query, 'update': {'$set': set_data}}})
+        write_indexes.append(index)
+
+    summary = database_manager.bulk_write(
+        db_name=None,
+        collection_name='tasks',
+        operations=writes,
+        ordered=ordered
+    )
+    errors = {error['index']: error['error'] for error in summary['errors']}
+    for position, index in enumerate(write_indexes):
+        if position in errors:
+            results[index].update(status='error', error=errors[position])
+        elif not ordered or not errors or position < min(errors):
+            results[index]['status'] = 'ok'
+
+    if summary['matched'] or summary['deleted']:
+        bump_tasks_version(user_email)
+
+    return {'results': results, 'matched': summary['matched'], 'modified': summary['modified'],
+            'deleted': summary['deleted']}
@@ -0,0 +1,72 @@
+import hashlib
+from flask import request, make_response
+from database.database_manager import database_manager
+
+# Operador que incrementa la versión de las tareas de un usuario; las escrituras lo
+# añaden a la actualización del usuario que ya hacen (sin viajes extra)
+BUMP_TASKS_VERSION = {'$inc': {'tasks_version': 1}}
+
+
+def bump_tasks_version(user_email):
+    """
+    Incrementa la versión de las tareas de un usuario tras modificarlas.
+    :param user_email: Email del usuario.
+    """
+    database_manager.find_and_modify(
+        db_name=None,
+        collection_name='users',
+        query={'email': user_email},
+        update=BUMP_TASKS_VERSION,
+        projection={'_id': 1}
+    )
+
+
+def get_tasks_version(user_email):
+    """
+    Lee la versión de las tareas de un usuario (solo consulta la colección 'users').
+    :param user_email: Email del usuario.
+    :return: Versión (0 si nunca se modificaron), o None si el usuario no existe.
+    """
+    users = list(database_manager.select(
+        db_name=None,
+        collection_name='users',
+        query={'email': user_email},
+        projection={'tasks_version': 1}
+    ))
+    if not users:
+        return None
+    return users[0].get('tasks_version', 0)
+
+
+def tasks_etag(view, user_email, version, *params):
+    """
+    Calcula el ETag fuerte de una vista de tareas de un usuario.
+    :param view: Nombre de la vista ('home', 'tasks'...).
+    :param version: Versión de las tareas del usuario.
+    :param params: Parámetros de la petición que cambian la respuesta (página, límite...).
+    :return: Valor del ETag (sin comillas).
+    """
+    key = '\x1f'.join(str(part) for part in (view, user_email, version, *params))
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def not_modified(etag):
+    """
+    Devuelve una respuesta 304 si el cliente ya tiene la versión `etag`, o None si hay
+    que generar la respuesta.
+    """
+    if etag is None or not request.if_none_match.contains(etag):
+        return None
+    response = make_response('', 304)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag):
+    """
+    Añade el ETag a una respuesta y obliga a revalidarla en cada uso.
+    """
+    response = make_response(response)
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,149 @@
+import csv
+import json
+from bson import ObjectId
+from database.database_manager import database_manager
+from app.logic.etag_logic import BUMP_TASKS_VERSION
+from app.logic.search_logic import task_name_key
+from app.logic.records import priority_rank
+
+# Número de tareas que se escriben por lote
+IMPORT_BATCH_SIZE = 500
+# Número máximo de errores por fila que se devuelven en la respuesta
+MAX_REPORTED_ERRORS = 100
+# Prioridades válidas para una tarea
+VALID_PRIORITIES = ('high', 'medium', 'low')
+
+
+def iter_ndjson_rows(stream):
+    """
+    Lee un cuerpo NDJSON línea a línea sin cargarlo completo en memoria.
+    :param stream: Flujo binario con un objeto JSON por línea.
+    :return: Generador de tuplas (número de línea, fila o None, error o None).
+    """
+    for line_number, raw_line in enumerate(stream, start=1):
+        try:
+            line = raw_line.decode('utf-8').strip()
+        except UnicodeDecodeError:
+            yield line_number, None, "La línea no es UTF-8 válido."
+            continue
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_number, None, "JSON inválido."
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Cada línea debe ser un objeto JSON."
+            continue
+        yield line_number, row, None
+
+
+def iter_csv_rows(stream):
+    """
+    Lee un cuerpo CSV (con cabecera name,priority) fila a fila.
+    :param stream: Flujo binario con el CSV.
+    :return: Generador de tuplas (número de línea, fila o None, error o None).
+    """
+    lines = (raw_line.decode('utf-8', errors='replace') for raw_line in stream)
+    reader = csv.DictReader(lines)
+    try:
+        for row in reader:
+            yield reader.line_num, row, None
+    except csv.Error as e:
+        yield reader.line_num, None, f"CSV inválido: {e}"
+
+
+def validate_task_row(row):
+    """
+    Valida una fila importada y la normaliza.
+    :param row: Diccionario con los campos 'name' y 'priority'.
+    :return: Tupla (nombre, prioridad).
+    :raises ValueError: Si la fila no es válida.
+    """
+    name = row.get('name')
+    priority = row.get('priority')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("El nombre de la tarea es obligatorio.")
+    if not isinstance(priority, str) or priority.strip().lower() not in VALID_PRIORITIES:
+        raise ValueError(f"Prioridad inválida: {priority!r}.")
+    return name.strip(), priority.strip().lower()
+
+
+def import_tasks_logic(user_email, rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Importa tareas de forma incremental, escribiéndolas en lotes.
+    :param user_email: Email del usuario dueño de las tareas.
+    :param rows: Iterable de tuplas (número de línea, fila, error) como las de iter_*_rows.
+    :param batch_size: Número de tareas por lote de escritura.
+    :return: Diccionario con 'inserted', 'failed' y 'errors' (lista de {'line', 'error'}).
+    """
+    user = list(database_manager.select(
+        db_name=None,
+        collection_name='users',
+        query={'email': user_email},
+        projection={'_id': 1}
+    ))
+    if not user:
+        raise ValueError("Usuario no encontrado.")
+    user_id = user[0]['_id']
+
+    summary = {'inserted': 0, 'failed': 0, 'errors': []}
+
+    def add_error(line_number, message):
+        summary['failed'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'line': line_number, 'error': message})
+
+    def flush(batch, line_numbers):
+        result = database_manager.bulk_insert(
+            db_name=None,
+            collection_name='tasks',
+            documents=batch
+        )
+        failed_indexes = set()
+        for error in result['errors']:
+            failed_indexes.add(error['index'])
+            add_error(line_numbers[error['index']], error['error'])
+        summary['inserted'] += result['inserted']
+
+        # Invalidar las ETags del usuario si se insertó alguna tarea
+        if len(failed_indexes) < len(batch):
+            database_manager.find_and_modify(
+                db_name=None,
+                collection_name='users',
+                query={'_id': user_id},
+                update=BUMP_TASKS_VERSION,
+                projection={'_id': 1}
+            )
+
+    batch, line_numbers = [], []
+    for line_number, row, error in rows:
+        if error:
+            add_error(line_number, error)
+            continue
+        try:
+            name, priority = validate_task_row(row)
+        except ValueError as e:
+            add_error(line_number, str(e))
+            continue
+
+        batch.append({
+            '_id': ObjectId(),
+            'name': name,
+            'name_key': task_name_key(name),
+            'priority': priority,
+            'priority_rank': priority_rank(priority),
+            'user_email': user_email,
+            'user_id': user_id
+        })
+        line_numbers.append(line_number)
+
+        if len(batch) >= batch_size:
+            flush(batch, line_numbers)
+            batch, line_numbers = [], []
+
+    if batch:
+        flush(batch, line_numbers)
+
+    return summary
@@ -0,0 +1,62 @@
+import json
+from collections.abc import Mapping
+from datetime import datetime
+from bson import ObjectId
+
+# Tipos de contenido soportados para las respuestas en streaming
+NDJSON_MIMETYPE = 'application/x-ndjson'
+JSON_MIMETYPE = 'application/json'
+
+
+class MongoJSONEncoder(json.JSONEncoder):
+    """
+    Codificador JSON que entiende los tipos de BSON: ObjectId, fechas y
+    documentos RawBSONDocument (que se decodifican al recorrerlos).
+    """
+
+    def default(self, o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        if isinstance(o, datetime):
+            return o.isoformat()
+        if isinstance(o, Mapping):
+            return dict(o.items())
+        return super().default(o)
+
+
+_encoder = MongoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_document(document):
+    """
+    Serializa un documento a JSON.
+    :param document: Documento (dict o RawBSONDocument).
+    :return: Cadena JSON.
+    """
+    return _encoder.encode(document)
+
+
+def iter_ndjson(documents):
+    """
+    Serializa los documentos uno a uno como NDJSON, a medida que llegan del cursor.
+    :param documents: Iterable de documentos.
+    :return: Generador de líneas JSON terminadas en salto de línea.
+    """
+    for document in documents:
+        yield encode_document(document) + '\n'
+
+
+def iter_json_array(documents):
+    """
+    Serializa los documentos como un único array JSON sin construirlo en memoria.
+    :param documents: Iterable de documentos.
+    :return: Generador de fragmentos del array JSON.
+    """
+    yield '['
+    first = True
+    for document in documents:
+        if not first:
+            yield ','
+        first = False
+        yield encode_document(document)
+    yield ']'
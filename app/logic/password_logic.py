@@ -0,0 +1,103 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+from config import Config
+
+# Método y coste del hash (formato de werkzeug), p. ej. 'scrypt:32768:8:1' o 'pbkdf2:sha256:600000'
+PASSWORD_HASH_METHOD = Config.PASSWORD_HASH_METHOD
+# Procesos dedicados a calcular hashes (0 = calcular en el hilo de la petición)
+PASSWORD_HASH_WORKERS = Config.PASSWORD_HASH_WORKERS
+# Número máximo de hashes pendientes antes de bloquear a quien llama
+PASSWORD_HASH_MAX_PENDING = Config.PASSWORD_HASH_MAX_PENDING
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_pool():
+    """
+    Devuelve el pool de procesos, creándolo en el primer uso y de nuevo
+    tras un fork (un pool heredado del proceso padre no es utilizable).
+    """
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def _reset_pool():
+    """
+    Descarta el pool actual (por ejemplo, si un proceso hijo murió).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = None
+
+
+def _run(function, *args):
+    """
+    Ejecuta una función de hash en el pool de procesos, con un número acotado de
+    tareas pendientes. Si el pool está desactivado o roto, se ejecuta en el hilo actual.
+    """
+    if PASSWORD_HASH_WORKERS <= 0:
+        return function(*args)
+    with _pending:
+        try:
+            return _get_pool().submit(function, *args).result()
+        except BrokenProcessPool:
+            _reset_pool()
+            return function(*args)
+
+
+def hash_password(password, method=None):
+    """
+    Calcula el hash de una contraseña fuera del hilo de la petición.
+    :param password: Contraseña en texto plano.
+    :param method: Método y coste del hash (por defecto PASSWORD_HASH_METHOD).
+    :return: Hash en el formato de werkzeug.
+    """
+    return _run(generate_password_hash, password, method or PASSWORD_HASH_METHOD)
+
+
+def verify_password(stored_hash, password):
+    """
+    Verifica una contraseña contra su hash fuera del hilo de la petición.
+    :param stored_hash: Hash almacenado.
+    :param password: Contraseña en texto plano.
+    :return: True si la contraseña coincide, False en caso contrario.
+    """
+    return _run(check_password_hash, stored_hash, password)
+
+
+def full_hash_method(method):
+    """
+    Completa un método de hash con los parámetros por defecto de werkzeug, tal como
+    aparecen en el hash generado (p. ej. 'pbkdf2' -> 'pbkdf2:sha256:600000',
+    'scrypt' -> 'scrypt:32768:8:1').
+    :param method: Método en el formato de werkzeug, con o sin parámetros.
+    :return: Método con todos sus parámetros.
+    """
+    algorithm, *args = method.split(':')
+    if algorithm == 'scrypt' and not args:
+        args = [str(2 ** 15), '8', '1']
+    elif algorithm == 'pbkdf2' and len(args) < 2:
+        args = [args[0] if args else 'sha256', str(DEFAULT_PBKDF2_ITERATIONS)]
+    return ':'.join([algorithm, *args])
+
+
+def needs_rehash(stored_hash, method=None):
+    """
+    Indica si un hash se generó con un método o coste distinto del configurado.
+    :param stored_hash: Hash almacenado.
+    :param method: Método y coste esperados (por defecto PASSWORD_HASH_METHOD).
+    :return: True si el hash debe regenerarse.
+    """
+    return stored_hash.split('$', 1)[0] != full_hash_method(method or PASSWORD_HASH_METHOD)
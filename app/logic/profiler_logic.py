@@ -0,0 +1,118 @@
+import sys
+import threading
+import time
+
+# Límites del muestreo bajo demanda
+MAX_PROFILE_SECONDS = 60
+MIN_INTERVAL_MS = 1
+# Fracción máxima del tiempo que el muestreador puede ocupar un hilo
+MAX_OVERHEAD = 0.02
+
+# Solo se permite un perfilado simultáneo por proceso
+_profile_lock = threading.Lock()
+
+
+def _frame_label(frame):
+    """
+    Nombre de una función en una pila colapsada ('modulo:funcion').
+    """
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{frame.f_code.co_name}'.replace(';', ':')
+
+
+class StackSampler:
+    """
+    Muestreador estadístico de pilas: cada `interval` segundos captura la pila de
+    todos los hilos del proceso con sys._current_frames() y acumula las pilas en
+    formato colapsado ('hilo;modulo:funcion;...' -> número de muestras), que leen
+    directamente flamegraph.pl, speedscope o inferno.
+
+    Si una muestra cuesta más de lo previsto, el intervalo se alarga para que el
+    muestreo no ocupe más de MAX_OVERHEAD del tiempo.
+    """
+
+    def __init__(self, interval: float = 0.01, max_overhead: float = MAX_OVERHEAD):
+        """
+        Constructor de la clase.
+        :param interval: Segundos entre muestras.
+        :param max_overhead: Fracción máxima del tiempo dedicada a tomar muestras.
+        """
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.stacks = {}
+        self.samples = 0
+        self.sampling_time = 0.0
+        self.elapsed = 0.0
+
+    def sample(self, ignore_thread: int = None):
+        """
+        Toma una muestra de la pila de cada hilo.
+        :param ignore_thread: Identificador del hilo que no debe muestrearse (el propio muestreador).
+        """
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == ignore_thread:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, f'thread-{thread_id}').replace(';', ':'))
+            stack = ';'.join(reversed(labels))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+
+    def run(self, seconds: float):
+        """
+        Muestrea durante `seconds` segundos en el hilo actual.
+        """
+        current = threading.get_ident()
+        start = time.perf_counter()
+        deadline = start + seconds
+        while True:
+            sample_start = time.perf_counter()
+            if sample_start >= deadline:
+                break
+            self.sample(ignore_thread=current)
+            cost = time.perf_counter() - sample_start
+            self.sampling_time += cost
+            # La pausa nunca se alarga más allá del final del muestreo
+            pause = max(self.interval, cost / self.max_overhead - cost)
+            time.sleep(max(0.0, min(pause, deadline - time.perf_counter())))
+        self.elapsed = time.perf_counter() - start
+
+    @property
+    def overhead(self) -> float:
+        """
+        Fracción del tiempo de muestreo dedicada a tomar muestras.
+        """
+        return self.sampling_time / self.elapsed if self.elapsed else 0.0
+
+    def collapsed(self) -> str:
+        """
+        Devuelve las pilas acumuladas en formato colapsado, una por línea.
+        """
+        return ''.join(f'{stack} {count}\n' for stack, count in sorted(self.stacks.items()))
+
+
+def profile_logic(seconds: float, interval_ms: float) -> StackSampler:
+    """
+    Perfila todos los hilos del proceso durante un tiempo acotado.
+    :param seconds: Duración del muestreo (como máximo MAX_PROFILE_SECONDS).
+    :param interval_ms: Milisegundos entre muestras (entre MIN_INTERVAL_MS y la duración).
+    :return: StackSampler con las pilas acumuladas.
+    :raises ValueError: Si los parámetros están fuera de rango.
+    :raises RuntimeError: Si ya hay un perfilado en curso en este proceso.
+    """
+    if not 0 < seconds <= MAX_PROFILE_SECONDS:
+        raise ValueError(f"La duración debe estar entre 0 y {MAX_PROFILE_SECONDS} segundos.")
+    if not MIN_INTERVAL_MS <= interval_ms <= seconds * 1000:
+        raise ValueError(f"El intervalo debe estar entre {MIN_INTERVAL_MS} ms y la duración del muestreo.")
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("Ya hay un perfilado en curso en este proceso.")
+    try:
+        sampler = StackSampler(interval=interval_ms / 1000)
+        sampler.run(seconds)
+        return sampler
+    finally:
+        _profile_lock.release()
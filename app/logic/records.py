@@ -0,0 +1,104 @@
+# Orden de urgencia de cada prioridad (menor = más urgente), guardado en `priority_rank`
+# para que la base de datos pueda ordenar por prioridad
+PRIORITY_RANKS = {'high': 0, 'medium': 1, 'low': 2}
+# Rango de las prioridades desconocidas: detrás de todas las demás
+UNKNOWN_PRIORITY_RANK = len(PRIORITY_RANKS)
+
+
+def priority_rank(priority):
+    """
+    Rango numérico de una prioridad ('high', 'medium' o 'low', sin distinguir mayúsculas).
+    :param priority: Prioridad de la tarea.
+    :return: Rango (0 es la más urgente).
+    """
+    if not isinstance(priority, str):
+        return UNKNOWN_PRIORITY_RANK
+    return PRIORITY_RANKS.get(priority.strip().lower(), UNKNOWN_PRIORITY_RANK)
+
+
+class Task:
+    """
+    Tarea decodificada de la colección 'tasks'. Usa __slots__ para no reservar un
+    diccionario por instancia; los campos que no se pidieron en la proyección
+    quedan a None.
+    """
+
+    __slots__ = ('id', 'name', 'priority', 'user_email', 'user_id', 'priority_rank')
+
+    # Proyección con todos los campos del registro
+    FIELDS = {'name': 1, 'priority': 1, 'user_email': 1, 'user_id': 1, 'priority_rank': 1}
+    # Proyección mínima para mostrar una tarea en una lista
+    LIST_FIELDS = {'name': 1, 'priority': 1}
+
+    def __init__(self, id, name=None, priority=None, user_email=None, user_id=None, priority_rank=None):
+        self.id = id
+        self.name = name
+        self.priority = priority
+        self.user_email = user_email
+        self.user_id = user_id
+        self.priority_rank = priority_rank
+
+    @classmethod
+    def from_document(cls, document):
+        """
+        Construye la tarea a partir de un documento de la base de datos.
+        :param document: Documento (completo o proyectado).
+        :return: Instancia de Task.
+        """
+        return cls(document.get('_id'), document.get('name'), document.get('priority'),
+                   document.get('user_email'), document.get('user_id'), document.get('priority_rank'))
+
+    def to_dict(self) -> dict:
+        """
+        Representación serializable a JSON, con los ids como cadenas y solo los campos cargados.
+        """
+        data = {'_id': str(self.id)}
+        for field in ('name', 'priority', 'priority_rank', 'user_email'):
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        if self.user_id is not None:
+            data['user_id'] = str(self.user_id)
+        return data
+
+    def __eq__(self, other):
+        if not isinstance(other, Task):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f'Task(id={self.id!r}, name={self.name!r}, priority={self.priority!r})'
+
+
+class User:
+    """
+    Usuario decodificado de la colección 'users'. No incluye la lista `tasks`,
+    que crece con cada tarea y nunca se necesita al leer el usuario.
+    """
+
+    __slots__ = ('id', 'email', 'password')
+
+    # Proyección con todos los campos del registro
+    FIELDS = {'email': 1, 'password': 1}
+
+    def __init__(self, id, email=None, password=None):
+        self.id = id
+        self.email = email
+        self.password = password
+
+    @classmethod
+    def from_document(cls, document):
+        """
+        Construye el usuario a partir de un documento de la base de datos.
+        :param document: Documento (completo o proyectado).
+        :return: Instancia de User.
+        """
+        return cls(document.get('_id'), document.get('email'), document.get('password'))
+
+    def __eq__(self, other):
+        if not isinstance(other, User):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    def __repr__(self):
+        return f'User(id={self.id!r}, email={self.email!r})'
@@ -0,0 +1,81 @@
+from database.database_manager import database_manager
+from app.logic.records import Task
+
+# Número de resultados por defecto y máximo de una búsqueda
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Límite superior del rango de un prefijo: mayor que cualquier carácter que lo continúe
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def task_name_key(name):
+    """
+    Forma normalizada del nombre de una tarea que se guarda en `name_key` para el
+    autocompletado: en minúsculas y con los espacios colapsados.
+    :param name: Nombre de la tarea.
+    :return: Clave normalizada.
+    """
+    return ' '.join(name.lower().split())
+
+
+def _parse_limit(limit):
+    """
+    Valida el número de resultados pedido.
+    :raises ValueError: Si no es un entero positivo.
+    """
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("Número de resultados inválido.")
+    if limit < 1:
+        raise ValueError("Número de resultados inválido.")
+    return min(limit, MAX_SEARCH_LIMIT)
+
+
+def search_tasks(user_email, text, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Busca las tareas de un usuario que contienen alguna de las palabras de `text`,
+    con el índice de texto (user_email, name), en un único viaje a la base de datos.
+    :param user_email: Email del usuario.
+    :param text: Palabras a buscar.
+    :param limit: Número máximo de resultados (como mucho MAX_SEARCH_LIMIT).
+    :return: Lista de tuplas (Task, relevancia), de más a menos relevante.
+    :raises ValueError: Si la búsqueda está vacía o el límite no es válido.
+    """
+    limit = _parse_limit(limit)
+    if not text or not text.strip():
+        raise ValueError("La búsqueda no puede estar vacía.")
+    documents = database_manager.text_search(
+        db_name=None,
+        collection_name='tasks',
+        query={'user_email': user_email},
+        text=text,
+        projection=Task.LIST_FIELDS,
+        limit=limit
+    )
+    return [(Task.from_document(document), document['score']) for document in documents]
+
+
+def autocomplete_tasks(user_email, prefix, limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Tareas de un usuario cuyo nombre empieza por `prefix` (sin distinguir mayúsculas),
+    en orden alfabético: un rango sobre el índice (user_email, name_key).
+    :param user_email: Email del usuario.
+    :param prefix: Texto escrito hasta el momento.
+    :param limit: Número máximo de resultados (como mucho MAX_SEARCH_LIMIT).
+    :return: Lista de Task.
+    :raises ValueError: Si el prefijo está vacío o el límite no es válido.
+    """
+    limit = _parse_limit(limit)
+    key = task_name_key(prefix or '')
+    if not key:
+        raise ValueError("El prefijo no puede estar vacío.")
+    documents = database_manager.select(
+        db_name=None,
+        collection_name='tasks',
+        query={'user_email': user_email, 'name_key': {'$gte': key, '$lt': key + PREFIX_UPPER_BOUND}},
+        projection=Task.LIST_FIELDS,
+        limit=limit,
+        sort=[('name_key', 1)]
+    )
+    return [Task.from_document(document) for document in documents]
@@ -1,30 +1,52 @@
 import uuid
 from database.database_manager import database_manager
 from bson import ObjectId
+from bson.errors import InvalidId
+from app.logic.records import Task, priority_rank
+from app.logic.etag_logic import BUMP_TASKS_VERSION
+from app.logic.search_logic import task_name_key
+
+# Tamaño de página por defecto y máximo para los listados de tareas
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Número de tareas por defecto y máximo de get_top_tasks
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 100
+# Orden por urgencia: se sirve del índice (user_email, priority_rank, _id)
+PRIORITY_SORT = [('priority_rank', 1), ('_id', 1)]
 
 def add_task_logic(user_email, task_name, task_priority):
     """
     Lógica para agregar una tarea asociada a un usuario.
+    La versión de tareas del usuario (para las ETags) se incrementa después de insertar,
+    como al editar o eliminar: si se incrementara antes, un /home simultáneo podría
+    guardar una ETag de la versión nueva con el contenido sin la tarea. Las tareas se
+    localizan por `user_email`, así que no se guarda ninguna lista en el usuario.
     """
-    # Buscar al usuario por su email
-    user = database_manager.select(
+    task_id = ObjectId()
+
+    # Buscar al usuario por su email (solo se necesita su _id)
+    users = list(database_manager.select(
         db_name=None,
         collection_name='users',
-        query={'email': user_email}
-    )
-    user_list = list(user)
+        query={'email': user_email},
+        projection={'_id': 1},
+        limit=1
+    ))
 
-    if not user_list:
+    if not users:
         raise ValueError("Usuario no encontrado.")
-
-    user_id = user_list[0]['_id']
+    user_id = ObjectId(users[0]['_id'])
 
     # Crear un diccionario con los datos de la tarea, incluyendo el user_email
     task_data = {
+        '_id': task_id,
         'name': task_name,
+        'name_key': task_name_key(task_name),  # Nombre normalizado para el autocompletado
         'priority': task_priority,
+        'priority_rank': priority_rank(task_priority),  # Rango numérico para ordenar por prioridad
         'user_email': user_email,  # Agrega el campo user_email aquí
-        'user_id': ObjectId(user_id)  # Asociamos la tarea al usuario
+        'user_id': user_id  # Asociamos la tarea al usuario
     }
 
     # Insertar la tarea en la base de datos
@@ -34,16 +56,13 @@ def add_task_logic(user_email, task_name, task_priority):
         data=task_data
     )
 
-    # Actualizamos la lista de tareas del usuario
-    user_tasks = user_list[0].get('tasks', [])
-    user_tasks.append(ObjectId(inserted_id))
-
-    # Actualizar el usuario con la nueva tarea
-    database_manager.update(
+    # Invalidar las ETags del usuario ahora que la tarea ya es visible
+    database_manager.find_and_modify(
         db_name=None,
         collection_name='users',
-        query={'_id': ObjectId(user_id)},
-        update_data={'tasks': user_tasks}
+        query={'_id': user_id},
+        update=BUMP_TASKS_VERSION,
+        projection={'_id': 1}
     )
 
     return inserted_id
@@ -55,14 +74,15 @@ def get_task_by_name(user_email, task_name):
     Busca una tarea en la colección 'tasks' por su nombre y asociada a un usuario.
     :param user_email: Email del usuario.
     :param task_name: Nombre de la tarea.
-    :return: Documento de la tarea si se encuentra, None en caso contrario.
+    :return: Tarea (Task) si se encuentra, None en caso contrario.
     """
     try:
-        # Buscar al usuario por su email
+        # Buscar al usuario por su email (solo se necesita su _id)
         user = database_manager.select(
             db_name=None,
             collection_name='users',
-            query={'email': user_email}
+            query={'email': user_email},
+            projection={'_id': 1}
         )
         user_list = list(user)
 
@@ -75,13 +95,14 @@ def get_task_by_name(user_email, task_name):
         task = database_manager.select(
             db_name=None,
             collection_name='tasks',
-            query={'name': task_name, 'user_id': ObjectId(user_id)}
+            query={'name': task_name, 'user_id': ObjectId(user_id)},
+            projection=Task.FIELDS
         )
         task_list = list(task)
 
         if not task_list:
             return None
-        return task_list[0]
+        return Task.from_document(task_list[0])
     except Exception as e:
         print(f"Error al obtener la tarea: {e}")
         raise
@@ -99,8 +120,10 @@ def update_task(task_id, new_name=None, new_priority=None):
         update_data = {}
         if new_name:
             update_data['name'] = new_name
+            update_data['name_key'] = task_name_key(new_name)
         if new_priority:
             update_data['priority'] = new_priority
+            update_data['priority_rank'] = priority_rank(new_priority)
 
         if not update_data:
             return False  # No hay nada que actualizar
@@ -114,4 +137,125 @@ def update_task(task_id, new_name=None, new_priority=None):
         return update_result > 0
     except Exception as e:
         print(f"Error al actualizar la tarea: {e}")
-        raise
\ No newline at end of file
+        raise
+
+
+def _parse_after(after):
+    """
+    Convierte el cursor de paginación recibido en un ObjectId.
+    :raises ValueError: Si el cursor no es un ObjectId válido.
+    """
+    if after is None:
+        return None
+    try:
+        return ObjectId(after)
+    except (InvalidId, TypeError):
+        raise ValueError("Cursor de paginación inválido.")
+
+
+def _parse_priority_after(after):
+    """
+    Convierte el cursor de paginación por prioridad ('<rango>:<_id>') en una condición
+    de keyset sobre (priority_rank, _id).
+    :raises ValueError: Si el cursor no es válido.
+    """
+    rank, _, task_id = after.partition(':')
+    try:
+        rank = int(rank)
+    except ValueError:
+        raise ValueError("Cursor de paginación inválido.")
+    task_id = _parse_after(task_id)
+    return {'$or': [{'priority_rank': {'$gt': rank}}, {'priority_rank': rank, '_id': {'$gt': task_id}}]}
+
+
+def get_tasks_page(user_email=None, limit=DEFAULT_PAGE_SIZE, after=None, projection=Task.LIST_FIELDS, order='id'):
+    """
+    Obtiene una página de tareas usando paginación por keyset.
+    :param user_email: Email del usuario (si es None, lista todas las tareas).
+    :param limit: Número de tareas por página (se acota a MAX_PAGE_SIZE).
+    :param after: Cursor devuelto con la página anterior (opcional).
+    :param projection: Campos a cargar (por defecto, los necesarios para listar).
+    :param order: 'id' (orden de creación) o 'priority' (más urgentes primero; requiere
+                  user_email para usar el índice (user_email, priority_rank, _id)).
+    :return: Tupla (lista de Task, next_after); next_after es None si no hay más páginas.
+    """
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("Tamaño de página inválido.")
+    if limit < 1:
+        raise ValueError("Tamaño de página inválido.")
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    query = {'user_email': user_email} if user_email is not None else {}
+    if order == 'priority':
+        # El cursor necesita el rango de la última tarea; el orden lo da el índice
+        if after is not None:
+            query = {**query, **_parse_priority_after(after)}
+        select_kwargs = {'projection': {**projection, 'priority_rank': 1}, 'sort': PRIORITY_SORT}
+    else:
+        select_kwargs = {'projection': projection, 'after': _parse_after(after)}
+
+    # Pedimos un documento extra para saber si existe una página siguiente
+    tasks = list(database_manager.select(
+        db_name=None,
+        collection_name='tasks',
+        query=query,
+        limit=limit + 1,
+        **select_kwargs
+    ))
+
+    next_after = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        next_after = str(tasks[-1]['_id'])
+        if order == 'priority':
+            next_after = f"{tasks[-1]['priority_rank']}:{next_after}"
+    return [Task.from_document(task) for task in tasks], next_after
+
+
+def get_top_tasks(user_email, k=DEFAULT_TOP_K):
+    """
+    Devuelve las `k` tareas más urgentes de un usuario. El índice
+    (user_email, priority_rank, _id) ya está en ese orden, así que la consulta lee
+    exactamente `k` entradas y no ordena en memoria.
+    :param user_email: Email del usuario.
+    :param k: Número de tareas (se acota a MAX_TOP_K).
+    :return: Lista de Task, de la más urgente a la menos.
+    :raises ValueError: Si `k` no es un entero positivo.
+    """
+    try:
+        k = int(k)
+    except (TypeError, ValueError):
+        raise ValueError("Número de tareas inválido.")
+    if k < 1:
+        raise ValueError("Número de tareas inválido.")
+    tasks = database_manager.select(
+        db_name=None,
+        collection_name='tasks',
+        query={'user_email': user_email},
+        projection={**Task.LIST_FIELDS, 'priority_rank': 1},
+        limit=min(k, MAX_TOP_K),
+        sort=PRIORITY_SORT
+    )
+    return [Task.from_document(task) for task in tasks]
+
+
+def iter_tasks(user_email, after=None):
+    """
+    Devuelve un cursor sobre las tareas de un usuario con documentos RawBSONDocument,
+    pensado para serializarlas en streaming sin decodificarlas ni acumularlas en memoria.
+    :param user_email: Email del usuario.
+    :param after: `_id` de la última tarea ya recibida (opcional).
+    :return: Cursor de pymongo ordenado por `_id`.
+    """
+    after = _parse_after(after)
+
+    return database_manager.select(
+        db_name=None,
+        collection_name='tasks',
+        query={'user_email': user_email},
+        projection=Task.FIELDS,
+        after=after,
+        raw=True
+    )
@@ -1,49 +1,61 @@
+from datetime import datetime, timezone
+from pymongo.errors import DuplicateKeyError
 from database.database_manager import database_manager
-from werkzeug.security import generate_password_hash, check_password_hash
+from database.write_behind import write_behind
+from app.logic.password_logic import hash_password, verify_password, needs_rehash
 from flask import url_for, session, redirect
-import os
-from app import oauth  # Asegúrate de importar oauth desde la configuración de app
+from app.oidc import get_oidc_client, OIDCError
+from app.sessions import regenerate_session
+from config import Config
+from app.logic.records import User
+
+# Claims del ID token que se guardan en la sesión como datos del usuario
+USERINFO_CLAIMS = ('sub', 'email', 'email_verified', 'name', 'nickname', 'picture')
 
 def register_user_logic(email_user, password_user=None):
     """
-    Lógica para registrar un nuevo usuario.
+    Lógica para registrar un nuevo usuario. Es un único upsert sobre el índice único de
+    `email`: si el usuario ya existe no se modifica, y dos registros simultáneos del
+    mismo email (p. ej. el primer inicio de sesión con Auth0 en dos pestañas) crean un
+    solo usuario.
+    :return: True si se ha creado el usuario, False si ya existía.
     """
-    # Check if user already exists
-    existing_user = database_manager.select(
-        db_name=None,
-        collection_name='users',
-        query={'email': email_user}
-    )
-    
-    if list(existing_user):
-        return  # User already exists, no need to register again
-        
-    if password_user:
-        hashed_password = generate_password_hash(password_user)
-    else:
-        hashed_password = None
-
-    user_data = {
-        'email': email_user,
-        'password': hashed_password,
-        'tasks': []
-    }
+    hashed_password = hash_password(password_user) if password_user else None
+    try:
+        created_id = database_manager.upsert(
+            db_name=None,
+            collection_name='users',
+            query={'email': email_user},
+            update={'$setOnInsert': {'password': hashed_password}}
+        )
+    except DuplicateKeyError:
+        # Otro proceso lo creó entre la búsqueda y la inserción del upsert
+        return False
+    return created_id is not None
 
-    database_manager.insert(
+def record_login_logic(email_user):
+    """
+    Guarda la fecha del último inicio de sesión del usuario. No es crítica: se encola
+    en la escritura diferida y la respuesta no espera a la base de datos. Varios
+    inicios de sesión seguidos del mismo usuario se combinan en una sola escritura.
+    """
+    write_behind.update(
         db_name=None,
         collection_name='users',
-        data=user_data
+        query={'email': email_user},
+        update={'$set': {'last_login': datetime.now(timezone.utc)}}
     )
 
 def login_user_logic(email_user, password_user):
     """
     Lógica para verificar las credenciales del usuario.
     """
-    # Buscar al usuario por su email
+    # Buscar al usuario por su email (solo se necesita el hash de la contraseña)
     user = database_manager.select(
         db_name=None,
         collection_name='users',
-        query={'email': email_user}
+        query={'email': email_user},
+        projection={'password': 1}
     )
     user_list = list(user)
 
@@ -52,52 +64,52 @@ def login_user_logic(email_user, password_user):
         return False
 
     # Obtener el hash de la contraseña almacenada
-    stored_password_hash = user_list[0]['password']
+    user = User.from_document(user_list[0])
+    stored_password_hash = user.password
 
     # Si no hay contraseña, retorna False
     if stored_password_hash is None:
         return False
 
     # Verificar si la contraseña está correctamente hasheada y coincide con la ingresada
-    return check_password_hash(stored_password_hash, password_user)
-
-def auth_callback_logic(session):
-    """
-    Lógica para manejar el callback de autenticación de Auth0.
-    """
-    try:
-        # Verificar si el usuario ya está autenticado
-        if 'user' in session:
-            return {'message': 'Ya estás autenticado.', 'status': 'success', 'redirect_url': url_for('home.home')}
-
-        # Obtener el token de Auth0
-        token = oauth.authorize_access_token()
-        if not token:
-            return {'message': 'No se pudo obtener el token de Auth0.', 'status': 'error', 'redirect_url': url_for('user.auth_callback')}
-
-        # Obtener la información del usuario
-        user_info = oauth.parse_id_token(token)
-        if not user_info:
-            return {'message': 'Error al procesar el token del usuario.', 'status': 'error', 'redirect_url': url_for('user.auth_callback')}
+    if not verify_password(stored_password_hash, password_user):
+        return False
 
-        # Buscar al usuario por su correo electrónico en la base de datos
-        user = database_manager.select(
+    # Si el hash usa parámetros antiguos, regenerarlo con los actuales
+    if needs_rehash(stored_password_hash):
+        database_manager.update(
             db_name=None,
             collection_name='users',
-            query={'email': user_info['email']}
+            query={'_id': user.id},
+            update_data={'password': hash_password(password_user)}
         )
-        user_list = list(user)
-
-        if not user_list:
-            # Si el usuario no existe en la base de datos, registrarlo
-            register_user_logic(user_info['email'])
 
-        # Guardar la información del usuario en la sesión
-        session['user'] = user_info
-        return {'message': 'Inicio de sesión exitoso.', 'status': 'success', 'redirect_url': url_for('home.home')}
+    return True
 
-    except Exception as e:
-        return {'message': f'Error: {str(e)}', 'status': 'error', 'redirect_url': url_for('user.auth_callback')}
+def oidc_user_info(pending, args):
+    """
+    Completa el inicio de sesión OIDC: comprueba `state`, canjea el código y verifica
+    el ID token en local.
+    :param pending: Diccionario {'state', 'nonce'} guardado en la sesión al redirigir.
+    :param args: Parámetros del callback (code, state, error...).
+    :return: Diccionario con los claims USERINFO_CLAIMS presentes en el ID token.
+    :raises OIDCError: Si el proveedor devolvió un error o la respuesta no es válida.
+    """
+    if args.get('error'):
+        raise OIDCError(args.get('error_description') or args['error'])
+    if not pending or not args.get('state') or args['state'] != pending.get('state'):
+        raise OIDCError("El parámetro state no coincide con el inicio de sesión.")
+    if not args.get('code'):
+        raise OIDCError("Falta el código de autorización.")
+    client = get_oidc_client()
+    redirect_uri = url_for('user.auth_callback', _external=True)
+    token = client.exchange_code(args['code'], redirect_uri)
+    if 'id_token' not in token:
+        raise OIDCError("La respuesta del proveedor no incluye un ID token.")
+    claims = client.verify_id_token(token['id_token'], pending['nonce'], token.get('access_token'))
+    if not claims.get('email'):
+        raise OIDCError("El ID token no incluye el email del usuario.")
+    return {claim: claims[claim] for claim in USERINFO_CLAIMS if claim in claims}
 
 def logout_user_logic(session):
     """
@@ -105,9 +117,10 @@ def logout_user_logic(session):
     """
     # Eliminar solo la información relevante de la sesión
     session.clear()  # Limpiar toda la sesión
+    regenerate_session(session)
 
     return {
         'message': 'Has cerrado sesión.',
         'status': 'success',
-        'redirect_url': f'https://{os.getenv("AUTH0_DOMAIN")}/v2/logout?client_id={os.getenv("AUTH0_CLIENT_ID")}&returnTo={url_for("home.home", _external=True)}'
+        'redirect_url': f'https://{Config.AUTH0_DOMAIN}/v2/logout?client_id={Config.AUTH0_CLIENT_ID}&returnTo={url_for("home.home", _external=True)}'
     }
\ No newline at end of file
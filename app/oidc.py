@@ -0,0 +1,357 @@
+import hashlib
+import json
+import os
+import stat
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+from config import Config
+
+# Ruta del documento de descubrimiento OIDC, relativa al emisor
+DISCOVERY_PATH = '.well-known/openid-configuration'
+
+# Algoritmos aceptados en la firma del ID token (Auth0 firma con RS256). Fijarlos evita
+# que un token firmado con HS256 y la clave pública como secreto se dé por válido
+ID_TOKEN_ALGORITHMS = ['RS256']
+
+# Segundos mínimos entre dos descargas del JWKS provocadas por un `kid` desconocido
+JWKS_MIN_REFRESH_INTERVAL = 60
+
+# Campos del descubrimiento que deben apuntar al mismo origen que el emisor
+ENDPOINT_FIELDS = ('authorization_endpoint', 'token_endpoint', 'jwks_uri')
+
+# Protege la creación perezosa del cliente OIDC
+_oidc_lock = threading.Lock()
+
+
+class OIDCError(Exception):
+    """
+    Error al hablar con el proveedor OIDC o al verificar un ID token.
+    """
+
+
+def create_http_session(pool_size: int = 10):
+    """
+    Crea una sesión HTTP con un pool de conexiones keep-alive: las llamadas al
+    proveedor reutilizan la conexión TLS en lugar de abrir una nueva cada vez.
+    :param pool_size: Conexiones abiertas que se conservan por servidor.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class CachedDocument:
+    """
+    Documento JSON remoto (descubrimiento OIDC, JWKS) en caché en memoria y en disco.
+    Mientras es reciente se sirve sin red; pasado `refresh_after` se sigue sirviendo y
+    se renueva en un hilo aparte; pasado `ttl` la petición espera a descargarlo. La
+    copia en disco evita la descarga al reiniciar o al arrancar otro proceso.
+    """
+
+    def __init__(self, http, url, cache_dir: str = None, ttl: float = 3600, refresh_after: float = None,
+                 timeout: float = 5):
+        """
+        Constructor de la clase.
+        :param http: Sesión HTTP (requests.Session) con la que se descarga.
+        :param url: URL del documento, o función sin argumentos que la devuelve.
+        :param cache_dir: Directorio privado (0700) de la copia en disco (None = solo en memoria).
+        :param ttl: Segundos tras los que el documento ya no se sirve.
+        :param refresh_after: Segundos tras los que se renueva en segundo plano (por defecto, ttl / 2).
+        :param timeout: Segundos de espera de cada descarga.
+        """
+        self.http = http
+        self._url = url
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.refresh_after = ttl / 2 if refresh_after is None else refresh_after
+        self.timeout = timeout
+        self._entry = None
+        self._lock = threading.Lock()
+        self._refreshing = None
+        self.fetches = 0
+
+    @property
+    def url(self):
+        return self._url() if callable(self._url) else self._url
+
+    @property
+    def cached(self) -> bool:
+        """
+        Indica si hay una copia en memoria (aunque esté pendiente de renovar).
+        """
+        return self._entry is not None
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode()).hexdigest()[:32] + '.json')
+
+    @staticmethod
+    def _is_private(status) -> bool:
+        """
+        Indica si un fichero o directorio es del usuario del proceso y nadie más puede
+        escribir en él: otro usuario podría dejar un JWKS con su propia clave.
+        """
+        owned = not hasattr(os, 'getuid') or status.st_uid == os.getuid()
+        return owned and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def _private_dir(self) -> bool:
+        """
+        Crea el directorio de la caché con permisos 0700 si no existe.
+        :return: True si el directorio es privado y se puede usar.
+        """
+        try:
+            os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+            status = os.lstat(self.cache_dir)
+        except OSError as e:
+            print(f"No se pudo usar la caché OIDC en disco: {e}")
+            return False
+        if not stat.S_ISDIR(status.st_mode) or not self._is_private(status):
+            print(f"Caché OIDC en disco desactivada: {self.cache_dir} no es un directorio privado del proceso")
+            return False
+        return True
+
+    def _read_disk(self, url):
+        if not self.cache_dir or not self._private_dir():
+            return None
+        try:
+            descriptor = os.open(self._path(url), os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+        except OSError:
+            return None
+        try:
+            with os.fdopen(descriptor) as f:
+                if not self._is_private(os.fstat(f.fileno())):
+                    print(f"Se ignora la caché OIDC de {url}: el fichero no es privado del proceso")
+                    return None
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and entry.get('url') == url else None
+
+    def _write_disk(self, entry):
+        if not self.cache_dir or not self._private_dir():
+            return
+        try:
+            path = self._path(entry['url'])
+            # Escritura atómica: otro proceso nunca lee un fichero a medias
+            temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_NOFOLLOW', 0),
+                                 0o600)
+            with os.fdopen(descriptor, 'w') as f:
+                json.dump(entry, f)
+            os.replace(temporary, path)
+        except OSError as e:
+            print(f"No se pudo guardar la caché OIDC en disco: {e}")
+
+    def refresh(self) -> dict:
+        """
+        Descarga el documento y actualiza la caché en memoria y en disco.
+        :return: Documento descargado.
+        :raises OIDCError: Si la descarga falla.
+        """
+        url = self.url
+        try:
+            response = self.http.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            document = response.json()
+        except Exception as e:
+            raise OIDCError(f"No se pudo descargar {url}: {e}")
+        self.fetches += 1
+        entry = {'url': url, 'fetched_at': time.time(), 'document': document}
+        with self._lock:
+            self._entry = entry
+        self._write_disk(entry)
+        return document
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return
+            self._refreshing = threading.Thread(target=self._background_refresh, name='oidc-refresh', daemon=True)
+            self._refreshing.start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except OIDCError as e:
+            # Se sigue sirviendo la copia anterior hasta que caduque
+            print(e)
+
+    def get(self) -> dict:
+        """
+        Devuelve el documento, desde la caché si es posible.
+        :raises OIDCError: Si no hay copia válida y la descarga falla.
+        """
+        entry = self._entry
+        if entry is None or entry['url'] != self.url:
+            entry = self._read_disk(self.url)
+            if entry is not None:
+                with self._lock:
+                    self._entry = entry
+        age = time.time() - entry['fetched_at'] if entry is not None else None
+        if age is None or age >= self.ttl:
+            return self.refresh()
+        if age >= self.refresh_after:
+            self._refresh_in_background()
+        return entry['document']
+
+    def wait_for_refresh(self, timeout: float = None):
+        """
+        Espera a que termine la renovación en segundo plano en curso, si la hay.
+        """
+        thread = self._refreshing
+        if thread is not None:
+            thread.join(timeout)
+
+
+class OIDCClient:
+    """
+    Cliente OIDC del flujo authorization code. El descubrimiento y el JWKS se sirven
+    desde CachedDocument, la identidad se obtiene verificando el ID token en local (sin
+    llamar a /userinfo) y todas las peticiones usan la misma sesión HTTP con pool.
+    """
+
+    def __init__(self, issuer: str, client_id: str, client_secret: str, http=None, cache_dir: str = None,
+                 ttl: float = 3600, timeout: float = 5, leeway: int = 60):
+        """
+        Constructor de la clase.
+        :param issuer: URL del emisor (p. ej. https://<dominio>/), igual que el claim `iss`.
+        :param http: Sesión HTTP (por defecto, create_http_session()).
+        :param cache_dir: Directorio de la caché en disco del descubrimiento y del JWKS.
+        :param ttl: Segundos de validez de la caché.
+        :param timeout: Segundos de espera de cada petición al proveedor.
+        :param leeway: Segundos de tolerancia al validar exp/iat (relojes desfasados).
+        """
+        self.issuer = issuer if issuer.endswith('/') else issuer + '/'
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.http = http or create_http_session()
+        self.timeout = timeout
+        self.leeway = leeway
+        self.discovery = CachedDocument(self.http, self.issuer + DISCOVERY_PATH, cache_dir, ttl, timeout=timeout)
+        self.jwks = CachedDocument(self.http, lambda: self.metadata()['jwks_uri'], cache_dir, ttl, timeout=timeout)
+        self._jwks_forced_at = 0
+
+    def metadata(self) -> dict:
+        """
+        Documento de descubrimiento del emisor. Sus endpoints deben estar en el mismo
+        origen que el emisor configurado: así un documento manipulado no puede enviar
+        el client_secret a otro servidor ni hacer aceptar claves de firma ajenas.
+        :raises OIDCError: Si el documento no corresponde al emisor.
+        """
+        metadata = self.discovery.get()
+        if metadata.get('issuer') != self.issuer:
+            raise OIDCError(f"El descubrimiento OIDC es de otro emisor: {metadata.get('issuer')}")
+        origin = urlsplit(self.issuer)[:2]
+        for field in ENDPOINT_FIELDS:
+            if not isinstance(metadata.get(field), str) or urlsplit(metadata[field])[:2] != origin:
+                raise OIDCError(f"El endpoint {field} del descubrimiento OIDC no está en {self.issuer}")
+        return metadata
+
+    def authorization_url(self, redirect_uri: str, state: str, nonce: str, **params) -> str:
+        """
+        URL del proveedor a la que se redirige al usuario para iniciar sesión.
+        """
+        query = {'response_type': 'code', 'client_id': self.client_id, 'redirect_uri': redirect_uri,
+                 'scope': 'openid profile email', 'state': state, 'nonce': nonce, **params}
+        return f"{self.metadata()['authorization_endpoint']}?{urlencode(query)}"
+
+    def exchange_code(self, code: str, redirect_uri: str) -> dict:
+        """
+        Canjea el código de autorización por los tokens.
+        :return: Respuesta del endpoint de tokens (id_token, access_token...).
+        :raises OIDCError: Si el proveedor rechaza el código.
+        """
+        try:
+            response = self.http.post(self.metadata()['token_endpoint'], timeout=self.timeout, data={
+                'grant_type': 'authorization_code', 'code': code, 'redirect_uri': redirect_uri,
+                'client_id': self.client_id, 'client_secret': self.client_secret,
+            })
+        except Exception as e:
+            raise OIDCError(f"No se pudo canjear el código: {e}")
+        if response.status_code != 200:
+            raise OIDCError(f"El proveedor rechazó el código ({response.status_code}): {response.text[:200]}")
+        return response.json()
+
+    def _key_set(self, force=False):
+        from authlib.jose import JsonWebKey
+        if force:
+            self._jwks_forced_at = time.time()
+            return JsonWebKey.import_key_set(self.jwks.refresh())
+        return JsonWebKey.import_key_set(self.jwks.get())
+
+    def verify_id_token(self, id_token: str, nonce: str, access_token: str = None) -> dict:
+        """
+        Verifica en local la firma y los claims (iss, aud, exp, iat, nonce, at_hash) de
+        un ID token. Si la firma usa una clave que no está en el JWKS en caché (rotación
+        de claves), descarga el JWKS una vez más.
+        :return: Claims del token.
+        :raises OIDCError: Si el token no es válido.
+        """
+        from authlib.jose import JsonWebToken
+        from authlib.jose.errors import JoseError
+        from authlib.oidc.core import CodeIDToken
+        jwt = JsonWebToken(ID_TOKEN_ALGORITHMS)
+        options = {'iss': {'essential': True, 'value': self.issuer}, 'aud': {'essential': True, 'value': self.client_id}}
+        params = {'nonce': nonce, 'client_id': self.client_id, 'access_token': access_token}
+        try:
+            try:
+                claims = jwt.decode(id_token, self._key_set(), claims_cls=CodeIDToken,
+                                    claims_options=options, claims_params=params)
+            except ValueError:
+                # `kid` desconocido: el proveedor rotó sus claves
+                if time.time() - self._jwks_forced_at < JWKS_MIN_REFRESH_INTERVAL:
+                    raise
+                claims = jwt.decode(id_token, self._key_set(force=True), claims_cls=CodeIDToken,
+                                    claims_options=options, claims_params=params)
+            claims.validate(leeway=self.leeway)
+        except (JoseError, ValueError) as e:
+            raise OIDCError(f"ID token inválido: {e}")
+        return dict(claims)
+
+    def warm_up(self):
+        """
+        Carga el descubrimiento y el JWKS en un hilo aparte, para que el primer inicio
+        de sesión no espere a descargarlos.
+        :return: Hilo lanzado, o None si ya estaban en caché.
+        """
+        if self.jwks.cached:
+            return None
+
+        def run():
+            try:
+                self.jwks.get()
+            except OIDCError as e:
+                print(e)
+
+        thread = threading.Thread(target=run, name='oidc-warm-up', daemon=True)
+        thread.start()
+        return thread
+
+
+def get_oidc_client():
+    """
+    Devuelve el cliente OIDC de Auth0 de la aplicación actual, creado en el primer uso.
+    :return: OIDCClient configurado con Config.
+    """
+    from flask import current_app
+    app = current_app._get_current_object()
+    client = app.extensions.get('oidc')
+    if client is None:
+        with _oidc_lock:
+            client = app.extensions.get('oidc')
+            if client is None:
+                client = OIDCClient(
+                    Config.AUTH0_ISSUER or f'https://{Config.AUTH0_DOMAIN}/',
+                    Config.AUTH0_CLIENT_ID,
+                    Config.AUTH0_CLIENT_SECRET,
+                    http=create_http_session(Config.OIDC_HTTP_POOL_SIZE),
+                    cache_dir=Config.OIDC_CACHE_DIR,
+                    ttl=Config.OIDC_CACHE_TTL,
+                    timeout=Config.OIDC_HTTP_TIMEOUT
+                )
+                app.extensions['oidc'] = client
+    return client
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify, session, Response
+from config import Config
+from app.logic.profiler_logic import profile_logic
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.route('/admin/profile', methods=['GET'])
+def profile():
+    """
+    Perfila el proceso que atiende la petición durante ?seconds=N segundos
+    (por defecto 10) y devuelve las pilas en formato colapsado, listo para
+    flamegraph.pl o speedscope. Solo para administradores (ADMIN_EMAILS).
+    """
+    # Verifica si el usuario está autenticado y es administrador
+    if 'user_email' not in session:
+        return jsonify({'error': 'Debes iniciar sesión.'}), 401
+    if session['user_email'] not in Config.ADMIN_EMAILS:
+        return jsonify({'error': 'Acceso restringido a administradores.'}), 403
+
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        interval_ms = float(request.args.get('interval_ms', 10))
+        sampler = profile_logic(seconds, interval_ms)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 409
+
+    response = Response(sampler.collapsed(), mimetype='text/plain')
+    response.headers['Content-Disposition'] = 'attachment; filename="profile.collapsed"'
+    response.headers['X-Profile-Samples'] = str(sampler.samples)
+    response.headers['X-Profile-Overhead'] = f'{sampler.overhead:.4f}'
+    return response
@@ -1,5 +1,6 @@
-from flask import Blueprint, render_template, session, redirect, url_for
-from database.database_manager import database_manager
+from flask import Blueprint, render_template, session, redirect, url_for, request, abort
+from app.logic.task_logic import get_tasks_page, DEFAULT_PAGE_SIZE
+from app.logic.etag_logic import get_tasks_version, tasks_etag, not_modified, with_etag
 
 home_bp = Blueprint('home', __name__)
 #BRI
@@ -9,21 +10,25 @@ def home():
     if not session.get('user_email') and not session.get('user'):
         return redirect(url_for('user.get_user'))
 
-    # Obtén la colección de tareas de la base de datos
-    tasks_collection = database_manager.get_db()['tasks']
-
     # Obtén el correo electrónico del usuario desde la sesión (login tradicional o OAuth)
     user_email = session.get('user_email') or session.get('user', {}).get('email')
 
-    # Consulta las tareas asociadas al correo electrónico del usuario
-    tasks = list(tasks_collection.find({'user_email': user_email}))
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE)
+    after = request.args.get('after')
 
-    # Asegúrate de convertir el campo '_id' a string para evitar problemas con Jinja2
-    for task in tasks:
-        task['_id'] = str(task['_id'])
+    # Petición condicional: si las tareas del usuario no cambiaron, 304 sin consultar 'tasks'
+    version = get_tasks_version(user_email)
+    etag = tasks_etag('home', user_email, version, 'priority', limit, after) if version is not None else None
+    response = not_modified(etag)
+    if response is not None:
+        return response
 
-    # Imprime las tareas para depuración
-    print(f'Tasks to render: {tasks}')
+    # Consulta una página de las tareas asociadas al correo electrónico del usuario,
+    # empezando por las más urgentes
+    try:
+        tasks, next_after = get_tasks_page(user_email=user_email, limit=limit, after=after, order='priority')
+    except ValueError:
+        abort(400)
 
     # Renderiza la plantilla con las tareas y el correo del usuario
-    return render_template('home.html', tasks=tasks, user_email=user_email)
+    return with_etag(render_template('home.html', tasks=tasks, user_email=user_email, next_after=next_after), etag)
@@ -1,20 +1,106 @@
-from flask import Blueprint, request, jsonify, url_for, render_template, session, flash, redirect
+from flask import Blueprint, request, jsonify, url_for, render_template, session, flash, redirect, Response
 from database.database_manager import database_manager
 from bson import ObjectId
-import os
-from app.logic.task_logic import add_task_logic, update_task
+from app.logic.task_logic import (add_task_logic, update_task, get_tasks_page, get_top_tasks, iter_tasks,
+                                  DEFAULT_PAGE_SIZE, DEFAULT_TOP_K)
+from app.logic.records import Task
+from app.logic.etag_logic import bump_tasks_version, get_tasks_version, tasks_etag, not_modified, with_etag
+from app.logic.json_stream import iter_ndjson, iter_json_array, NDJSON_MIMETYPE, JSON_MIMETYPE
+from app.logic.import_logic import import_tasks_logic, iter_ndjson_rows, iter_csv_rows
+from app.logic.batch_logic import batch_tasks_logic
+from app.logic.search_logic import search_tasks, autocomplete_tasks, DEFAULT_SEARCH_LIMIT
 
 task_bp = Blueprint('task', __name__)
 
-# Accede a las variables de entorno
-DB_URI = os.getenv('MONGO_URI')
-
 @task_bp.route('/tasks', methods=['GET'])
 def list_tasks():
-    # Obtener la colección de tareas directamente desde la instancia de database_manager
-    tasks_collection = database_manager.get_db()['tasks']
-    tasks = list(tasks_collection.find())  # Obtener todas las tareas y convertir el cursor a una lista
-    return jsonify(tasks)
+    # Modo streaming: ?format=ndjson (o Accept: application/x-ndjson) o ?format=stream
+    output_format = request.args.get('format')
+    if output_format is None and request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        output_format = 'ndjson'
+    if output_format in ('ndjson', 'stream'):
+        return stream_tasks(output_format)
+
+    # Listado paginado por keyset de las tareas del usuario:
+    # ?limit=<n>&after=<_id de la última tarea recibida>. Admite peticiones condicionales
+    if 'user_email' not in session:
+        return jsonify({'error': 'Debes iniciar sesión para ver tus tareas.'}), 401
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE)
+    after = request.args.get('after')
+    user_email = session['user_email']
+    version = get_tasks_version(user_email)
+    etag = tasks_etag('tasks', user_email, version, limit, after) if version is not None else None
+    response = not_modified(etag)
+    if response is not None:
+        return response
+
+    try:
+        tasks, next_after = get_tasks_page(user_email=user_email, limit=limit, after=after,
+                                           projection=Task.FIELDS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return with_etag(jsonify({'tasks': [task.to_dict() for task in tasks], 'next_after': next_after}), etag)
+
+def stream_tasks(output_format):
+    """
+    Serializa las tareas del usuario directamente desde el cursor, documento a
+    documento, sin construir la lista completa en memoria.
+    """
+    if 'user_email' not in session:
+        return jsonify({'error': 'Debes iniciar sesión para exportar tus tareas.'}), 401
+    try:
+        cursor = iter_tasks(session['user_email'], after=request.args.get('after'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if output_format == 'ndjson':
+        return Response(iter_ndjson(cursor), mimetype=NDJSON_MIMETYPE)
+    return Response(iter_json_array(cursor), mimetype=JSON_MIMETYPE)
+
+@task_bp.route('/tasks/top', methods=['GET'])
+def top_tasks():
+    """
+    Las tareas más urgentes del usuario: ?k=<n>. Ordenadas por prioridad (high,
+    medium, low) y, a igual prioridad, por antigüedad.
+    """
+    if 'user_email' not in session:
+        return jsonify({'error': 'Debes iniciar sesión para ver tus tareas.'}), 401
+    try:
+        tasks = get_top_tasks(session['user_email'], request.args.get('k', DEFAULT_TOP_K))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'tasks': [task.to_dict() for task in tasks]})
+
+@task_bp.route('/tasks/search', methods=['GET'])
+def search():
+    """
+    Búsqueda por palabras completas en las tareas del usuario: ?q=<palabras>&limit=<n>.
+    Los resultados se ordenan por relevancia.
+    """
+    if 'user_email' not in session:
+        return jsonify({'error': 'Debes iniciar sesión para buscar tareas.'}), 401
+    try:
+        results = search_tasks(session['user_email'], request.args.get('q'),
+                               request.args.get('limit', DEFAULT_SEARCH_LIMIT))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'tasks': [{**task.to_dict(), 'score': score} for task, score in results]})
+
+@task_bp.route('/tasks/autocomplete', methods=['GET'])
+def autocomplete():
+    """
+    Autocompletado mientras se escribe: ?prefix=<texto>&limit=<n>. Devuelve las
+    tareas del usuario cuyo nombre empieza por el texto, en orden alfabético.
+    """
+    if 'user_email' not in session:
+        return jsonify({'error': 'Debes iniciar sesión para buscar tareas.'}), 401
+    try:
+        tasks = autocomplete_tasks(session['user_email'], request.args.get('prefix'),
+                                   request.args.get('limit', DEFAULT_SEARCH_LIMIT))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'tasks': [task.to_dict() for task in tasks]})
 
 @task_bp.route('/add-task', methods=['POST'])
 def add_task():
@@ -38,6 +124,70 @@ def add_task():
         flash(str(e), 'error')  # Muestra el error si el usuario no está encontrado
         return redirect(url_for('home.home'))
 
+@task_bp.route('/import-tasks', methods=['POST'])
+def import_tasks():
+    # Verifica si el usuario está autenticado
+    if 'user_email' not in session:
+        return jsonify({'error': 'Debes iniciar sesión para importar tareas.'}), 401
+
+    # Elegir el lector según el tipo de contenido; el cuerpo se lee en streaming
+    if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+        rows = iter_ndjson_rows(request.stream)
+    elif request.mimetype == 'text/csv':
+        rows = iter_csv_rows(request.stream)
+    else:
+        return jsonify({'error': 'Formato no soportado. Usa application/x-ndjson o text/csv.'}), 415
+
+    try:
+        summary = import_tasks_logic(session['user_email'], rows)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 404
+
+    return jsonify(summary), 200
+
+@task_bp.route('/tasks/batch', methods=['POST'])
+def batch_tasks():
+    """
+    Aplica muchas operaciones sobre las tareas del usuario en una sola petición.
+    Con JSON ({"ordered": true, "operations": [{"op": "delete", "id": ...}, ...]})
+    devuelve el resultado de cada operación; con un formulario (selección múltiple
+    de la página de inicio: task_ids, action y priority) redirige a /home.
+    """
+    from_form = not request.is_json
+    if 'user_email' not in session:
+        if from_form:
+            flash("Debes iniciar sesión para modificar tareas.", 'error')
+            return redirect(url_for('user.get_user'))
+        return jsonify({'error': 'Debes iniciar sesión para modificar tareas.'}), 401
+
+    if from_form:
+        action = request.form.get('action')
+        operations = [{'op': action, 'id': task_id, 'priority': request.form.get('priority')}
+                      if action == 'priority' else {'op': action, 'id': task_id}
+                      for task_id in request.form.getlist('task_ids')]
+        ordered = False
+    else:
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get('operations'), list):
+            return jsonify({'error': 'El cuerpo debe incluir una lista "operations".'}), 400
+        operations = body['operations']
+        ordered = bool(body.get('ordered', True))
+
+    try:
+        summary = batch_tasks_logic(session['user_email'], operations, ordered=ordered)
+    except ValueError as e:
+        if from_form:
+            flash(str(e), 'error')
+            return redirect(url_for('home.home'))
+        return jsonify({'error': str(e)}), 400
+
+    if from_form:
+        failed = sum(1 for result in summary['results'] if result['status'] != 'ok')
+        flash(f"{len(summary['results']) - failed} tareas actualizadas, {failed} con errores.",
+              'error' if failed else 'success')
+        return redirect(url_for('home.home'))
+    return jsonify(summary), 200
+
 @task_bp.route('/edit-task/<task_id>', methods=['POST'])
 def edit_task(task_id):
     # Verifica si el usuario está autenticado
@@ -54,6 +204,7 @@ def edit_task(task_id):
 
     try:
         update_task(task_id, new_name, new_priority)
+        bump_tasks_version(session['user_email'])
         flash("Tarea actualizada exitosamente.", 'success')
     except Exception as e:
         flash(f"Error al actualizar la tarea: {e}", 'error')
@@ -77,6 +228,7 @@ def delete_task(task_id):
             deleted_count = database_manager.delete('tasks', query)
 
             if deleted_count > 0:
+                bump_tasks_version(session['user_email'])
                 print(f"Tarea con ID {task_id} eliminada correctamente.")
                 flash(f"Tarea con ID {task_id} eliminada correctamente.", 'success')
                 return redirect(url_for('home.home'))
@@ -1,8 +1,9 @@
+import secrets
 from flask import Blueprint, redirect, url_for, session, request, flash, render_template
-from app.logic.users_logic import register_user_logic, login_user_logic, auth_callback_logic, logout_user_logic
-from app import oauth  # Add this import
-
-import os
+from app.logic.users_logic import (register_user_logic, login_user_logic, logout_user_logic, oidc_user_info,
+                                   record_login_logic)
+from app.oidc import get_oidc_client
+from app.sessions import regenerate_session
 
 # Blueprint para las rutas de usuario
 user_bp = Blueprint('user', __name__)
@@ -17,7 +18,9 @@ def add_user():
         password_user = request.form.get('password')
 
         # Llamar a la lógica para registrar el usuario
-        register_user_logic(email_user, password_user)
+        if not register_user_logic(email_user, password_user):
+            flash("Ya existe un usuario registrado con ese email.", 'error')
+            return redirect(url_for('user.add_user'))
         flash("Registro exitoso. Por favor inicia sesión.", 'success')
         return redirect(url_for('user.get_user'))
 
@@ -38,9 +41,12 @@ def get_user():
 
         # Llamar a la lógica para verificar el inicio de sesión
         if login_user_logic(email, password):
+            # Identificador nuevo al autenticarse: evita la fijación de sesión
+            regenerate_session(session)
             flash("Has iniciado sesión exitosamente.", 'success')
             session['user_email'] = email
             session['authenticated'] = True  # Add this line
+            record_login_logic(email)
             return redirect(url_for('home.home'))
         else:
             flash("Email o contraseña incorrectos.", 'error')
@@ -56,14 +62,20 @@ def login():
     """
     # Ensure we have the full URL for the callback
     callback_url = url_for('user.auth_callback', _external=True)
-    print(f"Callback URL: {callback_url}")  # Debug print
     
     try:
-        return oauth.auth0.authorize_redirect(
-            redirect_uri=callback_url,
-            audience=f"https://{os.getenv('AUTH0_DOMAIN')}/userinfo",
+        client = get_oidc_client()
+        # state protege el callback frente a CSRF; nonce liga el ID token a esta petición
+        session['oidc'] = {'state': secrets.token_urlsafe(24), 'nonce': secrets.token_urlsafe(24)}
+        authorization_url = client.authorization_url(
+            callback_url,
+            session['oidc']['state'],
+            session['oidc']['nonce'],
             prompt='login'  # Force login prompt
         )
+        # El JWKS hará falta en el callback: se descarga mientras el usuario inicia sesión
+        client.warm_up()
+        return redirect(authorization_url)
     except Exception as e:
         print(f"Error in login route: {str(e)}")  # Debug print
         flash(f"Error al iniciar sesión con Auth0: {str(e)}", "error")
@@ -75,23 +87,18 @@ def auth_callback():
     Maneja el callback después de la autenticación en Auth0.
     """
     try:
-        # Get the token from Auth0
-        token = oauth.auth0.authorize_access_token()
-        
-        # Get the user info from Auth0 - Fix the URL
-        userinfo_url = f"https://{os.getenv('AUTH0_DOMAIN')}/userinfo"
-        resp = oauth.auth0.get(userinfo_url)
-        userinfo = resp.json()
-        
-        print(f"Auth0 user info: {userinfo}")  # Debug print
+        # Canjea el código y verifica el ID token en local, sin llamar a /userinfo
+        userinfo = oidc_user_info(session.pop('oidc', None), request.args)
         
-        # Store user info in session
+        # Store user info in session, con un identificador nuevo (fijación de sesión)
+        regenerate_session(session)
         session['user_email'] = userinfo['email']
         session['user'] = userinfo
         session['authenticated'] = True
         
         # Register user if they don't exist
         register_user_logic(userinfo['email'])
+        record_login_logic(userinfo['email'])
         
         # Redirect to home after successful login
         flash("Inicio de sesión exitoso", "success")
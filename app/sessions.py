@@ -0,0 +1,315 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from config import Config
+
+# Colección con las sesiones del almacén en base de datos (un documento por sesión)
+SESSIONS_COLLECTION = 'sessions'
+
+
+def _utc(value):
+    """
+    Normaliza una fecha a UTC con zona horaria (MongoDB devuelve fechas sin zona).
+    """
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _now():
+    # Segundos enteros: en SQLite las fechas se comparan como texto ISO y todas deben
+    # tener el mismo formato
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """
+    Sesión cuyos datos se guardan en el servidor. La cookie solo lleva `sid`, un
+    identificador aleatorio sin significado.
+    """
+
+    def __init__(self, initial=None, sid=None, new=False, expires_at=None):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.modified = False
+        self.previous_sid = None
+
+    def regenerate(self):
+        """
+        Cambia el identificador de la sesión conservando sus datos. Al guardarla se borra
+        la entrada anterior del almacén y se envía la cookie con el identificador nuevo,
+        de modo que un `sid` conocido antes de iniciar sesión no sirve después (fijación
+        de sesión).
+        """
+        if not self.new and self.previous_sid is None:
+            self.previous_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.new = True
+        self.modified = True
+
+
+class MemorySessionStore:
+    """
+    Almacén de sesiones en memoria del proceso, con expulsión LRU. Solo sirve con un
+    único proceso (desarrollo, pruebas): cada proceso tiene sus propias sesiones.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        """
+        Constructor de la clase.
+        :param max_size: Número máximo de sesiones; al superarlo se descarta la usada hace más tiempo.
+        """
+        self.max_size = max_size
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        """
+        Busca una sesión vigente.
+        :return: Tupla (datos, expires_at), o None si no existe o ha caducado.
+        """
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            if entry['expires_at'] <= _now():
+                del self._sessions[sid]
+                return None
+            self._sessions.move_to_end(sid)
+            return dict(entry['data']), entry['expires_at']
+
+    def save(self, sid, data, expires_at, new=False):
+        with self._lock:
+            self._sessions[sid] = {'data': dict(data), 'expires_at': expires_at,
+                                   'user_email': data.get('user_email')}
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def expire(self, user_email=None) -> int:
+        """
+        Elimina de una vez las sesiones caducadas o, si se indica `user_email`, todas
+        las sesiones de ese usuario (p. ej. para cerrar su sesión en todos los dispositivos).
+        :return: Número de sesiones eliminadas.
+        """
+        now = _now()
+        with self._lock:
+            expired = [sid for sid, entry in self._sessions.items()
+                       if (entry['user_email'] == user_email if user_email else entry['expires_at'] <= now)]
+            for sid in expired:
+                del self._sessions[sid]
+        return len(expired)
+
+
+class DatabaseSessionStore:
+    """
+    Almacén de sesiones en la colección SESSIONS_COLLECTION. En MongoDB el índice
+    TTL sobre `expires_at` borra las sesiones caducadas; en SQLite (y para no esperar
+    al proceso TTL) lo hace expire().
+    """
+
+    def __init__(self, database_manager):
+        self.database_manager = database_manager
+
+    def load(self, sid):
+        documents = list(self.database_manager.select(
+            db_name=None,
+            collection_name=SESSIONS_COLLECTION,
+            query={'_id': sid},
+            projection={'data': 1, 'expires_at': 1}
+        ))
+        if not documents:
+            return None
+        expires_at = _utc(documents[0]['expires_at'])
+        if expires_at <= _now():
+            return None
+        return documents[0]['data'], expires_at
+
+    def save(self, sid, data, expires_at, new=False):
+        # `user_email` se guarda fuera de `data` para poder expirar las sesiones de un usuario
+        document = {'data': dict(data), 'expires_at': expires_at, 'user_email': data.get('user_email')}
+        if new:
+            self.database_manager.insert(db_name=None, collection_name=SESSIONS_COLLECTION,
+                                         data={'_id': sid, **document})
+        else:
+            self.database_manager.update(db_name=None, collection_name=SESSIONS_COLLECTION,
+                                         query={'_id': sid}, update_data=document)
+
+    def delete(self, sid):
+        self.database_manager.delete(SESSIONS_COLLECTION, {'_id': sid})
+
+    def expire(self, user_email=None) -> int:
+        query = {'user_email': user_email} if user_email else {'expires_at': {'$lte': _now()}}
+        return self.database_manager.delete_many(db_name=None, collection_name=SESSIONS_COLLECTION, query=query)
+
+
+class CachedSessionStore:
+    """
+    Caché de lectura LRU con TTL delante de otro almacén: las peticiones seguidas de
+    una misma sesión no vuelven a leerla. Las escrituras pasan al almacén y actualizan
+    la caché; el TTL acota cuánto tarda un proceso en ver un cierre de sesión hecho
+    en otro.
+    """
+
+    def __init__(self, store, max_size: int = 1024, ttl: float = 5.0):
+        """
+        Constructor de la clase.
+        :param store: Almacén de sesiones (MemorySessionStore o DatabaseSessionStore).
+        :param max_size: Número máximo de sesiones en caché.
+        :param ttl: Segundos que una sesión leída permanece en caché.
+        """
+        self.store = store
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _put(self, sid, value):
+        with self._lock:
+            self._entries[sid] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(sid)
+                self.hits += 1
+                value = entry[0]
+                if value is None or value[1] <= _now():
+                    return None
+                return dict(value[0]), value[1]
+            self._entries.pop(sid, None)
+            self.misses += 1
+        value = self.store.load(sid)
+        self._put(sid, value)
+        return (dict(value[0]), value[1]) if value is not None else None
+
+    def save(self, sid, data, expires_at, new=False):
+        self.store.save(sid, data, expires_at, new)
+        self._put(sid, (dict(data), expires_at))
+
+    def delete(self, sid):
+        self.store.delete(sid)
+        self._put(sid, None)
+
+    def expire(self, user_email=None) -> int:
+        # Las sesiones caducadas ya se descartan al leerlas de la caché; las de un
+        # usuario se buscan en la caché por su email
+        count = self.store.expire(user_email)
+        if user_email:
+            with self._lock:
+                for sid, (value, _) in list(self._entries.items()):
+                    if value is not None and value[0].get('user_email') == user_email:
+                        del self._entries[sid]
+        return count
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Interfaz de sesiones de Flask que guarda los datos en un almacén del servidor y
+    envía en la cookie solo el identificador de la sesión. Las sesiones sin datos no
+    se guardan, y una sesión sin cambios solo se reescribe para renovar su caducidad
+    cuando ha consumido la mitad de su vida.
+    """
+
+    def __init__(self, store, lifetime: float):
+        """
+        Constructor de la clase.
+        :param store: Almacén con load, save, delete y expire.
+        :param lifetime: Segundos de inactividad tras los que caduca una sesión.
+        """
+        self.store = store
+        self.lifetime = timedelta(seconds=lifetime)
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            stored = self.store.load(sid)
+            if stored is not None:
+                data, expires_at = stored
+                return ServerSideSession(data, sid=sid, expires_at=expires_at)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.previous_sid is not None:
+            # Identificador regenerado: el anterior deja de ser válido
+            self.store.delete(session.previous_sid)
+
+        if not session:
+            # Sesión vaciada (p. ej. al cerrar sesión): se borra del almacén y del navegador
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+            if session.modified and (not session.new or session.previous_sid is not None):
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        now = _now()
+        renew = session.expires_at is None or session.expires_at - now < self.lifetime / 2
+        if not (session.modified or renew):
+            return
+        session.expires_at = now + self.lifetime
+        self.store.save(session.sid, dict(session), session.expires_at, new=session.new)
+        if session.new or session.permanent:
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app)
+            )
+
+
+def regenerate_session(session):
+    """
+    Regenera el identificador de la sesión actual al iniciar o cerrar sesión. Con las
+    sesiones en cookie firmada de Flask no hay identificador que regenerar.
+    """
+    if isinstance(session, ServerSideSession):
+        session.regenerate()
+
+
+def create_session_store(database_manager):
+    """
+    Crea el almacén de sesiones configurado en Config.SESSION_STORE ('database' o
+    'memory'), con la caché de lectura delante si SESSION_CACHE_SIZE > 0.
+    """
+    if Config.SESSION_STORE == 'memory':
+        # Ya está en memoria: una caché delante no ahorraría nada
+        return MemorySessionStore(max_size=Config.SESSION_MEMORY_SIZE)
+    store = DatabaseSessionStore(database_manager)
+    if Config.SESSION_CACHE_SIZE > 0:
+        store = CachedSessionStore(store, max_size=Config.SESSION_CACHE_SIZE, ttl=Config.SESSION_CACHE_TTL)
+    return store
+
+
+def init_sessions(app, database_manager):
+    """
+    Sustituye las sesiones en cookie firmada de Flask por sesiones en el servidor.
+    :param app: Aplicación Flask.
+    :param database_manager: DatabaseManager del almacén en base de datos.
+    """
+    app.session_interface = ServerSideSessionInterface(create_session_store(database_manager),
+                                                       lifetime=Config.SESSION_LIFETIME)
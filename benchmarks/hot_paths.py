@@ -0,0 +1,232 @@
+"""
+Benchmark reproducible de los caminos críticos de la lógica de tareas y usuarios
+(add_task_logic, update_task, get_task_by_name, login_user_logic) y de las rutas
+/home y /tasks a través del cliente de pruebas de Flask.
+
+Cada tamaño de datos (número de tareas sembradas en la colección) se mide por
+separado; los datos crecen de un tamaño al siguiente. Los resultados se escriben
+en JSON y se comparan con una línea base guardada: si la mediana de un caso empeora
+más de la tolerancia, se marca como regresión y el proceso termina con código 1.
+
+Uso:
+    # SQLite embebido en un fichero temporal (no necesita servidor)
+    python -m benchmarks.hot_paths --sizes 10,1000,100000 --output results.json
+
+    # mongod local
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.hot_paths --backend mongo --sizes 10,1000000
+
+    # Actualizar la línea base
+    python -m benchmarks.hot_paths --update-baseline
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DB = 'ToDoBenchmark'
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'bench-password'
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SEED_BATCH_SIZE = 10000
+# Tareas por usuario en los datos sembrados
+TASKS_PER_USER = 100
+
+
+def percentile(values, fraction):
+    """
+    Percentil por el método del rango más cercano.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(function, iterations, warmup):
+    """
+    Ejecuta una función `warmup` veces sin medir y `iterations` veces midiendo.
+    :return: Diccionario con ops_per_sec y latencias (ms): mean, p50, p95, p99.
+    """
+    for i in range(warmup):
+        function(i)
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        function(warmup + i)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'iterations': iterations,
+        'ops_per_sec': round(1000 * iterations / sum(timings), 1),
+        'mean_ms': round(statistics.mean(timings), 4),
+        'p50_ms': round(percentile(timings, 0.50), 4),
+        'p95_ms': round(percentile(timings, 0.95), 4),
+        'p99_ms': round(percentile(timings, 0.99), 4)
+    }
+
+
+def seed(database_manager, start, end):
+    """
+    Siembra las tareas [start, end) repartidas entre usuarios de TASKS_PER_USER tareas.
+    """
+    from bson import ObjectId
+    user_ids = {}
+    for offset in range(start, end, SEED_BATCH_SIZE):
+        users, tasks = [], []
+        for i in range(offset, min(end, offset + SEED_BATCH_SIZE)):
+            email = f'user-{i // TASKS_PER_USER}@example.com'
+            if email not in user_ids:
+                user_ids[email] = ObjectId()
+                users.append({'_id': user_ids[email], 'email': email, 'password': None})
+            tasks.append({'name': f'Task {i}', 'priority': 'high', 'priority_rank': 0, 'user_email': email,
+                          'user_id': user_ids[email]})
+        database_manager.bulk_insert(None, 'users', users)
+        database_manager.bulk_insert(None, 'tasks', tasks)
+
+
+def create_bench_user(database_manager):
+    """
+    Crea el usuario del benchmark con una página completa de tareas.
+    :return: Lista de ids (str) de sus tareas.
+    """
+    from app.logic.users_logic import register_user_logic
+    from app.logic.task_logic import add_task_logic, DEFAULT_PAGE_SIZE
+    register_user_logic(BENCH_EMAIL, BENCH_PASSWORD)
+    return [add_task_logic(BENCH_EMAIL, f'Bench task {i}', 'medium') for i in range(DEFAULT_PAGE_SIZE)]
+
+
+def run_cases(app, task_ids, iterations, warmup):
+    """
+    Mide cada caso con los datos actuales.
+    :return: Diccionario caso -> resultados de measure().
+    """
+    from app.logic.task_logic import add_task_logic, update_task, get_task_by_name
+    from app.logic.users_logic import login_user_logic
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_email'] = BENCH_EMAIL
+        session['authenticated'] = True
+
+    def get(path):
+        def request(_):
+            response = client.get(path)
+            assert response.status_code == 200, response.status
+        return request
+
+    cases = {
+        'add_task_logic': lambda i: add_task_logic(BENCH_EMAIL, f'Added task {time.time_ns()}', 'low'),
+        'update_task': lambda i: update_task(task_ids[i % len(task_ids)], new_priority=('low', 'high')[i % 2]),
+        'get_task_by_name': lambda i: get_task_by_name(BENCH_EMAIL, f'Bench task {i % len(task_ids)}'),
+        'login_user_logic': lambda i: login_user_logic(BENCH_EMAIL, BENCH_PASSWORD),
+        'GET /home': get('/home'),
+        'GET /tasks': get('/tasks'),
+    }
+    results = {}
+    for name, function in cases.items():
+        # El hash de contraseñas domina el login: se mide con menos iteraciones
+        case_iterations = max(5, iterations // 10) if name == 'login_user_logic' else iterations
+        results[name] = measure(function, case_iterations, warmup)
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """
+    Compara la mediana de cada caso con la línea base.
+    :return: Lista de regresiones (diccionarios con key, baseline_ms, current_ms).
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        delta = current['p50_ms'] - previous['p50_ms']
+        if delta > min_delta_ms and current['p50_ms'] > previous['p50_ms'] * (1 + tolerance):
+            regressions.append({'key': key, 'baseline_ms': previous['p50_ms'], 'current_ms': current['p50_ms']})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('sqlite', 'mongo'), default='sqlite')
+    parser.add_argument('--sizes', default='10,1000,10000',
+                        help='Tareas sembradas en la colección, separadas por comas (hasta 1000000)')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--output', help='Fichero JSON de resultados (por defecto, la salida estándar)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Empeoramiento relativo de la mediana que se considera regresión')
+    parser.add_argument('--min-delta-ms', type=float, default=0.1,
+                        help='Empeoramiento absoluto mínimo para considerar una regresión')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(','))
+
+    # La configuración se lee al importar: fijarla antes de importar la aplicación
+    workdir = tempfile.TemporaryDirectory()
+    os.environ['STORAGE_BACKEND'] = args.backend
+    os.environ['SQLITE_PATH'] = os.path.join(workdir.name, 'bench.sqlite3')
+    os.environ['ENSURE_INDEXES_ON_STARTUP'] = '0'
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+    from app import create_app
+    from database.database_manager import database_manager
+    database_manager.default_db_name = BENCH_DB
+    if args.backend == 'mongo':
+        database_manager.get_db().client.drop_database(BENCH_DB)
+    database_manager.ensure_indexes()
+    app = create_app()
+
+    results = {}
+    seeded = 0
+    try:
+        # Las rutas imprimen trazas de depuración: se descartan para no mezclarlas con el informe
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            task_ids = create_bench_user(database_manager)
+            for size in sizes:
+                seed(database_manager, seeded, size)
+                seeded = size
+                for name, result in run_cases(app, task_ids, args.iterations, args.warmup).items():
+                    results[f'{args.backend}/{size}/{name}'] = result
+                    print(f'{size:>8} {name:18} {result["ops_per_sec"]:>10.1f} ops/s  '
+                          f'p50 {result["p50_ms"]:8.3f} ms  p99 {result["p99_ms"]:8.3f} ms', file=sys.stderr)
+    finally:
+        if args.backend == 'mongo':
+            database_manager.get_db().client.drop_database(BENCH_DB)
+        workdir.cleanup()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+    regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+
+    report = {
+        'meta': {'backend': args.backend, 'sizes': sizes, 'python': platform.python_version(),
+                 'platform': platform.platform(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')},
+        'results': results,
+        'regressions': regressions
+    }
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'meta': report['meta'], 'results': {**baseline, **results}}, f, indent=2, sort_keys=True)
+            f.write('\n')
+    elif regressions:
+        for regression in regressions:
+            print(f"REGRESIÓN {regression['key']}: p50 {regression['baseline_ms']} ms -> "
+                  f"{regression['current_ms']} ms", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
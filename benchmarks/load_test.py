@@ -0,0 +1,241 @@
+"""
+Generador de carga multiproceso: cada proceso simula varios usuarios concurrentes
+que repiten una sesión realista contra una aplicación ya arrancada (run.py o
+cualquier servidor WSGI):
+
+    registro -> login -> /home -> añadir tareas -> /tasks -> editar -> borrar -> /home
+
+Al terminar informa del throughput, las latencias p50/p95/p99 por ruta y la tasa
+de errores. Una respuesta cuenta como error si su código de estado no es el
+esperado para ese paso (las rutas de formularios responden con una redirección)
+o si la petición falla.
+
+Uso:
+    STORAGE_BACKEND=sqlite flask --app app run --port 5000 &
+    python -m benchmarks.load_test --base-url http://127.0.0.1:5000 --workers 4 --users 8 --duration 60
+"""
+import argparse
+import json
+import multiprocessing
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from benchmarks.hot_paths import percentile
+
+SESSION_PASSWORD = 'load-test-password'
+
+
+class VirtualUser:
+    """
+    Usuario simulado con su propia sesión HTTP (cookies incluidas).
+    """
+
+    def __init__(self, base_url, stats, think_time, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.stats = stats
+        self.think_time = think_time
+        self.timeout = timeout
+        self.http = requests.Session()
+
+    def call(self, method, route, path, expected, **kwargs):
+        """
+        Hace una petición y registra su latencia bajo el nombre de la ruta.
+        :param route: Nombre de la ruta en el informe (p. ej. 'POST /edit-task/<id>').
+        :param expected: Códigos de estado que se consideran correctos.
+        :return: Respuesta, o None si la petición falló.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, allow_redirects=False,
+                                         timeout=self.timeout, **kwargs)
+        except requests.RequestException:
+            response = None
+        self.stats.record(route, time.perf_counter() - start, response is not None and response.status_code in expected)
+        if self.think_time:
+            time.sleep(self.think_time)
+        return response
+
+    def read_tasks(self, route, response):
+        """
+        Lee la lista de tareas de una respuesta JSON. Un cuerpo que no es JSON (p. ej.
+        una página HTML) cuenta como error de la ruta en lugar de abortar la sesión.
+        :return: Lista de tareas (vacía si la petición falló).
+        """
+        if response is None or not response.ok:
+            return []
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict) or not isinstance(body.get('tasks'), list):
+            self.stats.record_error(route)
+            return []
+        return body['tasks']
+
+    def run_session(self, tasks_per_session):
+        """
+        Ejecuta una sesión completa con un usuario nuevo.
+        """
+        email = f'load-{uuid.uuid4().hex}@example.com'
+        form = {'email': email, 'password': SESSION_PASSWORD}
+        self.call('POST', 'POST /register', '/register', (302,), data=form)
+        self.call('POST', 'POST /', '/', (302,), data=form)
+        self.call('GET', 'GET /home', '/home', (200,))
+
+        names = [f'Task {i}' for i in range(tasks_per_session)]
+        for name in names:
+            self.call('POST', 'POST /add-task', '/add-task', (302,),
+                      data={'task_name': name, 'task_priority': 'medium'})
+        response = self.call('GET', 'GET /tasks', '/tasks', (200,))
+        tasks = self.read_tasks('GET /tasks', response)
+
+        for task in tasks[:tasks_per_session]:
+            self.call('POST', 'POST /edit-task/<id>', f"/edit-task/{task['_id']}", (302,),
+                      data={'new_name': task['name'] + ' (edited)', 'new_priority': 'high'})
+        self.call('GET', 'GET /home', '/home', (200,))
+        for task in tasks[:tasks_per_session]:
+            self.call('POST', 'POST /tasks-delete/<id>', f"/tasks-delete/{task['_id']}", (302,),
+                      data={'_method': 'DELETE'})
+        self.call('GET', 'GET /home', '/home', (200,))
+        self.http.cookies.clear()
+
+
+class Stats:
+    """
+    Latencias y errores por ruta de un proceso.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.sessions = 0
+        self._lock = threading.Lock()
+
+    def record(self, route, duration, ok):
+        with self._lock:
+            entry = self.routes.setdefault(route, {'latencies': [], 'errors': 0})
+            entry['latencies'].append(duration)
+            if not ok:
+                entry['errors'] += 1
+
+    def record_error(self, route):
+        """
+        Marca como error una petición ya registrada (p. ej. con una respuesta ilegible).
+        """
+        with self._lock:
+            self.routes.setdefault(route, {'latencies': [], 'errors': 0})['errors'] += 1
+
+    def session_done(self):
+        with self._lock:
+            self.sessions += 1
+
+
+def run_worker(options):
+    """
+    Proceso trabajador: lanza `users` usuarios simulados que repiten sesiones hasta
+    agotar su cupo o el tiempo.
+    :return: Diccionario con las sesiones completadas y las latencias por ruta.
+    """
+    stats = Stats()
+    deadline = time.monotonic() + options['duration'] if options['duration'] else None
+
+    def user_loop(_):
+        user = VirtualUser(options['base_url'], stats, options['think_time'], options['timeout'])
+        for _ in range(options['sessions']):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            user.run_session(options['tasks_per_session'])
+            stats.session_done()
+
+    with ThreadPoolExecutor(max_workers=options['users']) as pool:
+        list(pool.map(user_loop, range(options['users'])))
+    return {'sessions': stats.sessions, 'routes': stats.routes}
+
+
+def summarize(worker_results, elapsed):
+    """
+    Agrega los resultados de todos los procesos.
+    :return: Informe con totales y métricas por ruta.
+    """
+    routes = {}
+    for result in worker_results:
+        for route, entry in result['routes'].items():
+            merged = routes.setdefault(route, {'latencies': [], 'errors': 0})
+            merged['latencies'].extend(entry['latencies'])
+            merged['errors'] += entry['errors']
+
+    report_routes = {}
+    for route, entry in sorted(routes.items()):
+        latencies = [latency * 1000 for latency in entry['latencies']]
+        report_routes[route] = {
+            'requests': len(latencies),
+            'errors': entry['errors'],
+            'error_rate': round(entry['errors'] / len(latencies), 4),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2)
+        }
+    total_requests = sum(entry['requests'] for entry in report_routes.values())
+    total_errors = sum(entry['errors'] for entry in report_routes.values())
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'sessions': sum(result['sessions'] for result in worker_results),
+        'requests': total_requests,
+        'requests_per_sec': round(total_requests / elapsed, 1) if elapsed else 0.0,
+        'error_rate': round(total_errors / total_requests, 4) if total_requests else 0.0,
+        'routes': report_routes
+    }
+
+
+def print_report(report):
+    print(f"{report['sessions']} sesiones, {report['requests']} peticiones en {report['elapsed_s']} s: "
+          f"{report['requests_per_sec']} req/s, errores {report['error_rate']:.2%}")
+    print(f"{'ruta':28} {'peticiones':>10} {'errores':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, entry in report['routes'].items():
+        print(f"{route:28} {entry['requests']:>10} {entry['errors']:>8} "
+              f"{entry['p50_ms']:>9.2f} {entry['p95_ms']:>9.2f} {entry['p99_ms']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:5000')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(), help='Procesos generadores')
+    parser.add_argument('--users', type=int, default=4, help='Usuarios concurrentes por proceso')
+    parser.add_argument('--sessions', type=int, default=10, help='Sesiones por usuario')
+    parser.add_argument('--duration', type=float, default=0,
+                        help='Segundos máximos de prueba (0 = hasta completar las sesiones)')
+    parser.add_argument('--tasks-per-session', type=int, default=5)
+    parser.add_argument('--think-time-ms', type=float, default=0, help='Pausa entre peticiones de un usuario')
+    parser.add_argument('--timeout', type=float, default=30, help='Timeout de cada petición (s)')
+    parser.add_argument('--output', help='Fichero JSON con el informe')
+    args = parser.parse_args()
+
+    options = {
+        'base_url': args.base_url,
+        'users': args.users,
+        'sessions': args.sessions,
+        'duration': args.duration,
+        'tasks_per_session': args.tasks_per_session,
+        'think_time': args.think_time_ms / 1000,
+        'timeout': args.timeout
+    }
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes=args.workers) as pool:
+        worker_results = pool.map(run_worker, [options] * args.workers)
+    report = summarize(worker_results, time.perf_counter() - start)
+    report['options'] = {'workers': args.workers, **options}
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    if report['requests'] == 0:
+        print('No se completó ninguna petición.', file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Mide la memoria retenida por tarea (y por usuario) según cómo se decodifican los
+documentos: el diccionario completo que devolvía la consulta sin proyección
+(antes) frente a los registros Task/User con __slots__ construidos a partir de
+la proyección que pide cada función (después).
+
+Uso:
+    python -m benchmarks.record_memory --tasks 100000 --user-tasks 500
+"""
+import argparse
+import gc
+import tracemalloc
+from bson import ObjectId
+from app.logic.records import Task, User
+
+
+def task_document(i, user_id):
+    """
+    Documento de tarea tal y como lo devuelve la base de datos sin proyección.
+    """
+    return {'_id': ObjectId(), 'name': f'Task {i}', 'priority': 'high',
+            'user_email': f'user-{i // 100}@example.com', 'user_id': user_id}
+
+
+def project(document, projection):
+    return {'_id': document['_id'], **{field: document[field] for field in projection}}
+
+
+def retained_bytes(build, count):
+    """
+    Bytes retenidos por elemento tras construir `count` elementos con `build`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    items = build(count)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--user-tasks', type=int, default=500, help='Longitud del array `tasks` de cada usuario')
+    args = parser.parse_args()
+    user_id = ObjectId()
+
+    cases = [
+        ('tarea: dict completo (antes)',
+         lambda n: [task_document(i, user_id) for i in range(n)], args.tasks),
+        ('tarea: Task, todos los campos',
+         lambda n: [Task.from_document(task_document(i, user_id)) for i in range(n)], args.tasks),
+        ('tarea: Task, proyección de listado',
+         lambda n: [Task.from_document(project(task_document(i, user_id), Task.LIST_FIELDS)) for i in range(n)],
+         args.tasks),
+        ('usuario: dict completo (antes)',
+         lambda n: [{'_id': ObjectId(), 'email': f'user-{i}@example.com', 'password': f'hash-{i}',
+                     'tasks': [ObjectId() for _ in range(args.user_tasks)]} for i in range(n)], args.users),
+        ('usuario: User, proyección {_id}',
+         lambda n: [User.from_document({'_id': ObjectId()}) for _ in range(n)], args.users),
+    ]
+    for name, build, count in cases:
+        print(f'{name:38} {retained_bytes(build, count):10.1f} bytes/elemento')
+
+
+if __name__ == '__main__':
+    main()
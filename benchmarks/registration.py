@@ -0,0 +1,133 @@
+"""
+Benchmark del registro de usuarios en el inicio de sesión con Auth0: compara el
+upsert de register_user_logic con el patrón anterior de consulta + inserción.
+
+Para cada variante mide los viajes a la base de datos y la latencia de un primer
+inicio de sesión (el usuario no existe) y de uno repetido (ya existe), y lanza
+inicios de sesión simultáneos del mismo usuario nuevo para contar los errores por
+clave duplicada de la carrera entre la consulta y la inserción.
+
+Uso:
+    python -m benchmarks.registration --users 2000 --output registration.json
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.registration --backend mongo
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.hot_paths import measure
+
+BENCH_DB = 'ToDoRegistrationBenchmark'
+
+
+def legacy_register(database_manager, email):
+    """
+    Registro anterior: consulta si el usuario existe y, si no, lo inserta.
+    """
+    existing = database_manager.select(db_name=None, collection_name='users', query={'email': email},
+                                       projection={'_id': 1}, limit=1)
+    if list(existing):
+        return False
+    database_manager.insert(db_name=None, collection_name='users', data={'email': email, 'password': None})
+    return True
+
+
+def round_trips(function):
+    """
+    Ejecuta `function` y devuelve cuántas llamadas hizo a la base de datos.
+    """
+    from database.request_stats import begin_request_stats, end_request_stats
+    stats, token = begin_request_stats()
+    try:
+        function()
+    finally:
+        end_request_stats(token)
+    return stats.calls
+
+
+def race(register, concurrency):
+    """
+    Registra el mismo email nuevo desde `concurrency` hilos a la vez.
+    :return: Diccionario con los usuarios creados y los errores.
+    """
+    from pymongo.errors import DuplicateKeyError
+    email = f'race-{uuid.uuid4().hex}@example.com'
+    errors = []
+
+    def attempt(_):
+        try:
+            return register(email)
+        except DuplicateKeyError as e:
+            errors.append(str(e))
+            return False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        created = sum(1 for result in pool.map(attempt, range(concurrency)) if result)
+    return {'created': created, 'duplicate_key_errors': len(errors)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('sqlite', 'mongo'), default='sqlite')
+    parser.add_argument('--users', type=int, default=2000, help='Registros medidos por caso')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=16, help='Inicios de sesión simultáneos en la carrera')
+    parser.add_argument('--races', type=int, default=20)
+    parser.add_argument('--output', help='Fichero JSON de resultados (por defecto, la salida estándar)')
+    args = parser.parse_args()
+
+    # La configuración se lee al importar: fijarla antes de importar la aplicación
+    workdir = tempfile.TemporaryDirectory()
+    os.environ['STORAGE_BACKEND'] = args.backend
+    os.environ['SQLITE_PATH'] = os.path.join(workdir.name, 'registration.sqlite3')
+    os.environ['QUERY_CACHE_SIZE'] = '0'
+
+    from database.database_manager import database_manager
+    from app.logic.users_logic import register_user_logic
+    database_manager.default_db_name = BENCH_DB
+    if args.backend == 'mongo':
+        database_manager.get_db().client.drop_database(BENCH_DB)
+    database_manager.ensure_indexes()
+
+    variants = {
+        'select_then_insert': lambda email: legacy_register(database_manager, email),
+        'upsert': register_user_logic,
+    }
+    results = {}
+    try:
+        for name, register in variants.items():
+            emails = [f'{name}-{i}@example.com' for i in range(args.users + args.warmup)]
+            results[name] = {
+                'round_trips_first_login': round_trips(lambda: register(f'{name}-probe@example.com')),
+                'round_trips_repeat_login': round_trips(lambda: register(f'{name}-probe@example.com')),
+                'first_login': measure(lambda i: register(emails[i]), args.users, args.warmup),
+                'repeat_login': measure(lambda i: register(emails[i]), args.users, args.warmup),
+            }
+            races = [race(register, args.concurrency) for _ in range(args.races)]
+            results[name]['race'] = {
+                'duplicate_key_errors': sum(result['duplicate_key_errors'] for result in races),
+                'users_per_race': max(result['created'] for result in races),
+            }
+            result = results[name]
+            print(f"{name:20} viajes {result['round_trips_first_login']}/{result['round_trips_repeat_login']}  "
+                  f"primer login p50 {result['first_login']['p50_ms']:.3f} ms  "
+                  f"repetido p50 {result['repeat_login']['p50_ms']:.3f} ms  "
+                  f"errores en la carrera {result['race']['duplicate_key_errors']}", file=sys.stderr)
+    finally:
+        if args.backend == 'mongo':
+            database_manager.get_db().client.drop_database(BENCH_DB)
+        workdir.cleanup()
+
+    output = json.dumps({'backend': args.backend, 'users': args.users, 'results': results}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark de la búsqueda de tareas (search_tasks y autocomplete_tasks) sobre un
+usuario con muchas tareas (100.000 por defecto), más otros usuarios con tareas
+para que el índice tenga que filtrar por usuario.
+
+Comprueba el p95 de cada caso contra su objetivo de latencia y termina con código 1
+si alguno lo supera. El vocabulario es pequeño a propósito: cada palabra aparece en
+miles de tareas del usuario, que es el peor caso para ordenar por relevancia.
+
+Uso:
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.search --backend mongo
+    python -m benchmarks.search --tasks 100000 --output search.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from benchmarks.hot_paths import measure, SEED_BATCH_SIZE
+
+BENCH_DB = 'ToDoSearchBenchmark'
+BENCH_EMAIL = 'search@example.com'
+# Objetivos de p95 (ms) por motor; None = solo se informa
+TARGETS = {
+    'mongo': {'search': 50.0, 'autocomplete': 10.0},
+    'sqlite': {'search': 250.0, 'autocomplete': 10.0},
+}
+WORDS = ('buy', 'call', 'email', 'fix', 'pay', 'review', 'plan', 'book', 'clean', 'send', 'write', 'read',
+         'milk', 'bank', 'report', 'invoice', 'car', 'garden', 'meeting', 'doctor', 'tickets', 'budget')
+
+
+def task_names(count, seed=42):
+    """
+    Genera nombres de tarea de tres o cuatro palabras con un sufijo numérico único.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        yield f"{' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 4)))} {i}"
+
+
+def seed_tasks(database_manager, tasks_per_user, other_users):
+    """
+    Siembra las tareas del usuario del benchmark y de `other_users` usuarios más.
+    """
+    from app.logic.search_logic import task_name_key
+    owners = [BENCH_EMAIL] + [f'other-{i}@example.com' for i in range(other_users)]
+    for index, email in enumerate(owners):
+        count = tasks_per_user if email == BENCH_EMAIL else max(1, tasks_per_user // 10)
+        batch = []
+        for name in task_names(count, seed=index):
+            batch.append({'name': name, 'name_key': task_name_key(name), 'priority': 'low', 'user_email': email})
+            if len(batch) >= SEED_BATCH_SIZE:
+                database_manager.bulk_insert(None, 'tasks', batch)
+                batch = []
+        database_manager.bulk_insert(None, 'tasks', batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', choices=('sqlite', 'mongo'), default='sqlite')
+    parser.add_argument('--tasks', type=int, default=100000, help='Tareas del usuario del benchmark')
+    parser.add_argument('--other-users', type=int, default=5)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--limit', type=int, default=20, help='Resultados por consulta')
+    parser.add_argument('--search-target-ms', type=float, help='Objetivo de p95 de la búsqueda de texto')
+    parser.add_argument('--autocomplete-target-ms', type=float, help='Objetivo de p95 del autocompletado')
+    parser.add_argument('--output', help='Fichero JSON de resultados (por defecto, la salida estándar)')
+    args = parser.parse_args()
+
+    # La configuración se lee al importar: fijarla antes de importar la aplicación
+    workdir = tempfile.TemporaryDirectory()
+    os.environ['STORAGE_BACKEND'] = args.backend
+    os.environ['SQLITE_PATH'] = os.path.join(workdir.name, 'search.sqlite3')
+    os.environ['QUERY_CACHE_SIZE'] = '0'
+
+    from database.database_manager import database_manager
+    from app.logic.search_logic import search_tasks, autocomplete_tasks
+    database_manager.default_db_name = BENCH_DB
+    if args.backend == 'mongo':
+        database_manager.get_db().client.drop_database(BENCH_DB)
+    database_manager.ensure_indexes()
+
+    targets = dict(TARGETS[args.backend])
+    if args.search_target_ms is not None:
+        targets['search'] = args.search_target_ms
+    if args.autocomplete_target_ms is not None:
+        targets['autocomplete'] = args.autocomplete_target_ms
+
+    rng = random.Random(7)
+    queries = [' '.join(rng.sample(WORDS, 2)) for _ in range(64)]
+    prefixes = [word[:rng.randint(2, len(word))] for word in WORDS]
+    cases = {
+        'search': lambda i: search_tasks(BENCH_EMAIL, queries[i % len(queries)], args.limit),
+        'autocomplete': lambda i: autocomplete_tasks(BENCH_EMAIL, prefixes[i % len(prefixes)], args.limit),
+    }
+
+    results, failures = {}, []
+    try:
+        seed_tasks(database_manager, args.tasks, args.other_users)
+        for name, function in cases.items():
+            result = measure(function, args.iterations, args.warmup)
+            result['target_p95_ms'] = targets[name]
+            results[name] = result
+            print(f'{name:14} p50 {result["p50_ms"]:8.3f} ms  p95 {result["p95_ms"]:8.3f} ms  '
+                  f'objetivo {targets[name] if targets[name] is not None else "-"}', file=sys.stderr)
+            if targets[name] is not None and result['p95_ms'] > targets[name]:
+                failures.append(name)
+    finally:
+        if args.backend == 'mongo':
+            database_manager.get_db().client.drop_database(BENCH_DB)
+        workdir.cleanup()
+
+    output = json.dumps({'backend': args.backend, 'tasks': args.tasks, 'results': results,
+                         'failures': failures}, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if failures:
+        print(f"Objetivo de latencia superado: {', '.join(failures)}", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
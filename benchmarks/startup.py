@@ -0,0 +1,72 @@
+"""
+Mide el coste de arranque de la aplicación: el tiempo de `import app` y el de
+create_app(), cada uno en un intérprete nuevo, y falla si la mediana supera el
+presupuesto. Sirve como comprobación en CI de que el arranque sigue siendo perezoso
+(sin conexión a la base de datos ni registro de Auth0 al importar).
+
+Uso:
+    python -m benchmarks.startup --runs 7 --import-budget-ms 600 --create-app-budget-ms 300
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Se ejecuta en un proceso hijo: mide import y create_app() y comprueba que no se
+# ha creado ningún MongoClient
+PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+from database.database_manager import database_manager
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'db_connected': getattr(database_manager.backend, '_client', None) is not None,
+}))
+"""
+
+
+def measure(runs):
+    """
+    Lanza `runs` procesos nuevos y recoge sus mediciones.
+    :return: Lista de diccionarios con import_ms, create_app_ms y db_connected.
+    """
+    env = dict(os.environ, ENSURE_INDEXES_ON_STARTUP='0')
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--import-budget-ms', type=float,
+                        default=float(os.getenv('STARTUP_IMPORT_BUDGET_MS', 600)))
+    parser.add_argument('--create-app-budget-ms', type=float,
+                        default=float(os.getenv('STARTUP_CREATE_APP_BUDGET_MS', 300)))
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    import_ms = statistics.median(result['import_ms'] for result in results)
+    create_app_ms = statistics.median(result['create_app_ms'] for result in results)
+    connected = any(result['db_connected'] for result in results)
+
+    print(f'import app   : {import_ms:8.1f} ms (presupuesto {args.import_budget_ms:.0f} ms)')
+    print(f'create_app() : {create_app_ms:8.1f} ms (presupuesto {args.create_app_budget_ms:.0f} ms)')
+    print(f'conexión a la base de datos al arrancar: {"sí" if connected else "no"}')
+
+    if import_ms > args.import_budget_ms or create_app_ms > args.create_app_budget_ms or connected:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
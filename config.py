@@ -2,10 +2,46 @@
 import os
 from dotenv import load_dotenv
 
-# Cargar variables de entorno desde el archivo .env
+# Cargar variables de entorno desde el archivo .env (único punto de carga)
 load_dotenv()
 
 class Config:
+    SECRET_KEY = os.getenv('SECRET_KEY')  # Clave para firmar la sesión
+    AUTH0_DOMAIN = os.getenv('AUTH0_DOMAIN')  # Dominio de Auth0
+    AUTH0_CLIENT_ID = os.getenv('AUTH0_CLIENT_ID')  # Client ID de la aplicación en Auth0
+    AUTH0_CLIENT_SECRET = os.getenv('AUTH0_CLIENT_SECRET')  # Client secret de la aplicación en Auth0
+    AUTH0_ISSUER = os.getenv('AUTH0_ISSUER')  # Emisor OIDC (por defecto https://AUTH0_DOMAIN/; p. ej. un proveedor local en pruebas)
+    OIDC_CACHE_DIR = os.getenv('OIDC_CACHE_DIR') or None  # Directorio privado (0700) de la copia en disco del descubrimiento y el JWKS (sin definir = solo en memoria)
+    OIDC_CACHE_TTL = float(os.getenv('OIDC_CACHE_TTL', 3600))  # Segundos de validez del descubrimiento y el JWKS en caché
+    OIDC_HTTP_POOL_SIZE = int(os.getenv('OIDC_HTTP_POOL_SIZE', 10))  # Conexiones keep-alive con el proveedor OIDC
+    OIDC_HTTP_TIMEOUT = float(os.getenv('OIDC_HTTP_TIMEOUT', 5))  # Segundos de espera de cada petición al proveedor
     MONGO_URI = os.getenv('MONGO_URI')  # URI de MongoDB desde las variables de entorno
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))  # Conexiones máximas por servidor de MongoDB
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))  # Espera máxima para encontrar un servidor
+    MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 20000))  # Espera máxima para abrir una conexión
+    MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 0))  # Espera máxima de una operación (0 = sin límite)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 0))  # Espera máxima por una conexión libre del pool (0 = sin límite)
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongo')  # Motor de almacenamiento: 'mongo' o 'sqlite'
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'todo.sqlite3')  # Fichero de la base de datos SQLite
+    ENSURE_INDEXES_ON_STARTUP = os.getenv('ENSURE_INDEXES_ON_STARTUP', '1') == '1'  # Crear índices en segundo plano al arrancar
+    QUERY_CACHE_SIZE = int(os.getenv('QUERY_CACHE_SIZE', 0))  # Consultas en caché por proceso (0 = desactivada)
+    QUERY_CACHE_TTL = float(os.getenv('QUERY_CACHE_TTL', 30))  # Segundos de validez de cada consulta en caché
+    WRITE_BEHIND_WORKERS = int(os.getenv('WRITE_BEHIND_WORKERS', 2))  # Hilos de la escritura diferida (0 = escribir en la petición)
+    WRITE_BEHIND_MAX_SIZE = int(os.getenv('WRITE_BEHIND_MAX_SIZE', 10000))  # Escrituras diferidas pendientes antes de aplicar contrapresión
+    WRITE_BEHIND_BATCH_SIZE = int(os.getenv('WRITE_BEHIND_BATCH_SIZE', 500))  # Escrituras diferidas por lote de bulk_write
+    WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv('WRITE_BEHIND_FLUSH_INTERVAL', 1.0))  # Segundos que una escritura diferida espera a combinarse con otras
+    WRITE_BEHIND_ENQUEUE_TIMEOUT = float(os.getenv('WRITE_BEHIND_ENQUEUE_TIMEOUT', 0.05))  # Espera con la cola llena antes de escribir en la petición
+    WRITE_BEHIND_SHUTDOWN_TIMEOUT = float(os.getenv('WRITE_BEHIND_SHUTDOWN_TIMEOUT', 10))  # Segundos para vaciar la cola al salir
+    ADMIN_EMAILS = {email.strip() for email in os.getenv('ADMIN_EMAILS', '').split(',') if email.strip()}  # Usuarios con acceso a /admin
+    DB_ROUND_TRIP_BUDGET = int(os.getenv('DB_ROUND_TRIP_BUDGET', 5))  # Llamadas a la base de datos por petición antes de avisar (0 = sin límite)
+    DB_ROUND_TRIP_BUDGETS = {'task.import_tasks': 0}  # Presupuestos por endpoint que sustituyen al general
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')  # Método y coste del hash de contraseñas
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))  # Procesos para hashing (0 = en línea)
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 4 or 1))  # Hashes en cola antes de bloquear
+    SESSION_STORE = os.getenv('SESSION_STORE', 'database')  # Almacén de sesiones: 'database' o 'memory' (un solo proceso)
+    SESSION_LIFETIME = int(os.getenv('SESSION_LIFETIME', 7 * 24 * 3600))  # Segundos de inactividad tras los que caduca una sesión
+    SESSION_CACHE_SIZE = int(os.getenv('SESSION_CACHE_SIZE', 1024))  # Sesiones en la caché de lectura por proceso (0 = desactivada)
+    SESSION_CACHE_TTL = float(os.getenv('SESSION_CACHE_TTL', 5))  # Segundos que una sesión leída permanece en caché
+    SESSION_MEMORY_SIZE = int(os.getenv('SESSION_MEMORY_SIZE', 10000))  # Sesiones máximas del almacén en memoria
     UPLOAD_FOLDER = 'app/static/uploads'
     #MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB
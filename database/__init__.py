@@ -1,5 +1 @@
-import os
-from .database_manager import DatabaseManager  # Asegúrate de importar correctamente
-
-# Crear una instancia global de DatabaseManager
-database_manager = DatabaseManager()
\ No newline at end of file
+from .database_manager import DatabaseManager, database_manager  # Instancia global única (ver database_manager.py)
@@ -0,0 +1,19 @@
+from database.backends.base import StorageBackend
+
+
+def create_backend(name: str, **options) -> StorageBackend:
+    """
+    Crea el motor de almacenamiento indicado.
+    :param name: 'mongo' o 'sqlite'.
+    :param options: Opciones del motor ('uri', 'event_listeners' y 'client_options' para mongo,
+                    'path' para sqlite).
+    :return: Instancia del motor.
+    """
+    if name == 'mongo':
+        from database.backends.mongo_backend import MongoBackend
+        return MongoBackend(uri=options.get('uri'), event_listeners=options.get('event_listeners'),
+                            client_options=options.get('client_options'))
+    if name == 'sqlite':
+        from database.backends.sqlite_backend import SqliteBackend
+        return SqliteBackend(path=options.get('path') or 'todo.sqlite3')
+    raise ValueError(f"Backend de almacenamiento desconocido: {name!r}")
@@ -0,0 +1,120 @@
+class StorageBackend:
+    """
+    Interfaz de los motores de almacenamiento de DatabaseManager.
+
+    Las consultas se expresan con el subconjunto de filtros de MongoDB que usa la
+    aplicación: igualdad por campo, comparaciones ($gt, $gte, $lt, $lte), $and,
+    proyección, orden y límite. Cada motor traduce ese subconjunto a su propio
+    lenguaje y lanza NotImplementedError ante cualquier otra construcción.
+    """
+
+    name = None
+
+    def get_db(self, db_name: str):
+        """
+        Devuelve el objeto de base de datos nativo del motor, si lo tiene.
+        """
+        raise NotImplementedError(f"El backend {self.name} no expone una base de datos nativa.")
+
+    def create_indexes(self, db_name: str, indexes: dict) -> list:
+        """
+        Crea de forma idempotente los índices declarados.
+        :param indexes: Diccionario colección -> lista de (claves, opciones).
+        :return: Nombres de los índices asegurados.
+        """
+        raise NotImplementedError
+
+    def explain(self, db_name: str, collection_name: str, query: dict, sort: list = None) -> dict:
+        """
+        Devuelve el plan de ejecución de una consulta.
+        :return: Diccionario con 'stages' (lista de etapas), 'collscan' (bool) e
+                 'in_memory_sort' (bool: el orden no sale de un índice).
+        """
+        raise NotImplementedError
+
+    def find(self, db_name: str, collection_name: str, query: dict, projection: dict = None,
+             sort: list = None, limit: int = None, raw: bool = False):
+        """
+        Devuelve un iterable con los documentos que coinciden con la consulta.
+        :param sort: Lista de tuplas (campo, dirección).
+        """
+        raise NotImplementedError
+
+    def text_search(self, db_name: str, collection_name: str, query: dict, text: str, fields: list,
+                    projection: dict = None, limit: int = None) -> list:
+        """
+        Busca documentos que contienen alguna de las palabras de `text` en los campos
+        del índice de texto, ordenados por relevancia.
+        :param query: Filtro adicional (p. ej. el usuario dueño).
+        :param fields: Campos indexados como texto.
+        :return: Lista de documentos, cada uno con su relevancia en 'score'.
+        """
+        raise NotImplementedError
+
+    def insert_one(self, db_name: str, collection_name: str, document: dict):
+        """
+        Inserta un documento (asignándole `_id` si no lo tiene).
+        :return: `_id` del documento insertado.
+        """
+        raise NotImplementedError
+
+    def insert_many(self, db_name: str, collection_name: str, documents: list, ordered: bool) -> dict:
+        """
+        Inserta un lote de documentos.
+        :return: Diccionario con 'inserted' y 'errors' (lista de {'index', 'error'}).
+        """
+        raise NotImplementedError
+
+    def update_one(self, db_name: str, collection_name: str, query: dict, set_data: dict) -> int:
+        """
+        Asigna los campos de `set_data` al primer documento que coincide.
+        :return: Número de documentos modificados.
+        """
+        raise NotImplementedError
+
+    def find_one_and_update(self, db_name: str, collection_name: str, query: dict, update: dict,
+                            projection: dict = None):
+        """
+        Aplica operadores de actualización de forma atómica al primer documento que coincide.
+        :return: Documento previo a la actualización, o None si no existe.
+        """
+        raise NotImplementedError
+
+    def upsert_one(self, db_name: str, collection_name: str, query: dict, update: dict) -> dict:
+        """
+        Aplica operadores de actualización al primer documento que coincide o, si no hay
+        ninguno, crea uno a partir de las igualdades del filtro y de $set/$setOnInsert.
+        Es atómico: dos upserts concurrentes con el mismo filtro no crean dos documentos
+        si un índice único lo impide.
+        :return: Diccionario con 'matched', 'modified' y 'upserted_id' (None si ya existía).
+        """
+        raise NotImplementedError
+
+    def update_many(self, db_name: str, collection_name: str, query: dict, update: dict) -> int:
+        """
+        Aplica operadores de actualización a todos los documentos que coinciden.
+        :return: Número de documentos modificados.
+        """
+        raise NotImplementedError
+
+    def bulk_write(self, db_name: str, collection_name: str, operations: list, ordered: bool) -> dict:
+        """
+        Ejecuta un lote de operaciones {'update_one': {'query', 'update'}} y
+        {'delete_one': {'query'}} en un único viaje a la base de datos.
+        :return: Diccionario con 'matched', 'modified', 'deleted' y 'errors' (lista de {'index', 'error'}).
+        """
+        raise NotImplementedError
+
+    def delete_one(self, db_name: str, collection_name: str, query: dict) -> int:
+        """
+        Elimina el primer documento que coincide.
+        :return: Número de documentos eliminados.
+        """
+        raise NotImplementedError
+
+    def delete_many(self, db_name: str, collection_name: str, query: dict) -> int:
+        """
+        Elimina todos los documentos que coinciden.
+        :return: Número de documentos eliminados.
+        """
+        raise NotImplementedError
@@ -0,0 +1,146 @@
+import os
+import threading
+import certifi
+from pymongo import UpdateOne, DeleteOne
+from pymongo.mongo_client import MongoClient
+from pymongo.errors import BulkWriteError
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from database.backends.base import StorageBackend
+from database.indexes import plan_stages
+
+
+class MongoBackend(StorageBackend):
+    """
+    Motor de almacenamiento sobre MongoDB (pymongo).
+    """
+
+    name = 'mongo'
+
+    def __init__(self, uri: str = None, event_listeners: list = None, client_options: dict = None):
+        """
+        Constructor de la clase. No abre ninguna conexión: el MongoClient se crea
+        en el primer uso.
+        :param uri: URI de conexión a MongoDB.
+        :param event_listeners: Listeners de monitorización de pymongo (comandos, pool...).
+        :param client_options: Opciones adicionales del MongoClient (maxPoolSize, timeouts...).
+        """
+        self.uri = uri
+        self.event_listeners = list(event_listeners or [])
+        self.client_options = {'serverSelectionTimeoutMS': 5000, **(client_options or {})}
+        self._client = None
+        self._client_pid = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        """
+        MongoClient del proceso actual. Se crea en el primer uso y se vuelve a crear
+        si el proceso cambió (un MongoClient heredado de un fork no es seguro).
+        """
+        if self._client is None or self._client_pid != os.getpid():
+            with self._lock:
+                if self._client is None or self._client_pid != os.getpid():
+                    self._client = MongoClient(self.uri, tlsCAFile=certifi.where(),
+                                               event_listeners=self.event_listeners, **self.client_options)
+                    self._client_pid = os.getpid()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+        self._client_pid = os.getpid()
+
+    def get_db(self, db_name: str):
+        return self.client[db_name]
+
+    def create_indexes(self, db_name: str, indexes: dict) -> list:
+        created = []
+        db = self.get_db(db_name)
+        for collection_name, collection_indexes in indexes.items():
+            for keys, options in collection_indexes:
+                created.append(db[collection_name].create_index(keys, **options))
+        return created
+
+    def explain(self, db_name: str, collection_name: str, query: dict, sort: list = None) -> dict:
+        cursor = self.get_db(db_name)[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = plan_stages(cursor.explain()['queryPlanner']['winningPlan'])
+        return {'stages': stages, 'collscan': 'COLLSCAN' in stages, 'in_memory_sort': 'SORT' in stages}
+
+    def find(self, db_name: str, collection_name: str, query: dict, projection: dict = None,
+             sort: list = None, limit: int = None, raw: bool = False):
+        collection = self.get_db(db_name)[collection_name]
+        if raw:
+            collection = collection.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+        cursor = collection.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    def text_search(self, db_name: str, collection_name: str, query: dict, text: str, fields: list,
+                    projection: dict = None, limit: int = None) -> list:
+        score = {'$meta': 'textScore'}
+        cursor = self.get_db(db_name)[collection_name].find(
+            {**query, '$text': {'$search': text}}, {**(projection or {}), 'score': score}
+        ).sort([('score', score)])
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        return list(cursor)
+
+    def insert_one(self, db_name: str, collection_name: str, document: dict):
+        return self.get_db(db_name)[collection_name].insert_one(document).inserted_id
+
+    def insert_many(self, db_name: str, collection_name: str, documents: list, ordered: bool) -> dict:
+        collection = self.get_db(db_name)[collection_name]
+        try:
+            result = collection.insert_many(documents, ordered=ordered)
+            return {'inserted': len(result.inserted_ids), 'errors': []}
+        except BulkWriteError as e:
+            details = e.details
+            errors = [{'index': error['index'], 'error': error['errmsg']}
+                      for error in details.get('writeErrors', [])]
+            return {'inserted': details.get('nInserted', 0), 'errors': errors}
+
+    def update_one(self, db_name: str, collection_name: str, query: dict, set_data: dict) -> int:
+        return self.get_db(db_name)[collection_name].update_one(query, {'$set': set_data}).modified_count
+
+    def find_one_and_update(self, db_name: str, collection_name: str, query: dict, update: dict,
+                            projection: dict = None):
+        return self.get_db(db_name)[collection_name].find_one_and_update(query, update, projection=projection)
+
+    def upsert_one(self, db_name: str, collection_name: str, query: dict, update: dict) -> dict:
+        result = self.get_db(db_name)[collection_name].update_one(query, update, upsert=True)
+        return {'matched': result.matched_count, 'modified': result.modified_count,
+                'upserted_id': result.upserted_id}
+
+    def update_many(self, db_name: str, collection_name: str, query: dict, update: dict) -> int:
+        return self.get_db(db_name)[collection_name].update_many(query, update).modified_count
+
+    def bulk_write(self, db_name: str, collection_name: str, operations: list, ordered: bool) -> dict:
+        requests = []
+        for operation in operations:
+            if 'update_one' in operation:
+                requests.append(UpdateOne(operation['update_one']['query'], operation['update_one']['update']))
+            else:
+                requests.append(DeleteOne(operation['delete_one']['query']))
+        collection = self.get_db(db_name)[collection_name]
+        try:
+            result = collection.bulk_write(requests, ordered=ordered)
+            return {'matched': result.matched_count, 'modified': result.modified_count,
+                    'deleted': result.deleted_count, 'errors': []}
+        except BulkWriteError as e:
+            details = e.details
+            errors = [{'index': error['index'], 'error': error['errmsg']}
+                      for error in details.get('writeErrors', [])]
+            return {'matched': details.get('nMatched', 0), 'modified': details.get('nModified', 0),
+                    'deleted': details.get('nRemoved', 0), 'errors': errors}
+
+    def delete_one(self, db_name: str, collection_name: str, query: dict) -> int:
+        return self.get_db(db_name)[collection_name].delete_one(query).deleted_count
+
+    def delete_many(self, db_name: str, collection_name: str, query: dict) -> int:
+        return self.get_db(db_name)[collection_name].delete_many(query).deleted_count
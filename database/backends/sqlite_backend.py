@@ -0,0 +1,510 @@
+import os
+import re
+import sqlite3
+import threading
+from bson import ObjectId, json_util
+from pymongo.errors import DuplicateKeyError
+from database.backends.base import StorageBackend
+
+# Operadores de comparación soportados y su equivalente en SQL
+COMPARISON_OPERATORS = {'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}
+
+# Palabras de una búsqueda de texto
+_WORD = re.compile(r'\w+')
+
+# Nombres de campo que se pueden incrustar en una ruta JSON (las rutas deben ser
+# literales para que SQLite pueda usar los índices de expresión)
+_FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$')
+
+
+def _dumps(value):
+    """
+    Serializa un valor a JSON compacto, con ObjectId y fechas en formato Extended JSON.
+    """
+    return json_util.dumps(value, separators=(',', ':'))
+
+
+def _sql_value(value):
+    """
+    Convierte un valor de un filtro al valor que devuelve json_extract() para ese campo:
+    los escalares se comparan tal cual y el resto (ObjectId, fechas...) como JSON compacto.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return _dumps(value)
+
+
+def _decode_id(value):
+    """
+    Reconstruye el `_id` guardado como texto.
+    """
+    return ObjectId(value) if ObjectId.is_valid(value) and len(value) == 24 else value
+
+
+def _project(document, projection):
+    """
+    Aplica una proyección de MongoDB (de inclusión o de exclusión) sobre campos de primer nivel.
+    """
+    if not projection:
+        return document
+    included = [field for field, value in projection.items() if value and field != '_id']
+    if included or all(projection.values()):
+        result = {field: document[field] for field in included if field in document}
+        if projection.get('_id', 1) and '_id' in document:
+            result['_id'] = document['_id']
+        return result
+    return {field: value for field, value in document.items() if projection.get(field, 1)}
+
+
+def _apply_update(document, update, inserting=False):
+    """
+    Aplica operadores de actualización ($set, $setOnInsert, $unset, $inc, $push, $pull) a un documento.
+    :param inserting: Si el documento lo crea un upsert; si no, $setOnInsert no tiene efecto.
+    """
+    for operator, fields in update.items():
+        if operator == '$setOnInsert' and not inserting:
+            continue
+        for field, value in fields.items():
+            if operator in ('$set', '$setOnInsert'):
+                document[field] = value
+            elif operator == '$unset':
+                document.pop(field, None)
+            elif operator == '$inc':
+                document[field] = document.get(field, 0) + value
+            elif operator == '$push':
+                values = value['$each'] if isinstance(value, dict) and '$each' in value else [value]
+                document.setdefault(field, []).extend(values)
+            elif operator == '$pull':
+                removed = value['$in'] if isinstance(value, dict) and '$in' in value else [value]
+                document[field] = [item for item in document.get(field, []) if item not in removed]
+            else:
+                raise NotImplementedError(f"Operador de actualización no soportado por SQLite: {operator}")
+    return document
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Motor de almacenamiento embebido sobre SQLite en modo WAL.
+
+    Cada colección es una tabla (_id TEXT PRIMARY KEY, doc TEXT) con el documento en
+    JSON. Los índices declarados se crean como índices de expresión sobre
+    json_extract(), y las consultas usan siempre sentencias parametrizadas, que el
+    módulo sqlite3 mantiene preparadas en su caché de sentencias.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path: str = 'todo.sqlite3'):
+        """
+        Constructor de la clase.
+        :param path: Ruta del fichero de la base de datos.
+        """
+        self.path = path
+        self._local = threading.local()
+        self._tables = set()
+        self._tables_lock = threading.Lock()
+
+    def _connection(self):
+        """
+        Devuelve la conexión del hilo actual (sqlite3 no comparte conexiones entre
+        hilos), creándola de nuevo también tras un fork.
+        """
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, isolation_level=None, cached_statements=256, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    @staticmethod
+    def _table(db_name, collection_name):
+        return f'"{db_name}.{collection_name}"'
+
+    def _ensure_table(self, db_name, collection_name):
+        """
+        Crea la tabla de la colección la primera vez que se usa.
+        """
+        table = self._table(db_name, collection_name)
+        if table not in self._tables:
+            with self._tables_lock:
+                self._connection().execute(
+                    f'CREATE TABLE IF NOT EXISTS {table} (_id TEXT PRIMARY KEY, doc TEXT NOT NULL)'
+                )
+                self._tables.add(table)
+        return table
+
+    @staticmethod
+    def _column(field):
+        """
+        Expresión SQL de un campo del documento.
+        """
+        if field == '_id':
+            return '_id'
+        if not _FIELD_NAME.match(field):
+            raise NotImplementedError(f"Nombre de campo no soportado por SQLite: {field!r}")
+        return f"json_extract(doc, '$.{field}')"
+
+    @staticmethod
+    def _param(field, value):
+        return str(value) if field == '_id' else _sql_value(value)
+
+    def _where(self, query):
+        """
+        Traduce un filtro de MongoDB a una cláusula WHERE parametrizada.
+        :return: Tupla (sql, parámetros).
+        """
+        clauses, params = [], []
+        for field, value in query.items():
+            if field == '$and':
+                for sub_query in value:
+                    sql, sub_params = self._where(sub_query)
+                    clauses.append(f'({sql})')
+                    params.extend(sub_params)
+                continue
+            if field == '$or':
+                alternatives = []
+                for sub_query in value:
+                    sql, sub_params = self._where(sub_query)
+                    alternatives.append(f'({sql})')
+                    params.extend(sub_params)
+                clauses.append(f"({' OR '.join(alternatives) or '0'})")
+                continue
+            if field.startswith('$'):
+                raise NotImplementedError(f"Operador no soportado por SQLite: {field}")
+
+            column = self._column(field)
+            if isinstance(value, dict) and any(str(key).startswith('$') for key in value):
+                for operator, operand in value.items():
+                    if operator == '$in':
+                        values = list(operand)
+                        clauses.append(f"{column} IN ({', '.join('?' * len(values))})" if values else '0')
+                        params.extend(self._param(field, item) for item in values)
+                        continue
+                    if operator not in COMPARISON_OPERATORS:
+                        raise NotImplementedError(f"Operador no soportado por SQLite: {operator}")
+                    clauses.append(f'{column} {COMPARISON_OPERATORS[operator]} ?')
+                    params.append(self._param(field, operand))
+            elif value is None:
+                clauses.append(f'{column} IS NULL')
+            else:
+                clauses.append(f'{column} = ?')
+                params.append(self._param(field, value))
+        return ' AND '.join(clauses) or '1', params
+
+    def _select_sql(self, table, query, sort=None, limit=None):
+        where, params = self._where(query)
+        sql = f'SELECT _id, doc FROM {table} WHERE {where}'
+        if sort:
+            order = ', '.join(f"{self._column(field)} {'DESC' if direction < 0 else 'ASC'}"
+                              for field, direction in sort)
+            sql += f' ORDER BY {order}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+    @staticmethod
+    def _decode(row):
+        document = {'_id': _decode_id(row[0])}
+        document.update(json_util.loads(row[1]))
+        return document
+
+    @staticmethod
+    def _encode(document):
+        return str(document['_id']), _dumps({key: value for key, value in document.items() if key != '_id'})
+
+    def create_indexes(self, db_name: str, indexes: dict) -> list:
+        created = []
+        connection = self._connection()
+        for collection_name, collection_indexes in indexes.items():
+            table = self._ensure_table(db_name, collection_name)
+            for keys, options in collection_indexes:
+                # Los índices de texto de MongoDB se crean como tablas FTS5; los campos de
+                # igualdad que los preceden se filtran en la consulta
+                if any(not isinstance(direction, int) for _, direction in keys):
+                    self._text_table(db_name, collection_name,
+                                     [field for field, direction in keys if not isinstance(direction, int)])
+                    created.append(options.get('name'))
+                    continue
+                name = options.get('name') or '_'.join(f'{field}_{direction}' for field, direction in keys)
+                columns = ', '.join(f"{self._column(field)} {'DESC' if direction < 0 else 'ASC'}"
+                                    for field, direction in keys)
+                unique = 'UNIQUE ' if options.get('unique') else ''
+                connection.execute(
+                    f'CREATE {unique}INDEX IF NOT EXISTS "{db_name}.{collection_name}.{name}" ON {table} ({columns})'
+                )
+                created.append(name)
+        return created
+
+    def explain(self, db_name: str, collection_name: str, query: dict, sort: list = None) -> dict:
+        table = self._ensure_table(db_name, collection_name)
+        sql, params = self._select_sql(table, query, sort)
+        stages = [row[3] for row in self._connection().execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+        collscan = any(stage.startswith('SCAN') and 'USING' not in stage for stage in stages)
+        in_memory_sort = any('TEMP B-TREE' in stage for stage in stages)
+        return {'stages': stages, 'collscan': collscan, 'in_memory_sort': in_memory_sort}
+
+    def find(self, db_name: str, collection_name: str, query: dict, projection: dict = None,
+             sort: list = None, limit: int = None, raw: bool = False):
+        table = self._ensure_table(db_name, collection_name)
+        sql, params = self._select_sql(table, query, sort, limit)
+
+        # La consulta se ejecuta al empezar a iterar, con la conexión del hilo que consume
+        # los resultados (una respuesta en streaming puede recorrerse en otro hilo)
+        def documents():
+            for row in self._connection().execute(sql, params):
+                yield _project(self._decode(row), projection)
+        return documents()
+
+    def _text_table(self, db_name, collection_name, fields):
+        """
+        Crea la primera vez la tabla FTS5 que hace de índice de texto de la colección.
+        Es una tabla sin contenido propio (content=''), enlazada por rowid con la tabla
+        de documentos y mantenida por triggers en cada inserción, actualización y
+        borrado. Si se crea sobre una colección con datos, se rellena con ellos.
+        :return: Tupla (tabla de documentos, tabla FTS5).
+        """
+        table = self._ensure_table(db_name, collection_name)
+        name = f'{db_name}.{collection_name}.text'
+        text_table = f'"{name}"'
+        if text_table in self._tables:
+            return table, text_table
+        for field in fields:
+            self._column(field)  # Valida el nombre del campo
+        columns = ', '.join(f'"{field}"' for field in fields)
+
+        def values(row):
+            return ', '.join(f"json_extract({row}.doc, '$.{field}')" for field in fields)
+
+        with self._tables_lock:
+            connection = self._connection()
+            exists = connection.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+            if not exists:
+                connection.execute('BEGIN IMMEDIATE')
+                try:
+                    connection.execute(f"CREATE VIRTUAL TABLE {text_table} USING fts5({columns}, content='')")
+                    connection.execute(f'INSERT INTO {text_table} (rowid, {columns}) '
+                                       f'SELECT rowid, {values(table)} FROM {table}')
+                    insert = f'INSERT INTO {text_table} (rowid, {columns}) VALUES (new.rowid, {values("new")});'
+                    delete = (f"INSERT INTO {text_table} ({text_table}, rowid, {columns}) "
+                              f"VALUES ('delete', old.rowid, {values('old')});")
+                    # Las actualizaciones solo reindexan si cambia algún campo de texto
+                    changed = ' OR '.join(
+                        f"json_extract(old.doc, '$.{field}') IS NOT json_extract(new.doc, '$.{field}')"
+                        for field in fields
+                    )
+                    for event, condition, body in (('INSERT', '', insert), ('DELETE', '', delete),
+                                                   ('UPDATE', f' WHEN {changed}', delete + insert)):
+                        connection.execute(f'CREATE TRIGGER "{name}.{event.lower()}" AFTER {event} ON {table}'
+                                           f'{condition} BEGIN {body} END')
+                    connection.execute('COMMIT')
+                except BaseException:
+                    connection.execute('ROLLBACK')
+                    raise
+            self._tables.add(text_table)
+        return table, text_table
+
+    def text_search(self, db_name: str, collection_name: str, query: dict, text: str, fields: list,
+                    projection: dict = None, limit: int = None) -> list:
+        # Como $text en MongoDB: basta con que aparezca una de las palabras. La relevancia
+        # es BM25 (cambiada de signo para que, como textScore, más alto sea mejor)
+        terms = _WORD.findall(text)
+        if not terms or not fields:
+            return []
+        table, text_table = self._text_table(db_name, collection_name, fields)
+        where, params = self._where(query)
+        sql = (f'SELECT {table}._id, {table}.doc, bm25({text_table}) AS rank FROM {text_table} '
+               f'JOIN {table} ON {table}.rowid = {text_table}.rowid '
+               f'WHERE {text_table} MATCH ? AND ({where}) ORDER BY rank')
+        params.insert(0, ' OR '.join(f'"{term}"' for term in terms))
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [dict(_project(self._decode(row), projection), score=-row[2])
+                for row in self._connection().execute(sql, params)]
+
+    def insert_one(self, db_name: str, collection_name: str, document: dict):
+        table = self._ensure_table(db_name, collection_name)
+        document.setdefault('_id', ObjectId())
+        try:
+            self._connection().execute(f'INSERT INTO {table} (_id, doc) VALUES (?, ?)', self._encode(document))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e))
+        return document['_id']
+
+    def insert_many(self, db_name: str, collection_name: str, documents: list, ordered: bool) -> dict:
+        table = self._ensure_table(db_name, collection_name)
+        connection = self._connection()
+        inserted, errors = 0, []
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for index, document in enumerate(documents):
+                document.setdefault('_id', ObjectId())
+                try:
+                    connection.execute(f'INSERT INTO {table} (_id, doc) VALUES (?, ?)', self._encode(document))
+                    inserted += 1
+                except sqlite3.IntegrityError as e:
+                    errors.append({'index': index, 'error': str(e)})
+                    if ordered:
+                        break
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return {'inserted': inserted, 'errors': errors}
+
+    def _modify_first(self, db_name, collection_name, query, modify):
+        """
+        Lee y reescribe el primer documento que coincide dentro de una transacción
+        BEGIN IMMEDIATE, que toma el bloqueo de escritura antes de leer.
+        :param modify: Función que recibe una copia del documento y devuelve el nuevo.
+        :return: Documento previo, o None si no hay coincidencias.
+        """
+        table = self._ensure_table(db_name, collection_name)
+        connection = self._connection()
+        sql, params = self._select_sql(table, query, limit=1)
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(sql, params).fetchone()
+            if row is None:
+                connection.execute('COMMIT')
+                return None
+            previous = self._decode(row)
+            updated = modify(self._decode(row))
+            connection.execute(f'UPDATE {table} SET doc = ? WHERE _id = ?',
+                               (self._encode(updated)[1], row[0]))
+            connection.execute('COMMIT')
+        except sqlite3.IntegrityError as e:
+            connection.execute('ROLLBACK')
+            raise DuplicateKeyError(str(e))
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return previous
+
+    def update_one(self, db_name: str, collection_name: str, query: dict, set_data: dict) -> int:
+        changed = []
+
+        def modify(document):
+            updated = _apply_update(dict(document), {'$set': set_data})
+            changed.append(updated != document)
+            return updated
+
+        self._modify_first(db_name, collection_name, query, modify)
+        return 1 if changed and changed[0] else 0
+
+    def upsert_one(self, db_name: str, collection_name: str, query: dict, update: dict) -> dict:
+        table = self._ensure_table(db_name, collection_name)
+        connection = self._connection()
+        sql, params = self._select_sql(table, query, limit=1)
+        # BEGIN IMMEDIATE toma el bloqueo de escritura antes de leer: otro upsert con el
+        # mismo filtro espera y encuentra el documento ya creado
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(sql, params).fetchone()
+            if row is None:
+                # Como en MongoDB, el documento nuevo parte de las igualdades del filtro
+                document = {field: value for field, value in query.items() if not field.startswith('$')
+                            and not (isinstance(value, dict) and any(str(key).startswith('$') for key in value))}
+                document = _apply_update(document, update, inserting=True)
+                document.setdefault('_id', ObjectId())
+                connection.execute(f'INSERT INTO {table} (_id, doc) VALUES (?, ?)', self._encode(document))
+                result = {'matched': 0, 'modified': 0, 'upserted_id': document['_id']}
+            else:
+                document = self._decode(row)
+                updated = _apply_update(self._decode(row), update)
+                modified = updated != document
+                if modified:
+                    connection.execute(f'UPDATE {table} SET doc = ? WHERE _id = ?',
+                                       (self._encode(updated)[1], row[0]))
+                result = {'matched': 1, 'modified': int(modified), 'upserted_id': None}
+            connection.execute('COMMIT')
+        except sqlite3.IntegrityError as e:
+            connection.execute('ROLLBACK')
+            raise DuplicateKeyError(str(e))
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return result
+
+    def find_one_and_update(self, db_name: str, collection_name: str, query: dict, update: dict,
+                            projection: dict = None):
+        previous = self._modify_first(db_name, collection_name, query,
+                                      lambda document: _apply_update(document, update))
+        return _project(previous, projection) if previous is not None else None
+
+    def update_many(self, db_name: str, collection_name: str, query: dict, update: dict) -> int:
+        table = self._ensure_table(db_name, collection_name)
+        connection = self._connection()
+        sql, params = self._select_sql(table, query)
+        modified = 0
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for row in connection.execute(sql, params).fetchall():
+                document = self._decode(row)
+                updated = _apply_update(self._decode(row), update)
+                if updated != document:
+                    connection.execute(f'UPDATE {table} SET doc = ? WHERE _id = ?',
+                                       (self._encode(updated)[1], row[0]))
+                    modified += 1
+            connection.execute('COMMIT')
+        except sqlite3.IntegrityError as e:
+            connection.execute('ROLLBACK')
+            raise DuplicateKeyError(str(e))
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return modified
+
+    def bulk_write(self, db_name: str, collection_name: str, operations: list, ordered: bool) -> dict:
+        table = self._ensure_table(db_name, collection_name)
+        connection = self._connection()
+        result = {'matched': 0, 'modified': 0, 'deleted': 0, 'errors': []}
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            for index, operation in enumerate(operations):
+                try:
+                    if 'update_one' in operation:
+                        sql, params = self._select_sql(table, operation['update_one']['query'], limit=1)
+                        row = connection.execute(sql, params).fetchone()
+                        if row is None:
+                            continue
+                        result['matched'] += 1
+                        document = self._decode(row)
+                        updated = _apply_update(self._decode(row), operation['update_one']['update'])
+                        if updated != document:
+                            connection.execute(f'UPDATE {table} SET doc = ? WHERE _id = ?',
+                                               (self._encode(updated)[1], row[0]))
+                            result['modified'] += 1
+                    else:
+                        where, params = self._where(operation['delete_one']['query'])
+                        result['deleted'] += connection.execute(
+                            f'DELETE FROM {table} WHERE _id = (SELECT _id FROM {table} WHERE {where} LIMIT 1)',
+                            params
+                        ).rowcount
+                except sqlite3.IntegrityError as e:
+                    result['errors'].append({'index': index, 'error': str(e)})
+                    if ordered:
+                        break
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return result
+
+    def delete_one(self, db_name: str, collection_name: str, query: dict) -> int:
+        table = self._ensure_table(db_name, collection_name)
+        where, params = self._where(query)
+        cursor = self._connection().execute(
+            f'DELETE FROM {table} WHERE _id = (SELECT _id FROM {table} WHERE {where} LIMIT 1)', params
+        )
+        return cursor.rowcount
+
+    def delete_many(self, db_name: str, collection_name: str, query: dict) -> int:
+        table = self._ensure_table(db_name, collection_name)
+        where, params = self._where(query)
+        return self._connection().execute(f'DELETE FROM {table} WHERE {where}', params).rowcount
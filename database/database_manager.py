@@ -1,32 +1,94 @@
-import os
-from pymongo.mongo_client import MongoClient
-from dotenv import load_dotenv
-from ssl import CERT_NONE
-import certifi
-
-# Cargar variables de entorno del archivo .env
-load_dotenv()
+from pymongo import ASCENDING, TEXT
+from bson import ObjectId
+from config import Config
+from database.backends import StorageBackend, create_backend
+from database.indexes import INDEXES, QUERY_SHAPES
+from database.query_cache import QueryCache
+from database.metrics import DatabaseMetrics
+from database.request_stats import track_db_call, track_db_iteration
 
 class DatabaseManager:
     """
-    Clase que gestiona operaciones en la base de datos MongoDB.
+    Clase que gestiona operaciones en la base de datos. Las consultas usan la
+    sintaxis de MongoDB y se delegan en un motor de almacenamiento
+    (`database.backends`): MongoDB por defecto o SQLite embebido.
     """
 
-    def __init__(self):
+    def __init__(self, cache_size: int = None, cache_ttl: float = None, backend: StorageBackend = None):
         """
         Constructor de la clase.
+        :param backend: Motor de almacenamiento (por defecto, el indicado por STORAGE_BACKEND).
+        :param cache_size: Número máximo de consultas en la caché de lectura
+                           (por defecto QUERY_CACHE_SIZE; 0 la desactiva).
+        :param cache_ttl: Segundos de validez de cada consulta en caché
+                          (por defecto QUERY_CACHE_TTL).
         """
-        self.client = MongoClient(os.getenv('MONGO_URI'), tlsCAFile=certifi.where(), serverSelectionTimeoutMS=5000)
+        self.metrics = DatabaseMetrics(max_pool_size=Config.MONGO_MAX_POOL_SIZE)
+        if backend is None:
+            backend = create_backend(Config.STORAGE_BACKEND, uri=Config.MONGO_URI, path=Config.SQLITE_PATH,
+                                     event_listeners=self.metrics.listeners(),
+                                     client_options=self.mongo_client_options())
+        self.backend = backend
         self.default_db_name = 'ToDo'  # Nombre de la base de datos predeterminada
 
+        if cache_size is None:
+            cache_size = Config.QUERY_CACHE_SIZE
+        if cache_ttl is None:
+            cache_ttl = Config.QUERY_CACHE_TTL
+        self.cache = QueryCache(cache_size, cache_ttl) if cache_size > 0 else None
+
+    @staticmethod
+    def mongo_client_options() -> dict:
+        """
+        Opciones del MongoClient (tamaño del pool y timeouts) tomadas de Config.
+        Un timeout de 0 significa sin límite.
+        """
+        return {
+            'maxPoolSize': Config.MONGO_MAX_POOL_SIZE,
+            'serverSelectionTimeoutMS': Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            'connectTimeoutMS': Config.MONGO_CONNECT_TIMEOUT_MS,
+            'socketTimeoutMS': Config.MONGO_SOCKET_TIMEOUT_MS or None,
+            'waitQueueTimeoutMS': Config.MONGO_WAIT_QUEUE_TIMEOUT_MS or None
+        }
+
+    @property
+    def client(self):
+        """
+        Cliente nativo del motor de almacenamiento (MongoClient con el motor de MongoDB).
+        """
+        return self.backend.client
+
     def get_db(self, db_name=None):
         """
         Configuración para devolver la instancia de la base de datos.
+        Solo disponible con el motor de MongoDB.
+        :param db_name: Nombre de la base de datos (si es None, usa la predeterminada).
+        """
+        return self.backend.get_db(db_name or self.default_db_name)
+
+    def ensure_indexes(self, db_name: str = None) -> list:
+        """
+        Crea los índices declarados en `database.indexes.INDEXES`.
+        La creación es idempotente: si el índice ya existe no se modifica.
+        :param db_name: Nombre de la base de datos (si es None, usa la predeterminada).
+        :return: Nombres de los índices asegurados.
+        """
+        return self.backend.create_indexes(db_name or self.default_db_name, INDEXES)
+
+    def explain_query_shapes(self, db_name: str = None) -> list:
+        """
+        Obtiene el plan de ejecución de cada forma de consulta registrada en
+        `database.indexes.QUERY_SHAPES`.
         :param db_name: Nombre de la base de datos (si es None, usa la predeterminada).
+        :return: Lista de diccionarios con el nombre, las etapas del plan, si recorre
+                 la colección completa ('collscan') y si ordena en memoria ('in_memory_sort').
         """
-        if db_name is None:
-            db_name = self.default_db_name
-        return self.client[db_name]
+        report = []
+        for shape in QUERY_SHAPES:
+            plan = self.backend.explain(db_name or self.default_db_name, shape['collection'],
+                                        shape['query'], shape.get('sort'))
+            report.append({'name': shape['name'], **plan})
+        return report
 
     def insert(self, db_name: str, collection_name: str, data: dict) -> str:
         """
@@ -36,21 +98,94 @@ class DatabaseManager:
         :param data: Datos a insertar en la colección.
         :return: ID del documento insertado.
         """
-        collection = self.get_db(db_name)[collection_name]
-        result = collection.insert_one(data)
-        return str(result.inserted_id)
+        with track_db_call('insert', collection_name):
+            inserted_id = self.backend.insert_one(db_name or self.default_db_name, collection_name, data)
+        self._invalidate(db_name, collection_name, data)
+        return str(inserted_id)
 
-    def select(self, db_name: str, collection_name: str, query: dict, projection: dict = None):
+    def bulk_insert(self, db_name: str, collection_name: str, documents: list, ordered: bool = False) -> dict:
+        """
+        Método para insertar un lote de documentos en un único viaje a la base de datos.
+        :param db_name: Nombre de la base de datos
+        :param collection_name: Nombre de la colección en la que se realizará la inserción.
+        :param documents: Lista de documentos a insertar.
+        :param ordered: Si es True, la inserción se detiene en el primer error.
+        :return: Diccionario con el número de documentos insertados ('inserted') y los
+                 errores por documento ('errors': lista de {'index', 'error'}).
+        """
+        if not documents:
+            return {'inserted': 0, 'errors': []}
+        try:
+            with track_db_call('bulk_insert', collection_name):
+                return self.backend.insert_many(db_name or self.default_db_name, collection_name, documents, ordered)
+        finally:
+            if self.cache is not None:
+                for document in documents:
+                    self._invalidate(db_name, collection_name, document)
+
+    def select(self, db_name: str, collection_name: str, query: dict, projection: dict = None,
+               limit: int = None, after=None, raw: bool = False, sort: list = None):
         """
         Método para realizar una operación de selección en la base de datos.
+        Si se indica `limit` o `after`, la consulta se pagina por keyset sobre `_id`
+        (orden ascendente), de modo que cada página cuesta lo mismo que la primera.
         :param db_name: Nombre de la base de datos
         :param collection_name: Nombre de la colección en la que se realizará la selección.
         :param query: Condiciones para la selección.
         :param projection: Campos a seleccionar (por defecto, todos).
-        :return: Documentos que coinciden con la consulta.
+        :param limit: Número máximo de documentos a devolver (opcional).
+        :param after: `_id` del último documento de la página anterior (opcional).
+        :param raw: Si es True, devuelve RawBSONDocument, que se decodifican campo a campo
+                    solo cuando se accede a ellos.
+        :param sort: Orden explícito, lista de tuplas (campo, dirección) (opcional; no se
+                     combina con `after`).
+        :return: Documentos que coinciden con la consulta. Con la caché activada (y sin
+                 `raw`) se devuelve una lista en lugar de un cursor.
+        """
+        if self.cache is not None and not raw:
+            db_key = db_name or self.default_db_name
+            key = QueryCache.make_key(db_key, collection_name, query, projection, limit, after, sort)
+            documents = self.cache.get(key)
+            if documents is None:
+                generation = self.cache.generation(db_key, collection_name)
+                documents = list(self._find(db_name, collection_name, query, projection, limit, after, raw, sort))
+                self.cache.put(key, query, documents, generation)
+            return documents
+        return self._find(db_name, collection_name, query, projection, limit, after, raw, sort)
+
+    def _find(self, db_name, collection_name, query, projection, limit, after, raw, sort=None):
+        """
+        Ejecuta la consulta de select() contra el motor de almacenamiento.
         """
-        collection = self.get_db(db_name)[collection_name]
-        return collection.find(query, projection)
+        if after is not None:
+            keyset = {'_id': {'$gt': ObjectId(after)}}
+            query = {'$and': [query, keyset]} if '_id' in query else {**query, **keyset}
+        if sort is None and (limit is not None or after is not None):
+            sort = [('_id', ASCENDING)]
+        with track_db_call('find', collection_name):
+            cursor = self.backend.find(db_name or self.default_db_name, collection_name, query,
+                                       projection=projection, sort=sort, limit=limit, raw=raw)
+        # La consulta se ejecuta al recorrer el cursor: ese tiempo también es de la petición
+        return track_db_iteration(cursor)
+
+    def text_search(self, db_name: str, collection_name: str, query: dict, text: str,
+                    projection: dict = None, limit: int = None) -> list:
+        """
+        Método para buscar por palabras completas con el índice de texto de la colección
+        (declarado en `database.indexes.INDEXES`). Los resultados no se guardan en la caché.
+        :param db_name: Nombre de la base de datos
+        :param collection_name: Nombre de la colección en la que se realizará la búsqueda.
+        :param query: Condiciones adicionales (con MongoDB deben incluir la igualdad sobre
+                      los campos que preceden al texto en el índice).
+        :param text: Palabras a buscar.
+        :param projection: Campos a seleccionar (por defecto, todos).
+        :param limit: Número máximo de documentos a devolver (opcional).
+        :return: Lista de documentos ordenados por relevancia, cada uno con su 'score'.
+        """
+        fields = [field for keys, _ in INDEXES.get(collection_name, []) for field, kind in keys if kind == TEXT]
+        with track_db_call('text_search', collection_name):
+            return self.backend.text_search(db_name or self.default_db_name, collection_name, query, text,
+                                            fields, projection=projection, limit=limit)
 
     def update(self, db_name: str, collection_name: str, query: dict, update_data: dict) -> int:
         """
@@ -61,9 +196,101 @@ class DatabaseManager:
         :param update_data: Datos a actualizar en la colección.
         :return: Resultado de la operación de actualización.
         """
-        collection = self.get_db(db_name)[collection_name]
-        result = collection.update_one(query, {'$set': update_data})
-        return result.modified_count
+        with track_db_call('update', collection_name):
+            modified_count = self.backend.update_one(db_name or self.default_db_name, collection_name,
+                                                     query, update_data)
+        self._invalidate(db_name, collection_name, query, update_data.keys())
+        return modified_count
+
+    def find_and_modify(self, db_name: str, collection_name: str, query: dict, update: dict,
+                        projection: dict = None):
+        """
+        Método para aplicar de forma atómica operadores de actualización ($push, $inc, ...)
+        sobre un documento y obtenerlo en el mismo viaje a la base de datos.
+        :param db_name: Nombre de la base de datos
+        :param collection_name: Nombre de la colección en la que se realizará la actualización.
+        :param query: Condiciones para seleccionar el documento.
+        :param update: Documento de actualización con operadores de MongoDB.
+        :param projection: Campos a devolver (por defecto, todos).
+        :return: Documento previo a la actualización, o None si no existe.
+        """
+        with track_db_call('find_and_modify', collection_name):
+            document = self.backend.find_one_and_update(db_name or self.default_db_name, collection_name,
+                                                        query, update, projection=projection)
+        changed_fields = [field for fields in update.values() for field in fields]
+        self._invalidate(db_name, collection_name, query, changed_fields)
+        return document
+
+    def upsert(self, db_name: str, collection_name: str, query: dict, update: dict):
+        """
+        Método para actualizar el documento que coincide o crearlo si no existe, de forma
+        atómica y en un único viaje a la base de datos. Los campos de $setOnInsert solo
+        se escriben al crearlo.
+        :param db_name: Nombre de la base de datos
+        :param collection_name: Nombre de la colección.
+        :param query: Condiciones para seleccionar el documento (sus igualdades forman
+                      parte del documento creado).
+        :param update: Documento de actualización con operadores de MongoDB.
+        :return: `_id` del documento creado, o None si ya existía.
+        :raises DuplicateKeyError: Si al crearlo se viola un índice único con otro filtro.
+        """
+        with track_db_call('upsert', collection_name):
+            result = self.backend.upsert_one(db_name or self.default_db_name, collection_name, query, update)
+        changed_fields = [field for fields in update.values() for field in fields]
+        if result['upserted_id'] is not None:
+            # Igual que una inserción del documento creado
+            created = {**query, **update.get('$set', {}), **update.get('$setOnInsert', {}),
+                       '_id': result['upserted_id']}
+            self._invalidate(db_name, collection_name, created)
+        elif result['modified']:
+            self._invalidate(db_name, collection_name, query, changed_fields)
+        return result['upserted_id']
+
+    def update_many(self, db_name: str, collection_name: str, query: dict, update: dict) -> int:
+        """
+        Método para aplicar operadores de actualización ($set, $unset, $inc, ...) a todos
+        los documentos que coinciden, en un único viaje a la base de datos.
+        :param db_name: Nombre de la base de datos
+        :param collection_name: Nombre de la colección en la que se realizará la actualización.
+        :param query: Condiciones para seleccionar los documentos.
+        :param update: Documento de actualización con operadores de MongoDB.
+        :return: Número de documentos modificados.
+        """
+        with track_db_call('update_many', collection_name):
+            modified_count = self.backend.update_many(db_name or self.default_db_name, collection_name,
+                                                      query, update)
+        changed_fields = [field for fields in update.values() for field in fields]
+        self._invalidate(db_name, collection_name, query, changed_fields)
+        return modified_count
+
+    def bulk_write(self, db_name: str, collection_name: str, operations: list, ordered: bool = True) -> dict:
+        """
+        Método para ejecutar un lote de actualizaciones y eliminaciones en un único viaje
+        a la base de datos.
+        :param db_name: Nombre de la base de datos
+        :param collection_name: Nombre de la colección sobre la que se opera.
+        :param operations: Lista de operaciones {'update_one': {'query': ..., 'update': ...}}
+                           o {'delete_one': {'query': ...}}.
+        :param ordered: Si es True, las operaciones se aplican en orden y el lote se detiene
+                        en el primer error; si es False, se aplican todas las posibles.
+        :return: Diccionario con los documentos encontrados ('matched'), modificados
+                 ('modified') y eliminados ('deleted'), y los errores por operación
+                 ('errors': lista de {'index', 'error'}).
+        """
+        if not operations:
+            return {'matched': 0, 'modified': 0, 'deleted': 0, 'errors': []}
+        try:
+            with track_db_call('bulk_write', collection_name):
+                return self.backend.bulk_write(db_name or self.default_db_name, collection_name, operations, ordered)
+        finally:
+            if self.cache is not None:
+                for operation in operations:
+                    if 'update_one' in operation:
+                        update = operation['update_one']['update']
+                        changed_fields = [field for fields in update.values() for field in fields]
+                        self._invalidate(db_name, collection_name, operation['update_one']['query'], changed_fields)
+                    else:
+                        self._invalidate(db_name, collection_name, operation['delete_one']['query'])
 
     def delete(self, collection_name: str, query: dict) -> int:
         """
@@ -72,10 +299,47 @@ class DatabaseManager:
         :param query: Condiciones para la eliminación.
         :return: Número de documentos eliminados.
         """
-        collection = self.get_db()[collection_name] 
-        result = collection.delete_one(query)
-        return result.deleted_count
+        with track_db_call('delete', collection_name):
+            deleted_count = self.backend.delete_one(self.default_db_name, collection_name, query)
+        self._invalidate(None, collection_name, query)
+        return deleted_count
+
+    def delete_many(self, db_name: str, collection_name: str, query: dict) -> int:
+        """
+        Método para eliminar todos los documentos que coinciden, en un único viaje a la
+        base de datos.
+        :param db_name: Nombre de la base de datos
+        :param collection_name: Nombre de la colección.
+        :param query: Condiciones para la eliminación.
+        :return: Número de documentos eliminados.
+        """
+        with track_db_call('delete_many', collection_name):
+            deleted_count = self.backend.delete_many(db_name or self.default_db_name, collection_name, query)
+        self._invalidate(db_name, collection_name, query)
+        return deleted_count
+
+    def _invalidate(self, db_name, collection_name, document, changed_fields=None):
+        """
+        Invalida en la caché de lectura las consultas afectadas por una escritura.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(db_name or self.default_db_name, collection_name, document, changed_fields)
+
+    def cache_stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché de lectura (aciertos, fallos, tamaño...).
+        :return: Diccionario con las estadísticas, o None si la caché está desactivada.
+        """
+        return self.cache.stats() if self.cache is not None else None
+
+    def render_metrics(self) -> str:
+        """
+        Exporta las métricas de comandos, del pool de conexiones y de la caché de
+        lectura en el formato de texto de Prometheus.
+        """
+        return self.metrics.render(self.cache_stats())
 
 
-# Crear una instancia global de DatabaseManager
+# Crear una instancia global de DatabaseManager. No abre conexiones: el cliente
+# del motor se crea en el primer uso (y de nuevo en cada proceso tras un fork).
 database_manager = DatabaseManager()
@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+from pymongo import ASCENDING, TEXT
+from bson import ObjectId
+
+# Índices requeridos por las consultas de la aplicación.
+# Cada entrada: colección -> lista de (claves, opciones de create_index).
+INDEXES = {
+    'users': [
+        ([('email', ASCENDING)], {'name': 'email_unique', 'unique': True}),
+    ],
+    'tasks': [
+        # home(): tareas de un usuario paginadas por _id
+        ([('user_email', ASCENDING), ('_id', ASCENDING)], {'name': 'user_email_id'}),
+        # get_task_by_name(): búsqueda por usuario y nombre
+        ([('user_id', ASCENDING), ('name', ASCENDING)], {'name': 'user_id_name'}),
+        # search_tasks(): búsqueda por palabras completas dentro de las tareas de un usuario
+        ([('user_email', ASCENDING), ('name', TEXT)], {'name': 'user_email_name_text'}),
+        # autocomplete_tasks(): rango por prefijo sobre el nombre normalizado
+        ([('user_email', ASCENDING), ('name_key', ASCENDING)], {'name': 'user_email_name_key'}),
+        # get_top_tasks() y /home: tareas de un usuario de la más urgente a la menos
+        ([('user_email', ASCENDING), ('priority_rank', ASCENDING), ('_id', ASCENDING)],
+         {'name': 'user_email_priority_rank_id'}),
+    ],
+    'sessions': [
+        # Sesiones del servidor: MongoDB borra las caducadas (TTL) y purge-sessions las
+        # elimina de una vez por fecha o por usuario
+        ([('expires_at', ASCENDING)], {'name': 'expires_at_ttl', 'expireAfterSeconds': 0}),
+        ([('user_email', ASCENDING)], {'name': 'user_email'}),
+    ],
+}
+
+# Formas de consulta usadas en caliente. Los valores son de ejemplo: explain()
+# solo necesita la forma de la consulta para elegir el plan.
+QUERY_SHAPES = [
+    {
+        'name': 'users.by_email',
+        'collection': 'users',
+        'query': {'email': 'user@example.com'},
+    },
+    {
+        'name': 'tasks.by_user_email_paginated',
+        'collection': 'tasks',
+        'query': {'user_email': 'user@example.com', '_id': {'$gt': ObjectId('000000000000000000000000')}},
+        'sort': [('_id', ASCENDING)],
+    },
+    {
+        'name': 'tasks.by_user_id_and_name',
+        'collection': 'tasks',
+        'query': {'user_id': ObjectId('000000000000000000000000'), 'name': 'Task'},
+    },
+    {
+        'name': 'tasks.by_user_email_name_prefix',
+        'collection': 'tasks',
+        'query': {'user_email': 'user@example.com', 'name_key': {'$gte': 'task', '$lt': 'task\U0010ffff'}},
+        'sort': [('name_key', ASCENDING)],
+    },
+    {
+        'name': 'tasks.top_by_priority',
+        'collection': 'tasks',
+        'query': {'user_email': 'user@example.com'},
+        'sort': [('priority_rank', ASCENDING), ('_id', ASCENDING)],
+    },
+    {
+        'name': 'sessions.expired',
+        'collection': 'sessions',
+        'query': {'expires_at': {'$lte': datetime(2000, 1, 1, tzinfo=timezone.utc)}},
+    },
+    {
+        'name': 'sessions.by_user_email',
+        'collection': 'sessions',
+        'query': {'user_email': 'user@example.com'},
+    },
+]
+
+
+def plan_stages(plan):
+    """
+    Devuelve todas las etapas ('stage') de un plan de ejecución de explain().
+    :param plan: Diccionario con el plan ganador (winningPlan).
+    :return: Lista con los nombres de las etapas, de la raíz a las hojas.
+    """
+    stages = []
+    pending = [plan]
+    while pending:
+        node = pending.pop()
+        if not isinstance(node, dict):
+            continue
+        if 'stage' in node:
+            stages.append(node['stage'])
+        # Las versiones recientes de MongoDB anidan el plan en 'queryPlan'
+        for key in ('queryPlan', 'inputStage'):
+            if key in node:
+                pending.append(node[key])
+        pending.extend(node.get('inputStages', []))
+    return stages
@@ -0,0 +1,281 @@
+import threading
+from pymongo import monitoring
+
+# Límites (en segundos) de los buckets de los histogramas de latencia
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Límites de los buckets del número de llamadas a la base de datos por petición
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+# Comandos cuyo argumento principal no es el nombre de la colección
+_COLLECTION_ARGUMENTS = {'getMore': 'collection'}
+
+
+def _escape(value):
+    """
+    Escapa el valor de una etiqueta según el formato de texto de Prometheus.
+    """
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}' if pairs else ''
+
+
+def _address(address):
+    host, port = address
+    return f'{host}:{port}'
+
+
+class Histogram:
+    """
+    Histograma acumulativo con etiquetas, equivalente a un histogram de Prometheus.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        """
+        Registra una observación.
+        :param labels: Valores de las etiquetas, en el orden de label_names.
+        :param value: Valor observado (segundos).
+        """
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {labels: dict(values, counts=list(values['counts'])) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values['counts']):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, ('le', repr(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, ('le', '+Inf'))} {values['count']}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {values['sum']}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {values['count']}")
+        return lines
+
+
+class Counter:
+    """
+    Contador (o gauge, si se decrementa) con etiquetas.
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: tuple, metric_type: str = 'counter'):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.metric_type = metric_type
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, labels: tuple, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+    def value(self, labels: tuple) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def render(self) -> list:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.metric_type}']
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            lines.append(f'{self.name}{_labels(self.label_names, labels)} {value}')
+        return lines
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Listener de comandos de pymongo: mide la latencia de cada comando por base de
+    datos, colección y operación.
+    """
+
+    def __init__(self, metrics: 'DatabaseMetrics'):
+        self.metrics = metrics
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        argument = _COLLECTION_ARGUMENTS.get(event.command_name, event.command_name)
+        collection = event.command.get(argument)
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.database_name, collection if isinstance(collection, str) else ''
+            )
+
+    def _finished(self, event, failed):
+        with self._lock:
+            database_name, collection = self._pending.pop((event.connection_id, event.request_id), ('', ''))
+        labels = (database_name, collection, event.command_name)
+        self.metrics.command_duration.observe(labels, event.duration_micros / 1e6)
+        if failed:
+            self.metrics.command_failures.inc(labels)
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Listener del pool de conexiones de pymongo: conexiones abiertas y en uso por
+    servidor, y tiempo de espera para obtener una conexión del pool.
+    """
+
+    def __init__(self, metrics: 'DatabaseMetrics'):
+        self.metrics = metrics
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        labels = (_address(event.address),)
+        self.metrics.pool_connections.set(labels, 0)
+        self.metrics.pool_in_use.set(labels, 0)
+
+    def connection_created(self, event):
+        self.metrics.pool_connections.inc((_address(event.address),))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.metrics.pool_connections.inc((_address(event.address),), -1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        labels = (_address(event.address),)
+        self.metrics.pool_checkout_wait.observe(labels, event.duration or 0.0)
+        self.metrics.pool_checkout_failures.inc((_address(event.address), event.reason))
+
+    def connection_checked_out(self, event):
+        labels = (_address(event.address),)
+        self.metrics.pool_checkout_wait.observe(labels, event.duration or 0.0)
+        self.metrics.pool_in_use.inc(labels)
+
+    def connection_checked_in(self, event):
+        self.metrics.pool_in_use.inc((_address(event.address),), -1)
+
+
+class DatabaseMetrics:
+    """
+    Métricas en memoria del proceso sobre el acceso a la base de datos, alimentadas
+    por los listeners de pymongo y exportadas en el formato de texto de Prometheus.
+    """
+
+    def __init__(self, max_pool_size: int = None):
+        """
+        Constructor de la clase.
+        :param max_pool_size: Tamaño máximo del pool de conexiones (para exportarlo como gauge).
+        """
+        self.max_pool_size = max_pool_size
+        self.command_duration = Histogram(
+            'todo_db_command_duration_seconds', 'Latencia de los comandos de MongoDB.',
+            ('database', 'collection', 'command')
+        )
+        self.command_failures = Counter(
+            'todo_db_command_failures_total', 'Comandos de MongoDB que devolvieron un error.',
+            ('database', 'collection', 'command')
+        )
+        self.pool_checkout_wait = Histogram(
+            'todo_db_pool_checkout_wait_seconds', 'Tiempo de espera para obtener una conexión del pool.',
+            ('address',)
+        )
+        self.pool_checkout_failures = Counter(
+            'todo_db_pool_checkout_failures_total', 'Intentos fallidos de obtener una conexión del pool.',
+            ('address', 'reason')
+        )
+        self.pool_connections = Counter(
+            'todo_db_pool_connections', 'Conexiones abiertas en el pool.', ('address',), 'gauge'
+        )
+        self.pool_in_use = Counter(
+            'todo_db_pool_connections_in_use', 'Conexiones del pool en uso.', ('address',), 'gauge'
+        )
+
+        self.request_db_calls = Histogram(
+            'todo_http_request_db_calls', 'Llamadas a la base de datos por petición.',
+            ('endpoint',), CALL_COUNT_BUCKETS
+        )
+        self.request_db_duration = Histogram(
+            'todo_http_request_db_duration_seconds', 'Tiempo dedicado a la base de datos por petición.',
+            ('endpoint',)
+        )
+
+        self.write_behind_depth = Counter(
+            'todo_write_behind_queue_depth', 'Escrituras diferidas pendientes en la cola.', (), 'gauge'
+        )
+        self.write_behind_writes = Counter(
+            'todo_write_behind_writes_total',
+            'Escrituras diferidas por resultado (queued, coalesced, direct, written, failed).', ('result',)
+        )
+        self.write_behind_flush_duration = Histogram(
+            'todo_write_behind_flush_duration_seconds', 'Duración de la escritura de cada lote diferido.',
+            ('collection',)
+        )
+        self.write_behind_enqueue_wait = Histogram(
+            'todo_write_behind_enqueue_wait_seconds', 'Espera para encolar una escritura con la cola llena.', ()
+        )
+
+    def listeners(self) -> list:
+        """
+        Devuelve los listeners que se registran en el MongoClient.
+        """
+        return [CommandMetricsListener(self), PoolMetricsListener(self)]
+
+    def render(self, cache_stats: dict = None) -> str:
+        """
+        Exporta las métricas en el formato de texto de Prometheus.
+        :param cache_stats: Contadores de la caché de consultas (opcional).
+        :return: Texto de la exposición.
+        """
+        lines = []
+        for metric in (self.command_duration, self.command_failures, self.pool_checkout_wait,
+                       self.pool_checkout_failures, self.pool_connections, self.pool_in_use,
+                       self.request_db_calls, self.request_db_duration, self.write_behind_depth,
+                       self.write_behind_writes, self.write_behind_flush_duration, self.write_behind_enqueue_wait):
+            lines.extend(metric.render())
+        if self.max_pool_size is not None:
+            lines.extend(['# HELP todo_db_pool_max_size Tamaño máximo del pool de conexiones.',
+                          '# TYPE todo_db_pool_max_size gauge',
+                          f'todo_db_pool_max_size {self.max_pool_size}'])
+        if cache_stats:
+            for key in ('hits', 'misses', 'evictions', 'invalidations'):
+                lines.extend([f'# TYPE todo_query_cache_{key}_total counter',
+                              f'todo_query_cache_{key}_total {cache_stats[key]}'])
+            lines.extend(['# TYPE todo_query_cache_size gauge', f"todo_query_cache_size {cache_stats['size']}"])
+        return '\n'.join(lines) + '\n'
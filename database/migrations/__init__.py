@@ -0,0 +1,7 @@
+from .runner import Migration, BackfillMigration, MigrationRunner, MIGRATIONS_COLLECTION
+from .m0001_drop_user_tasks import DropUserTasks
+from .m0002_task_name_key import BackfillTaskNameKey
+from .m0003_task_priority_rank import BackfillTaskPriorityRank
+
+# Migraciones conocidas, en orden de versión
+MIGRATIONS = [DropUserTasks(), BackfillTaskNameKey(), BackfillTaskPriorityRank()]
@@ -0,0 +1,40 @@
+from database.migrations.runner import Migration
+
+
+class DropUserTasks(Migration):
+    """
+    Elimina la lista `users.tasks`. Guardaba el id de cada tarea creada, pero las
+    tareas se consultan por `user_email`, los borrados nunca la actualizaban y
+    crecía sin límite en cada documento de usuario.
+
+    Recorre los usuarios por keyset sobre `_id` y aplica $unset a cada lote con
+    una sola escritura, de modo que puede ejecutarse con la aplicación en marcha.
+    """
+
+    version = '0001'
+    name = 'drop_user_tasks'
+
+    def run(self, database_manager, checkpoint, batch_size, progress):
+        after = checkpoint
+        while True:
+            users = list(database_manager.select(
+                db_name=None,
+                collection_name='users',
+                query={},
+                projection={'_id': 1},
+                limit=batch_size,
+                after=after
+            ))
+            if not users:
+                break
+            user_ids = [user['_id'] for user in users]
+            modified = database_manager.update_many(
+                db_name=None,
+                collection_name='users',
+                query={'_id': {'$in': user_ids}},
+                update={'$unset': {'tasks': ''}}
+            )
+            after = str(user_ids[-1])
+            progress(after, len(user_ids), modified)
+            if len(users) < batch_size:
+                break
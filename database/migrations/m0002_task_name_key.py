@@ -0,0 +1,19 @@
+from database.migrations.runner import BackfillMigration
+
+
+class BackfillTaskNameKey(BackfillMigration):
+    """
+    Rellena `tasks.name_key`, el nombre normalizado sobre el que se indexa el
+    autocompletado, en las tareas creadas antes de que la aplicación lo guardara.
+    """
+
+    version = '0002'
+    name = 'backfill_task_name_key'
+    collection_name = 'tasks'
+    projection = {'name': 1, 'name_key': 1}
+
+    def changes(self, document):
+        from app.logic.search_logic import task_name_key
+        if not isinstance(document.get('name'), str):
+            return {}
+        return {'name_key': task_name_key(document['name'])}
@@ -0,0 +1,18 @@
+from database.migrations.runner import BackfillMigration
+
+
+class BackfillTaskPriorityRank(BackfillMigration):
+    """
+    Rellena `tasks.priority_rank`, el rango numérico de la prioridad por el que se
+    ordena con el índice (user_email, priority_rank, _id). Las prioridades
+    desconocidas quedan detrás de 'low'.
+    """
+
+    version = '0003'
+    name = 'backfill_task_priority_rank'
+    collection_name = 'tasks'
+    projection = {'priority': 1, 'priority_rank': 1}
+
+    def changes(self, document):
+        from app.logic.records import priority_rank
+        return {'priority_rank': priority_rank(document.get('priority'))}
@@ -0,0 +1,214 @@
+import os
+import socket
+import time
+from pymongo.errors import DuplicateKeyError
+
+# Colección con el estado de cada migración (un documento por versión)
+MIGRATIONS_COLLECTION = 'migrations'
+
+# Documentos por lote y pausa (segundos) entre lotes por defecto
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAUSE = 0.1
+
+# Segundos que un proceso conserva una migración sin guardar progreso antes de que
+# otro pueda retomarla (p. ej. si el primero murió a mitad)
+LEASE_SECONDS = 300
+
+
+class Migration:
+    """
+    Migración de datos versionada. Las subclases procesan la colección por lotes y
+    llaman a `progress` tras cada uno; si el proceso se interrumpe, la siguiente
+    ejecución recibe el último checkpoint guardado y continúa desde ahí, así que
+    cada lote debe ser idempotente.
+    """
+
+    # Versión (cadena ordenable, p. ej. '0001') y nombre legible
+    version = None
+    name = None
+
+    def run(self, database_manager, checkpoint, batch_size, progress):
+        """
+        Aplica la migración.
+        :param database_manager: Gestor de la base de datos.
+        :param checkpoint: Checkpoint guardado por una ejecución anterior, o None.
+        :param batch_size: Documentos por lote.
+        :param progress: Función progress(checkpoint, processed, modified) que guarda el
+                         avance tras cada lote y aplica la pausa entre lotes.
+        """
+        raise NotImplementedError
+
+
+class BackfillMigration(Migration):
+    """
+    Migración que recalcula campos derivados en todos los documentos de una
+    colección. Recorre la colección por keyset sobre `_id` y escribe cada lote con
+    un único bulk_write, solo para los documentos cuyo valor falta o está
+    desactualizado, así que se puede repetir sin efectos.
+    """
+
+    collection_name = None
+    # Campos que necesita changes()
+    projection = None
+
+    def changes(self, document) -> dict:
+        """
+        Valores que debe tener el documento.
+        :return: Diccionario campo -> valor (vacío si no hay nada que calcular).
+        """
+        raise NotImplementedError
+
+    def run(self, database_manager, checkpoint, batch_size, progress):
+        after = checkpoint
+        while True:
+            documents = list(database_manager.select(
+                db_name=None,
+                collection_name=self.collection_name,
+                query={},
+                projection=self.projection,
+                limit=batch_size,
+                after=after
+            ))
+            if not documents:
+                break
+            operations = []
+            for document in documents:
+                stale = {field: value for field, value in self.changes(document).items()
+                         if document.get(field) != value}
+                if stale:
+                    operations.append({'update_one': {'query': {'_id': document['_id']}, 'update': {'$set': stale}}})
+            result = database_manager.bulk_write(
+                db_name=None,
+                collection_name=self.collection_name,
+                operations=operations,
+                ordered=False
+            )
+            after = str(documents[-1]['_id'])
+            progress(after, len(documents), result['modified'])
+            if len(documents) < batch_size:
+                break
+
+
+class MigrationRunner:
+    """
+    Aplica en orden las migraciones pendientes y guarda su estado en la colección
+    MIGRATIONS_COLLECTION: estado ('running' o 'done'), checkpoint, documentos
+    procesados y modificados, y marcas de tiempo. Una migración en curso se
+    reserva con una concesión que se renueva en cada lote, para que dos procesos
+    no la ejecuten a la vez.
+    """
+
+    def __init__(self, database_manager, migrations, batch_size: int = DEFAULT_BATCH_SIZE,
+                 pause: float = DEFAULT_PAUSE, sleep=time.sleep):
+        """
+        Constructor de la clase.
+        :param migrations: Migraciones conocidas.
+        :param batch_size: Documentos por lote.
+        :param pause: Segundos de espera entre lotes, para no saturar la base de datos en producción.
+        :param sleep: Función de espera (sustituible en las pruebas).
+        """
+        self.database_manager = database_manager
+        self.migrations = sorted(migrations, key=lambda migration: migration.version)
+        self.batch_size = batch_size
+        self.pause = pause
+        self.sleep = sleep
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+
+    def _state(self, version):
+        states = list(self.database_manager.select(
+            db_name=None,
+            collection_name=MIGRATIONS_COLLECTION,
+            query={'_id': version}
+        ))
+        return states[0] if states else None
+
+    def status(self) -> list:
+        """
+        Estado de todas las migraciones conocidas.
+        :return: Lista de diccionarios con version, name, status ('pending', 'running'
+                 o 'done'), processed y modified.
+        """
+        report = []
+        for migration in self.migrations:
+            state = self._state(migration.version) or {}
+            report.append({
+                'version': migration.version,
+                'name': migration.name,
+                'status': state.get('status', 'pending'),
+                'processed': state.get('processed', 0),
+                'modified': state.get('modified', 0)
+            })
+        return report
+
+    def _claim(self, migration):
+        """
+        Reserva una migración para este proceso.
+        :return: Estado previo de la migración, o None si otro proceso la tiene reservada
+                 o ya está terminada.
+        """
+        now = time.time()
+        try:
+            self.database_manager.insert(
+                db_name=None,
+                collection_name=MIGRATIONS_COLLECTION,
+                data={'_id': migration.version, 'name': migration.name, 'status': 'running',
+                      'checkpoint': None, 'processed': 0, 'modified': 0, 'started_at': now,
+                      'updated_at': now, 'owner': self.owner, 'lease_until': now + LEASE_SECONDS}
+            )
+            return self._state(migration.version)
+        except DuplicateKeyError:
+            pass
+        # Ya existe: retomarla solo si no está terminada y su concesión ha caducado
+        # (o es de este mismo proceso)
+        for query in ({'_id': migration.version, 'status': 'running', 'lease_until': {'$lt': now}},
+                      {'_id': migration.version, 'status': 'running', 'owner': self.owner}):
+            previous = self.database_manager.find_and_modify(
+                db_name=None,
+                collection_name=MIGRATIONS_COLLECTION,
+                query=query,
+                update={'$set': {'owner': self.owner, 'lease_until': now + LEASE_SECONDS}}
+            )
+            if previous is not None:
+                return previous
+        return None
+
+    def _save(self, migration, update):
+        self.database_manager.find_and_modify(
+            db_name=None,
+            collection_name=MIGRATIONS_COLLECTION,
+            query={'_id': migration.version, 'owner': self.owner},
+            update=update,
+            projection={'_id': 1}
+        )
+
+    def run(self, target: str = None) -> list:
+        """
+        Aplica las migraciones pendientes en orden de versión.
+        :param target: Última versión que se aplica (por defecto, todas).
+        :return: Versiones aplicadas en esta ejecución.
+        :raises RuntimeError: Si otro proceso está ejecutando una migración necesaria.
+        """
+        applied = []
+        for migration in self.migrations:
+            if target is not None and migration.version > target:
+                break
+            state = self._state(migration.version)
+            if state is not None and state.get('status') == 'done':
+                continue
+            state = self._claim(migration)
+            if state is None:
+                raise RuntimeError(f"La migración {migration.version} está en curso en otro proceso.")
+
+            def progress(checkpoint, processed, modified, migration=migration):
+                self._save(migration, {
+                    '$set': {'checkpoint': checkpoint, 'updated_at': time.time(),
+                             'lease_until': time.time() + LEASE_SECONDS},
+                    '$inc': {'processed': processed, 'modified': modified}
+                })
+                if self.pause:
+                    self.sleep(self.pause)
+
+            migration.run(self.database_manager, state.get('checkpoint'), self.batch_size, progress)
+            self._save(migration, {'$set': {'status': 'done', 'finished_at': time.time(), 'lease_until': 0}})
+            applied.append(migration.version)
+        return applied
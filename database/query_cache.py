@@ -0,0 +1,173 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from bson import json_util
+
+
+def _is_operator(value):
+    """
+    Indica si el valor de un filtro es una expresión con operadores ($gt, $in, ...).
+    """
+    return isinstance(value, dict) and any(str(key).startswith('$') for key in value)
+
+
+def _equality_fields(query):
+    """
+    Extrae las condiciones de igualdad simples de un filtro.
+    :param query: Filtro de MongoDB.
+    :return: Diccionario campo -> valor, o None si el filtro usa operadores
+             de nivel superior ($and, $or, ...) y no puede analizarse.
+    """
+    if any(str(key).startswith('$') for key in query):
+        return None
+    return {key: value for key, value in query.items() if not _is_operator(value)}
+
+
+class QueryCache:
+    """
+    Caché LRU con TTL para los resultados de DatabaseManager.select.
+    Cada entrada guarda las condiciones de igualdad de su consulta para que las
+    escrituras invaliden solo las entradas que pueden verse afectadas.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30.0):
+        """
+        Constructor de la clase.
+        :param max_size: Número máximo de consultas almacenadas.
+        :param ttl: Segundos que una entrada permanece válida.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(db_name, collection_name, query, projection=None, limit=None, after=None, sort=None):
+        """
+        Construye la clave de caché de una consulta.
+        :return: Tupla hashable que identifica la consulta.
+        """
+        return (
+            db_name,
+            collection_name,
+            json_util.dumps(query, sort_keys=True),
+            json_util.dumps(projection, sort_keys=True),
+            limit,
+            str(after) if after is not None else None,
+            tuple(sort) if sort else None
+        )
+
+    def get(self, key):
+        """
+        Busca una consulta en la caché.
+        :param key: Clave generada con make_key.
+        :return: Copia de los documentos almacenados, o None si no hay entrada válida.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            documents = entry['documents']
+        # Copia para que quien llama pueda modificar los documentos sin alterar la caché
+        return copy.deepcopy(documents)
+
+    def generation(self, db_name, collection_name) -> int:
+        """
+        Devuelve el número de invalidaciones de una colección. Se lee antes de consultar
+        la base de datos para no guardar resultados que una escritura concurrente ya
+        dejó obsoletos.
+        """
+        with self._lock:
+            return self._generations.get((db_name, collection_name), 0)
+
+    def put(self, key, query, documents, generation: int = None):
+        """
+        Guarda el resultado de una consulta.
+        :param key: Clave generada con make_key.
+        :param query: Filtro de la consulta (para la invalidación).
+        :param documents: Lista de documentos devueltos por la consulta.
+        :param generation: Valor de generation() leído antes de la consulta (opcional).
+        """
+        entry = {
+            'collection': key[1],
+            'db_name': key[0],
+            'fields': _equality_fields(query),
+            'documents': copy.deepcopy(documents),
+            'expires_at': time.monotonic() + self.ttl
+        }
+        with self._lock:
+            if generation is not None and generation != self._generations.get(key[:2], 0):
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, db_name, collection_name, document: dict = None, changed_fields=None):
+        """
+        Invalida las entradas de una colección que pueden verse afectadas por una escritura.
+        Una entrada se conserva solo si comparte un campo de igualdad con la escritura
+        con un valor distinto y ese campo no es modificado por la escritura.
+        :param db_name: Nombre de la base de datos.
+        :param collection_name: Colección escrita.
+        :param document: Documento insertado o filtro de la actualización/eliminación.
+                         Si es None, se invalida toda la colección.
+        :param changed_fields: Campos modificados por la escritura (actualizaciones).
+        """
+        written = _equality_fields(document) if document is not None else None
+        changed = set(changed_fields or ())
+        with self._lock:
+            generation_key = (db_name, collection_name)
+            self._generations[generation_key] = self._generations.get(generation_key, 0) + 1
+            stale = []
+            for key, entry in self._entries.items():
+                if entry['collection'] != collection_name or entry['db_name'] != db_name:
+                    continue
+                if written is None or entry['fields'] is None:
+                    stale.append(key)
+                    continue
+                disjoint = any(
+                    field in written and field not in changed and written[field] != value
+                    for field, value in entry['fields'].items()
+                )
+                if not disjoint:
+                    stale.append(key)
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """
+        Vacía la caché.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de la caché.
+        :return: Diccionario con size, hits, misses, evictions e invalidations.
+        """
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
@@ -0,0 +1,113 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Estadísticas de la petición en curso (None fuera de una petición instrumentada)
+_current_stats = ContextVar('db_request_stats', default=None)
+
+
+class RequestDbStats:
+    """
+    Llamadas a la base de datos realizadas durante una petición y tiempo total
+    dedicado a ellas. Puede actualizarse desde varios hilos.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.duration = 0.0
+        self.operations = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, collection_name: str, duration: float):
+        """
+        Registra una llamada.
+        :param operation: Operación del DatabaseManager (find, insert, update...).
+        :param collection_name: Colección afectada.
+        :param duration: Segundos dedicados a la llamada.
+        """
+        with self._lock:
+            self.calls += 1
+            self.duration += duration
+            key = f'{operation}:{collection_name}'
+            self.operations[key] = self.operations.get(key, 0) + 1
+
+    def add_duration(self, duration: float):
+        """
+        Suma tiempo a una llamada ya registrada (p. ej. al recorrer su cursor).
+        """
+        with self._lock:
+            self.duration += duration
+
+
+def begin_request_stats():
+    """
+    Empieza a contabilizar las llamadas a la base de datos del contexto actual.
+    :return: Tupla (estadísticas, token para end_request_stats).
+    """
+    stats = RequestDbStats()
+    return stats, _current_stats.set(stats)
+
+
+def end_request_stats(token):
+    """
+    Deja de contabilizar las llamadas del contexto actual.
+    """
+    _current_stats.reset(token)
+
+
+def current_request_stats():
+    """
+    Devuelve las estadísticas de la petición en curso, o None si no se están contabilizando.
+    """
+    return _current_stats.get()
+
+
+@contextmanager
+def track_db_call(operation: str, collection_name: str):
+    """
+    Contabiliza una llamada a la base de datos en la petición en curso (si la hay).
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.record(operation, collection_name, time.perf_counter() - start)
+
+
+def track_db_iteration(iterable):
+    """
+    Suma al tiempo de la petición en curso el de recorrer el resultado de una consulta.
+    Los cursores de pymongo y los generadores de SQLite ejecutan la consulta al
+    iterarlos, no al crearlos: sin esto, track_db_call solo mediría su creación.
+    :param iterable: Resultado de la consulta, ya contabilizada con track_db_call.
+    :return: El mismo resultado si no hay petición instrumentada; si no, un generador.
+    """
+    stats = _current_stats.get()
+    if stats is None:
+        return iterable
+    return _timed_iteration(iterable, stats)
+
+
+def _timed_iteration(iterable, stats):
+    duration = 0.0
+    try:
+        start = time.perf_counter()
+        iterator = iter(iterable)
+        duration += time.perf_counter() - start
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                duration += time.perf_counter() - start
+            yield item
+    finally:
+        # También al abandonar el recorrido a medias (close() del generador)
+        stats.add_duration(duration)
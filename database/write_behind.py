@@ -0,0 +1,330 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from database.database_manager import DatabaseManager, database_manager
+
+# Operadores cuyas escrituras sobre un mismo campo se pueden combinar en una sola
+_MERGEABLE_OPERATORS = ('$set', '$unset', '$inc', '$push')
+
+
+def _push_items(value):
+    """
+    Devuelve la lista de elementos que añade un $push: los de `{'$each': [...]}` o el
+    propio valor (un documento cualquiera también es un único elemento).
+    :return: Lista de elementos, o None si el $push lleva modificadores ($slice,
+             $position, $sort...), que no se pueden combinar.
+    """
+    if isinstance(value, dict) and '$each' in value:
+        return list(value['$each']) if set(value) == {'$each'} else None
+    return [value]
+
+
+def _merge_update(pending: dict, update: dict) -> bool:
+    """
+    Combina `update` en la actualización pendiente `pending`, si el resultado equivale a
+    aplicar ambas en orden: $set/$unset del mismo campo se sustituyen, $inc se suman y
+    $push se concatenan. Si un campo aparece con operadores distintos, o con $push con
+    modificadores, no se combinan.
+    :return: True si se ha combinado; False si `pending` no se ha modificado.
+    """
+    fields = {}
+    for operator, values in pending.items():
+        for field in values:
+            fields[field] = operator
+    for operator, values in update.items():
+        if operator not in _MERGEABLE_OPERATORS:
+            return False
+        for field in values:
+            if field in fields and (fields[field] != operator and {fields[field], operator} != {'$set', '$unset'}):
+                return False
+            if (operator == '$push' and field in fields
+                    and None in (_push_items(pending['$push'][field]), _push_items(values[field]))):
+                return False
+    for operator, values in update.items():
+        for field, value in values.items():
+            # Un $set posterior anula un $unset anterior del mismo campo, y al revés
+            other = {'$set': '$unset', '$unset': '$set'}.get(operator)
+            if other and field in pending.get(other, {}):
+                del pending[other][field]
+                if not pending[other]:
+                    del pending[other]
+            target = pending.setdefault(operator, {})
+            if operator == '$inc' and field in target:
+                target[field] += value
+            elif operator == '$push' and field in target:
+                target[field] = {'$each': _push_items(target[field]) + _push_items(value)}
+            else:
+                target[field] = value
+    return True
+
+
+class WriteBehindQueue:
+    """
+    Cola en memoria del proceso para escrituras no críticas (marcas de último acceso,
+    contadores, registros de auditoría) que no deben bloquear la respuesta.
+
+    Las actualizaciones de una misma clave (por defecto, el documento de la consulta)
+    se combinan mientras esperan, y un pool de hilos las escribe en lotes con
+    bulk_write (las inserciones, con bulk_insert). La cola está acotada: cuando se
+    llena, quien escribe espera hasta `enqueue_timeout` segundos y, si sigue llena,
+    hace la escritura él mismo. close() (registrado con atexit) vacía la cola antes
+    de salir. Las escrituras no se reintentan: un fallo se registra y se descarta.
+    """
+
+    def __init__(self, manager: DatabaseManager = None, max_size: int = None, workers: int = None,
+                 batch_size: int = None, flush_interval: float = None, enqueue_timeout: float = None):
+        """
+        Constructor de la clase. Los hilos se crean en la primera escritura.
+        :param manager: DatabaseManager con el que se escribe (por defecto, el global).
+        :param max_size: Claves pendientes como máximo (por defecto WRITE_BEHIND_MAX_SIZE).
+        :param workers: Hilos que escriben los lotes (por defecto WRITE_BEHIND_WORKERS;
+                        0 = escribir en el hilo de quien llama).
+        :param batch_size: Escrituras por lote como máximo (por defecto WRITE_BEHIND_BATCH_SIZE).
+        :param flush_interval: Segundos que espera una escritura para combinarse con otras
+                               antes de enviarse, si el lote no se llena antes
+                               (por defecto WRITE_BEHIND_FLUSH_INTERVAL).
+        :param enqueue_timeout: Segundos que se espera a tener hueco con la cola llena
+                                (por defecto WRITE_BEHIND_ENQUEUE_TIMEOUT).
+        """
+        self.manager = manager or database_manager
+        self.max_size = Config.WRITE_BEHIND_MAX_SIZE if max_size is None else max_size
+        self.workers = Config.WRITE_BEHIND_WORKERS if workers is None else workers
+        self.batch_size = Config.WRITE_BEHIND_BATCH_SIZE if batch_size is None else batch_size
+        self.flush_interval = Config.WRITE_BEHIND_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.enqueue_timeout = Config.WRITE_BEHIND_ENQUEUE_TIMEOUT if enqueue_timeout is None else enqueue_timeout
+        self._condition = threading.Condition()
+        self._pending = OrderedDict()
+        self._in_flight = set()
+        self._threads = []
+        self._pid = None
+        self._flushing = 0
+        self._closed = False
+        self._sequence = 0
+
+    @property
+    def metrics(self):
+        return self.manager.metrics
+
+    def depth(self) -> int:
+        """
+        Número de claves pendientes de escribir (sin contar las que se están escribiendo).
+        """
+        with self._condition:
+            return len(self._pending)
+
+    def update(self, db_name: str, collection_name: str, query: dict, update: dict, key=None):
+        """
+        Encola una actualización de un documento (como DatabaseManager.bulk_write con
+        'update_one'). Si ya hay una pendiente con la misma clave, se combinan.
+        :param query: Condiciones que identifican el documento.
+        :param update: Operadores de actualización ($set, $unset, $inc, $push, $pull).
+        :param key: Clave de combinación (por defecto, la base de datos, la colección y la consulta).
+        """
+        db_name = db_name or self.manager.default_db_name
+        if key is None:
+            key = json.dumps(query, sort_keys=True, default=str)
+        entry = {'db_name': db_name, 'collection_name': collection_name, 'query': query,
+                 'updates': [{operator: dict(values) for operator, values in update.items()}]}
+        self._submit((db_name, collection_name, 'update', key), entry)
+
+    def insert(self, db_name: str, collection_name: str, data: dict):
+        """
+        Encola la inserción de un documento. Las inserciones no se combinan.
+        """
+        db_name = db_name or self.manager.default_db_name
+        with self._condition:
+            self._sequence += 1
+            key = (db_name, collection_name, 'insert', self._sequence)
+        self._submit(key, {'db_name': db_name, 'collection_name': collection_name, 'documents': [data]})
+
+    def _coalesce(self, key, entry) -> bool:
+        pending = self._pending.get(key)
+        if pending is None or 'updates' not in entry:
+            return False
+        update = entry['updates'][0]
+        if not _merge_update(pending['updates'][-1], update):
+            # Operadores incompatibles: se escribe después de la anterior, en el mismo lote
+            pending['updates'].append(update)
+        self.metrics.write_behind_writes.inc(('coalesced',))
+        return True
+
+    def _submit(self, key, entry):
+        if self.workers <= 0:
+            self._write([entry])
+            return
+        queued = False
+        with self._condition:
+            waited_since = None
+            while not self._closed:
+                self._start()
+                queued = self._coalesce(key, entry) or self._enqueue(key, entry)
+                if queued:
+                    break
+                # Contrapresión: la cola está llena y quien escribe espera a que haya hueco
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                remaining = waited_since + self.enqueue_timeout - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if waited_since is not None:
+                self.metrics.write_behind_enqueue_wait.observe((), time.monotonic() - waited_since)
+        if not queued:
+            # Cola llena o cerrada: se escribe en el hilo de quien llama
+            self.metrics.write_behind_writes.inc(('direct',))
+            self._write([entry])
+
+    def _enqueue(self, key, entry) -> bool:
+        if len(self._pending) >= self.max_size:
+            return False
+        entry['queued_at'] = time.monotonic()
+        self._pending[key] = entry
+        self.metrics.write_behind_writes.inc(('queued',))
+        self.metrics.write_behind_depth.set((), len(self._pending))
+        self._condition.notify_all()
+        return True
+
+    def _start(self):
+        """
+        Crea los hilos en el primer uso, y de nuevo tras un fork (el proceso hijo no
+        hereda los hilos del padre; lo pendiente lo escribe el padre).
+        """
+        if self._pid == os.getpid():
+            return
+        if self._pid is None:
+            atexit.register(self.close)
+        self._pid = os.getpid()
+        self._pending.clear()
+        self._in_flight.clear()
+        self._threads = [threading.Thread(target=self._work, name=f'write-behind-{index}', daemon=True)
+                         for index in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _next_batch(self):
+        """
+        Saca de la cola el siguiente lote si está listo: lleno, con la escritura más
+        antigua esperando flush_interval, o al vaciar la cola. Las claves que otro hilo
+        está escribiendo se dejan para después, para no reordenar sus escrituras.
+        :return: Lista de (clave, entrada), o None si aún no hay lote.
+        """
+        keys = [key for key in self._pending if key not in self._in_flight]
+        if not keys:
+            return None
+        oldest = self._pending[keys[0]]['queued_at']
+        if (len(keys) < self.batch_size and not self._closed and not self._flushing
+                and time.monotonic() - oldest < self.flush_interval):
+            return None
+        batch = [(key, self._pending.pop(key)) for key in keys[:self.batch_size]]
+        self._in_flight.update(key for key, _ in batch)
+        self.metrics.write_behind_depth.set((), len(self._pending))
+        self._condition.notify_all()
+        return batch
+
+    def _wait_time(self):
+        keys = [key for key in self._pending if key not in self._in_flight]
+        if not keys:
+            return None
+        return max(0.001, self._pending[keys[0]]['queued_at'] + self.flush_interval - time.monotonic())
+
+    def _work(self):
+        while True:
+            with self._condition:
+                batch = self._next_batch()
+                while batch is None:
+                    if self._closed and not self._pending:
+                        return
+                    self._condition.wait(self._wait_time())
+                    batch = self._next_batch()
+            try:
+                self._write([entry for _, entry in batch])
+            finally:
+                with self._condition:
+                    self._in_flight.difference_update(key for key, _ in batch)
+                    self._condition.notify_all()
+
+    def _write(self, entries):
+        """
+        Escribe un lote: por colección, las inserciones con bulk_insert y las
+        actualizaciones con bulk_write. Si una clave tiene varias actualizaciones sin
+        combinar, se envían en lotes sucesivos para respetar su orden.
+        """
+        groups = OrderedDict()
+        for entry in entries:
+            groups.setdefault((entry['db_name'], entry['collection_name']), []).append(entry)
+        for (db_name, collection_name), group in groups.items():
+            started = time.perf_counter()
+            written = failed = 0
+            try:
+                documents = [document for entry in group for document in entry.get('documents', ())]
+                if documents:
+                    result = self.manager.bulk_insert(db_name, collection_name, documents)
+                    written += result['inserted']
+                    failed += len(result['errors'])
+                updates = [entry for entry in group if 'updates' in entry]
+                for round_index in range(max((len(entry['updates']) for entry in updates), default=0)):
+                    operations = [{'update_one': {'query': entry['query'], 'update': entry['updates'][round_index]}}
+                                  for entry in updates if round_index < len(entry['updates'])]
+                    result = self.manager.bulk_write(db_name, collection_name, operations, ordered=False)
+                    written += len(operations) - len(result['errors'])
+                    failed += len(result['errors'])
+            except Exception as e:
+                failed = sum(len(entry.get('documents', ())) + len(entry.get('updates', ())) for entry in group) - written
+                print(f"Error en la escritura diferida en {collection_name}: {e}")
+            self.metrics.write_behind_flush_duration.observe((collection_name,), time.perf_counter() - started)
+            self.metrics.write_behind_writes.inc(('written',), written)
+            if failed:
+                self.metrics.write_behind_writes.inc(('failed',), failed)
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Escribe ya todo lo pendiente y espera a que termine.
+        :param timeout: Segundos de espera como máximo (None = sin límite).
+        :return: True si la cola ha quedado vacía.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if self._pid != os.getpid():
+                return not self._pending
+            self._flushing += 1
+            self._condition.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._condition.wait(remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: float = None) -> bool:
+        """
+        Vacía la cola y detiene los hilos. Las escrituras posteriores se hacen en el
+        hilo de quien llama.
+        :param timeout: Segundos de espera como máximo (por defecto WRITE_BEHIND_SHUTDOWN_TIMEOUT).
+        :return: True si se ha escrito todo lo pendiente.
+        """
+        if timeout is None:
+            timeout = Config.WRITE_BEHIND_SHUTDOWN_TIMEOUT
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._pid != os.getpid():
+            return True
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.monotonic()))
+        with self._condition:
+            lost = len(self._pending)
+        if lost:
+            print(f"La escritura diferida no terminó a tiempo: {lost} escrituras sin guardar")
+        return lost == 0
+
+
+# Crear una instancia global de WriteBehindQueue (sin hilos hasta la primera escritura)
+write_behind = WriteBehindQueue()
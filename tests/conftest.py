@@ -1,4 +1,7 @@
 # tests/conftest.py
+import os
+# Las pruebas no dependen de una base de datos para las sesiones (se lee al importar config)
+os.environ.setdefault('SESSION_STORE', 'memory')
 import pytest
 from app import create_app
 import json
@@ -0,0 +1,64 @@
+import time
+import uuid
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+from app.logic.task_logic import add_task_logic
+from database.database_manager import database_manager
+
+
+@pytest.fixture(scope="module")
+def db():
+    """Base de datos real; estas pruebas necesitan un MongoDB accesible"""
+    if database_manager.backend.name != 'mongo':
+        pytest.skip("Estas pruebas usan la API de MongoDB")
+    try:
+        database_manager.client.admin.command('ping')
+    except PyMongoError:
+        pytest.skip("MongoDB no disponible")
+    return database_manager.get_db()
+
+@pytest.fixture(scope="function")
+def stress_user(db):
+    """Usuario temporal que se elimina junto a sus tareas al terminar"""
+    email = f"stress-{uuid.uuid4().hex}@example.com"
+    db['users'].insert_one({'email': email, 'password': None})
+    yield email
+    db['tasks'].delete_many({'user_email': email})
+    db['users'].delete_one({'email': email})
+
+def add_tasks(email, count, workers=16):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda i: add_task_logic(email, f'Task {i}', 'high'), range(count)))
+
+def test_parallel_adds_all_land(db, stress_user):
+    """N altas concurrentes: ninguna se pierde y cada una incrementa la versión del usuario"""
+    count = 200
+    inserted = add_tasks(stress_user, count)
+
+    user = db['users'].find_one({'email': stress_user})
+    assert len(set(inserted)) == count
+    assert db['tasks'].count_documents({'user_email': stress_user}) == count
+    assert user['tasks_version'] == count
+    assert 'tasks' not in user
+
+def test_write_cost_flat_with_task_count(db, stress_user):
+    """El coste de agregar una tarea no crece con el tamaño de un users.tasks heredado"""
+    batch = 50
+
+    start = time.perf_counter()
+    add_tasks(stress_user, batch, workers=1)
+    small = time.perf_counter() - start
+
+    # Simular un usuario con la lista heredada de muchas tareas (anterior a la migración 0001)
+    db['users'].update_one(
+        {'email': stress_user},
+        {'$push': {'tasks': {'$each': [ObjectId() for _ in range(20000)]}}}
+    )
+
+    start = time.perf_counter()
+    add_tasks(stress_user, batch, workers=1)
+    large = time.perf_counter() - start
+
+    assert large < small * 3
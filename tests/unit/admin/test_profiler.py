@@ -0,0 +1,90 @@
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.logic.profiler_logic import StackSampler, profile_logic
+
+
+def busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def client():
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    return app.test_client()
+
+
+def test_sampler_collects_stacks_of_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop,), name='busy')
+    worker.start()
+    try:
+        sampler = StackSampler(interval=0.001)
+        sampler.run(0.2)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.samples > 0
+    assert any(stack.startswith('busy;') and 'test_profiler:busy_worker' in stack for stack in sampler.stacks)
+    line = sampler.collapsed().splitlines()[0]
+    assert line.rsplit(' ', 1)[1].isdigit()
+
+
+def test_sampler_backs_off_when_samples_are_expensive():
+    sampler = StackSampler(interval=0.001, max_overhead=0.02)
+    with patch.object(StackSampler, 'sample', lambda self, ignore_thread=None: time.sleep(0.005)):
+        sampler.run(0.3)
+    assert sampler.overhead < 0.05
+
+
+def test_profile_logic_rejects_invalid_parameters():
+    with pytest.raises(ValueError):
+        profile_logic(0, 10)
+    with pytest.raises(ValueError):
+        profile_logic(1, 0.1)
+    for interval_ms in (float('inf'), float('nan'), 1001):
+        with pytest.raises(ValueError):
+            profile_logic(1, interval_ms)
+
+
+# Test de que la pausa entre muestras no se alarga más allá de la duración
+def test_sampler_stops_at_deadline():
+    sampler = StackSampler(interval=60)
+    start = time.perf_counter()
+    sampler.run(0.1)
+    assert time.perf_counter() - start < 1
+    assert sampler.samples == 1
+
+
+def test_profile_requires_admin(client):
+    assert client.get('/admin/profile').status_code == 401
+
+    with client.session_transaction() as session:
+        session['user_email'] = 'test@example.com'
+    with patch('app.routes.admin.Config.ADMIN_EMAILS', set()):
+        assert client.get('/admin/profile').status_code == 403
+
+
+def test_profile_returns_collapsed_stacks(client):
+    with client.session_transaction() as session:
+        session['user_email'] = 'admin@example.com'
+    with patch('app.routes.admin.Config.ADMIN_EMAILS', {'admin@example.com'}):
+        response = client.get('/admin/profile?seconds=0.1&interval_ms=5')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert int(response.headers['X-Profile-Samples']) > 0
+
+
+def test_profile_rejects_unbounded_interval(client):
+    with client.session_transaction() as session:
+        session['user_email'] = 'admin@example.com'
+    with patch('app.routes.admin.Config.ADMIN_EMAILS', {'admin@example.com'}):
+        assert client.get('/admin/profile?seconds=1&interval_ms=inf').status_code == 400
+        assert client.get('/admin/profile?seconds=1&interval_ms=1e9').status_code == 400
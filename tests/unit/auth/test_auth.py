@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from bson import ObjectId
 from app.logic.task_logic import add_task_logic, get_task_by_name, update_task
+from app.logic.records import Task
 
 @pytest.fixture
 def mock_user():
@@ -23,9 +24,7 @@ def mock_task():
 @patch('app.logic.task_logic.database_manager')
 def test_add_task_logic_success(mock_db, mock_user):
     # Setup mock database responses
-    mock_cursor = MagicMock()
-    mock_cursor.__iter__.return_value = iter([mock_user])
-    mock_db.select.return_value = mock_cursor
+    mock_db.select.return_value = [{'_id': mock_user['_id']}]
     
     # Mock the insert operation
     task_id = ObjectId()
@@ -36,19 +35,23 @@ def test_add_task_logic_success(mock_db, mock_user):
     
     # Verify the results
     assert result == task_id
+    mock_db.select.assert_called_once()
     mock_db.insert.assert_called_once()
-    mock_db.update.assert_called_once()
+    mock_db.find_and_modify.assert_called_once()
+    mock_db.update.assert_not_called()
+    # La versión se incrementa después de insertar la tarea
+    assert [call[0] for call in mock_db.method_calls] == ['select', 'insert', 'find_and_modify']
 
 @patch('app.logic.task_logic.database_manager')
 def test_add_task_logic_user_not_found(mock_db):
-    # Setup mock to return empty result
-    mock_cursor = MagicMock()
-    mock_cursor.__iter__.return_value = iter([])
-    mock_db.select.return_value = mock_cursor
+    # Setup mock to return no user
+    mock_db.select.return_value = []
     
     # Verify that ValueError is raised
     with pytest.raises(ValueError, match="Usuario no encontrado."):
         add_task_logic('nonexistent@example.com', 'Task Name', 'high')
+    mock_db.insert.assert_not_called()
+    mock_db.find_and_modify.assert_not_called()
 
 @patch('app.logic.task_logic.database_manager')
 def test_get_task_by_name_success(mock_db, mock_user, mock_task):
@@ -64,7 +67,7 @@ def test_get_task_by_name_success(mock_db, mock_user, mock_task):
     result = get_task_by_name(mock_user['email'], mock_task['name'])
     
     # Verify the results
-    assert result == mock_task
+    assert result == Task.from_document(mock_task)
     assert mock_db.select.call_count == 2
 
 @patch('app.logic.task_logic.database_manager')
@@ -0,0 +1,127 @@
+import pytest
+from unittest.mock import MagicMock
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+from database.database_manager import DatabaseManager
+from database.backends.mongo_backend import MongoBackend
+
+
+@pytest.fixture
+def manager():
+    manager = DatabaseManager(backend=MongoBackend())
+    manager.backend.client = MagicMock()
+    return manager
+
+def get_collection(manager):
+    return manager.client['ToDo']['tasks']
+
+# Test de selección sin paginación: no se ordena ni se limita el cursor
+def test_select_without_pagination(manager):
+    collection = get_collection(manager)
+
+    manager.select(db_name=None, collection_name='tasks', query={'user_email': 'a@example.com'})
+
+    collection.find.assert_called_once_with({'user_email': 'a@example.com'}, None)
+    collection.find.return_value.sort.assert_not_called()
+
+# Test de selección paginada por keyset sobre _id
+def test_select_keyset_pagination(manager):
+    collection = get_collection(manager)
+    after = ObjectId()
+
+    manager.select(db_name=None, collection_name='tasks', query={'user_email': 'a@example.com'},
+                   limit=10, after=str(after))
+
+    collection.find.assert_called_once_with(
+        {'user_email': 'a@example.com', '_id': {'$gt': after}}, None
+    )
+    cursor = collection.find.return_value
+    cursor.sort.assert_called_once_with([('_id', ASCENDING)])
+    cursor.sort.return_value.limit.assert_called_once_with(10)
+
+# Test de paginación cuando la consulta ya filtra por _id
+def test_select_keyset_with_id_filter(manager):
+    collection = get_collection(manager)
+    after = ObjectId()
+    query = {'_id': {'$in': [after]}}
+
+    manager.select(db_name=None, collection_name='tasks', query=query, after=after)
+
+    collection.find.assert_called_once_with(
+        {'$and': [query, {'_id': {'$gt': after}}]}, None
+    )
+
+# Test de inserción en lote con errores por documento
+def test_bulk_insert_reports_write_errors(manager):
+    collection = get_collection(manager)
+    collection.insert_many.side_effect = BulkWriteError({
+        'nInserted': 1,
+        'writeErrors': [{'index': 1, 'errmsg': 'duplicate key', 'code': 11000}]
+    })
+
+    result = manager.bulk_insert(db_name=None, collection_name='tasks', documents=[{}, {}])
+
+    assert result == {'inserted': 1, 'errors': [{'index': 1, 'error': 'duplicate key'}]}
+    collection.insert_many.assert_called_once_with([{}, {}], ordered=False)
+
+# Test de inserción en lote vacía: no se llama a la base de datos
+def test_bulk_insert_empty(manager):
+    result = manager.bulk_insert(db_name=None, collection_name='tasks', documents=[])
+
+    assert result == {'inserted': 0, 'errors': []}
+    get_collection(manager).insert_many.assert_not_called()
+
+# Test de selección en modo raw: la colección se configura con RawBSONDocument
+def test_select_raw_documents(manager):
+    collection = get_collection(manager)
+
+    manager.select(db_name=None, collection_name='tasks', query={}, raw=True)
+
+    codec_options = collection.with_options.call_args.kwargs['codec_options']
+    assert codec_options.document_class is RawBSONDocument
+    collection.with_options.return_value.find.assert_called_once_with({}, None)
+
+# Test de búsqueda de texto: filtro $text, relevancia proyectada y orden por relevancia
+def test_text_search(manager):
+    collection = get_collection(manager)
+    collection.find.return_value.sort.return_value.limit.return_value = [{'_id': ObjectId(), 'score': 1.5}]
+
+    result = manager.text_search(db_name=None, collection_name='tasks', query={'user_email': 'a@example.com'},
+                                 text='milk', projection={'name': 1}, limit=5)
+
+    score = {'$meta': 'textScore'}
+    collection.find.assert_called_once_with({'user_email': 'a@example.com', '$text': {'$search': 'milk'}},
+                                            {'name': 1, 'score': score})
+    collection.find.return_value.sort.assert_called_once_with([('score', score)])
+    assert result[0]['score'] == 1.5
+
+# Test de upsert: update_one con upsert=True en un solo viaje
+def test_upsert(manager):
+    collection = manager.client['ToDo']['users']
+    created_id = ObjectId()
+    collection.update_one.return_value = MagicMock(matched_count=0, modified_count=0, upserted_id=created_id)
+
+    result = manager.upsert(db_name=None, collection_name='users', query={'email': 'a@example.com'},
+                            update={'$setOnInsert': {'password': None}})
+
+    collection.update_one.assert_called_once_with({'email': 'a@example.com'}, {'$setOnInsert': {'password': None}},
+                                                  upsert=True)
+    assert result == created_id
+
+# Test de bulk_write: operaciones traducidas a UpdateOne/DeleteOne
+def test_bulk_write(manager):
+    collection = get_collection(manager)
+    collection.bulk_write.return_value = MagicMock(matched_count=1, modified_count=1, deleted_count=1)
+    task_id = ObjectId()
+
+    result = manager.bulk_write(db_name=None, collection_name='tasks', operations=[
+        {'update_one': {'query': {'_id': task_id}, 'update': {'$set': {'priority': 'high'}}}},
+        {'delete_one': {'query': {'_id': task_id}}},
+    ], ordered=False)
+
+    requests = collection.bulk_write.call_args.args[0]
+    assert [type(request).__name__ for request in requests] == ['UpdateOne', 'DeleteOne']
+    assert collection.bulk_write.call_args.kwargs == {'ordered': False}
+    assert result == {'matched': 1, 'modified': 1, 'deleted': 1, 'errors': []}
@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import MagicMock
+from database.database_manager import DatabaseManager
+from database.backends.mongo_backend import MongoBackend
+from database.indexes import INDEXES, QUERY_SHAPES, plan_stages
+
+
+@pytest.fixture
+def manager():
+    manager = DatabaseManager(backend=MongoBackend())
+    manager.backend.client = MagicMock()
+    return manager
+
+# Test de creación de índices: se llama a create_index por cada índice declarado
+def test_ensure_indexes(manager):
+    db = manager.client['ToDo']
+
+    manager.ensure_indexes()
+
+    expected = sum(len(indexes) for indexes in INDEXES.values())
+    assert db.__getitem__.return_value.create_index.call_count == expected
+    db.__getitem__.return_value.create_index.assert_any_call(
+        [('email', 1)], name='email_unique', unique=True
+    )
+
+# Test de las etapas de un plan anidado
+def test_plan_stages_nested():
+    plan = {
+        'stage': 'LIMIT',
+        'inputStage': {
+            'stage': 'FETCH',
+            'inputStage': {'stage': 'IXSCAN', 'indexName': 'user_email_id'}
+        }
+    }
+    assert plan_stages(plan) == ['LIMIT', 'FETCH', 'IXSCAN']
+
+# Test de plan con 'queryPlan' (MongoDB 7+) y varias entradas
+def test_plan_stages_query_plan():
+    plan = {'queryPlan': {'stage': 'OR', 'inputStages': [{'stage': 'COLLSCAN'}]}}
+    assert plan_stages(plan) == ['OR', 'COLLSCAN']
+
+# Test del reporte de cobertura de índices
+def test_explain_query_shapes_reports_collscan(manager):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.explain.return_value = {'queryPlanner': {'winningPlan': {'stage': 'COLLSCAN'}}}
+    manager.client['ToDo'].__getitem__.return_value.find.return_value = cursor
+
+    report = manager.explain_query_shapes()
+
+    assert len(report) == len(QUERY_SHAPES)
+    assert all(entry['collscan'] for entry in report)
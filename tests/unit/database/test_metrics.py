@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest.mock import patch
+from pymongo import monitoring
+from database.metrics import DatabaseMetrics, Histogram
+
+ADDRESS = ('localhost', 27017)
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('latency_seconds', 'Latencia.', ('command',), buckets=(0.01, 0.1))
+    histogram.observe(('find',), 0.005)
+    histogram.observe(('find',), 0.05)
+    histogram.observe(('find',), 1.0)
+
+    lines = histogram.render()
+    assert 'latency_seconds_bucket{command="find",le="0.01"} 1' in lines
+    assert 'latency_seconds_bucket{command="find",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{command="find",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{command="find"} 3' in lines
+
+
+def test_command_listener_records_latency_per_collection():
+    metrics = DatabaseMetrics()
+    command_listener, _ = metrics.listeners()
+
+    command_listener.started(monitoring.CommandStartedEvent({'find': 'tasks', 'filter': {}}, 'ToDo', 1, ADDRESS, 1))
+    command_listener.succeeded(monitoring.CommandSucceededEvent(timedelta(milliseconds=3), {}, 'find', 1, ADDRESS, 1))
+    command_listener.started(monitoring.CommandStartedEvent({'insert': 'users'}, 'ToDo', 2, ADDRESS, 2))
+    command_listener.failed(monitoring.CommandFailedEvent(timedelta(milliseconds=1), {}, 'insert', 2, ADDRESS, 2))
+
+    output = metrics.render()
+    assert 'todo_db_command_duration_seconds_count{database="ToDo",collection="tasks",command="find"} 1' in output
+    assert 'todo_db_command_failures_total{database="ToDo",collection="users",command="insert"} 1' in output
+
+
+def test_pool_listener_tracks_connections_and_checkout_wait():
+    metrics = DatabaseMetrics(max_pool_size=10)
+    _, pool_listener = metrics.listeners()
+
+    pool_listener.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+    pool_listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, 1, 0.002))
+    pool_listener.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(ADDRESS, 'timeout', 1.5))
+
+    output = metrics.render()
+    assert 'todo_db_pool_connections{address="localhost:27017"} 1' in output
+    assert 'todo_db_pool_connections_in_use{address="localhost:27017"} 1' in output
+    assert 'todo_db_pool_checkout_wait_seconds_count{address="localhost:27017"} 2' in output
+    assert 'todo_db_pool_checkout_failures_total{address="localhost:27017",reason="timeout"} 1' in output
+    assert 'todo_db_pool_max_size 10' in output
+
+    pool_listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    assert 'todo_db_pool_connections_in_use{address="localhost:27017"} 0' in metrics.render()
+
+
+@patch('database.database_manager.database_manager')
+def test_metrics_endpoint(mock_db):
+    mock_db.render_metrics.return_value = 'todo_metric_under_test 1\n'
+    from app import create_app
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        client = create_app().test_client()
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert b'todo_metric_under_test 1' in response.data
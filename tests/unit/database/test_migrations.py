@@ -0,0 +1,97 @@
+import pytest
+from bson import ObjectId
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+from database.migrations import MIGRATIONS, MigrationRunner, MIGRATIONS_COLLECTION
+from database.migrations.m0001_drop_user_tasks import DropUserTasks
+from database.migrations.m0002_task_name_key import BackfillTaskNameKey
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    return manager
+
+def add_users(manager, count):
+    manager.bulk_insert(db_name=None, collection_name='users', documents=[
+        {'email': f'user-{i}@example.com', 'password': None, 'tasks': [ObjectId(), ObjectId()]}
+        for i in range(count)
+    ])
+
+def users_with_tasks(manager):
+    return [user for user in manager.select(db_name=None, collection_name='users', query={}) if 'tasks' in user]
+
+class Interrupt(Exception):
+    pass
+
+# Test de la migración 0001 por lotes, con pausa entre lotes
+def test_drop_user_tasks(manager):
+    add_users(manager, 25)
+    pauses = []
+    runner = MigrationRunner(manager, [DropUserTasks()], batch_size=10, pause=0.5, sleep=pauses.append)
+
+    assert runner.run() == ['0001']
+    assert users_with_tasks(manager) == []
+    assert pauses == [0.5, 0.5, 0.5]
+    assert runner.status() == [{'version': '0001', 'name': 'drop_user_tasks', 'status': 'done',
+                                'processed': 25, 'modified': 25}]
+    # Una migración terminada no se vuelve a aplicar
+    assert runner.run() == []
+
+# Test de que una ejecución interrumpida continúa desde su último checkpoint
+def test_resume_after_interruption(manager):
+    add_users(manager, 25)
+    calls = []
+
+    def interrupt_after_first_batch(_):
+        calls.append(1)
+        if len(calls) == 1:
+            raise Interrupt()
+
+    runner = MigrationRunner(manager, [DropUserTasks()], batch_size=10, sleep=interrupt_after_first_batch)
+    with pytest.raises(Interrupt):
+        runner.run()
+    assert len(users_with_tasks(manager)) == 15
+    assert runner.status()[0]['status'] == 'running'
+
+    assert runner.run() == ['0001']
+    assert users_with_tasks(manager) == []
+    assert runner.status()[0]['processed'] == 25
+
+# Test de que otro proceso no puede retomar una migración con la concesión vigente
+def test_concurrent_runner_is_rejected(manager):
+    add_users(manager, 5)
+    manager.insert(db_name=None, collection_name=MIGRATIONS_COLLECTION,
+                   data={'_id': DropUserTasks.version, 'name': DropUserTasks.name, 'status': 'running',
+                         'checkpoint': None, 'processed': 0, 'modified': 0,
+                         'owner': 'other-host:1', 'lease_until': 2 ** 40})
+
+    with pytest.raises(RuntimeError):
+        MigrationRunner(manager, MIGRATIONS, pause=0).run()
+    assert len(users_with_tasks(manager)) == 5
+
+# Test del límite de versión
+def test_target_version(manager):
+    add_users(manager, 3)
+    runner = MigrationRunner(manager, MIGRATIONS, pause=0)
+
+    assert runner.run(target='0000') == []
+    assert runner.status()[0]['status'] == 'pending'
+    assert len(users_with_tasks(manager)) == 3
+    assert runner.run(target='0001') == ['0001']
+    assert [entry['status'] for entry in runner.status()] == ['done', 'pending', 'pending']
+
+# Test de la migración 0002: rellena name_key solo donde falta o está desactualizado
+def test_backfill_task_name_key(manager):
+    manager.bulk_insert(db_name=None, collection_name='tasks', documents=[
+        {'name': 'Buy  MILK', 'user_email': 'a@example.com'},
+        {'name': 'Call mom', 'name_key': 'call mom', 'user_email': 'a@example.com'},
+        {'name': 'Pay rent', 'name_key': 'stale', 'user_email': 'a@example.com'},
+    ])
+
+    assert MigrationRunner(manager, [BackfillTaskNameKey()], batch_size=2, pause=0).run() == ['0002']
+
+    tasks = list(manager.select(db_name=None, collection_name='tasks', query={}))
+    assert sorted(task['name_key'] for task in tasks) == ['buy milk', 'call mom', 'pay rent']
+    assert MigrationRunner(manager, MIGRATIONS).status()[1]['modified'] == 2
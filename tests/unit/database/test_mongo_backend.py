@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+from unittest.mock import patch
+from database.backends.mongo_backend import MongoBackend
+
+
+@patch('database.backends.mongo_backend.MongoClient')
+def test_client_is_created_lazily(mock_client):
+    backend = MongoBackend(uri='mongodb://localhost:27017')
+    mock_client.assert_not_called()
+
+    client = backend.client
+    assert backend.client is client
+    mock_client.assert_called_once()
+
+
+@patch('database.backends.mongo_backend.os.getpid')
+@patch('database.backends.mongo_backend.MongoClient')
+def test_client_is_recreated_after_fork(mock_client, mock_getpid):
+    mock_getpid.return_value = 100
+    backend = MongoBackend(uri='mongodb://localhost:27017')
+    backend.client
+
+    mock_getpid.return_value = 101
+    backend.client
+    assert mock_client.call_count == 2
+
+
+def test_import_and_create_app_do_not_connect():
+    probe = (
+        "import app\n"
+        "app.create_app()\n"
+        "from database.database_manager import database_manager\n"
+        "assert getattr(database_manager.backend, '_client', None) is None\n"
+        "import sys\n"
+        "assert 'authlib' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True,
+                            env={**os.environ, 'ENSURE_INDEXES_ON_STARTUP': '0'})
+    assert result.returncode == 0, result.stderr
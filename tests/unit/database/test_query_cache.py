@@ -0,0 +1,109 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from bson import ObjectId
+from database.database_manager import DatabaseManager
+from database.backends.mongo_backend import MongoBackend
+from database.query_cache import QueryCache
+
+
+@pytest.fixture
+def cache():
+    return QueryCache(max_size=2, ttl=30)
+
+def put(cache, collection, query, documents):
+    key = QueryCache.make_key('ToDo', collection, query)
+    cache.put(key, query, documents)
+    return key
+
+# Test de acierto y fallo con contadores
+def test_get_hit_and_miss(cache):
+    key = put(cache, 'users', {'email': 'a@example.com'}, [{'email': 'a@example.com'}])
+
+    assert cache.get(key) == [{'email': 'a@example.com'}]
+    assert cache.get(QueryCache.make_key('ToDo', 'users', {'email': 'b@example.com'})) is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+# Test de que los documentos devueltos son copias
+def test_get_returns_copy(cache):
+    key = put(cache, 'tasks', {'user_email': 'a@example.com'}, [{'_id': 1}])
+
+    cache.get(key)[0]['_id'] = 'changed'
+
+    assert cache.get(key) == [{'_id': 1}]
+
+# Test de expulsión LRU
+def test_lru_eviction(cache):
+    first = put(cache, 'users', {'email': 'a'}, [])
+    second = put(cache, 'users', {'email': 'b'}, [])
+    cache.get(first)
+    put(cache, 'users', {'email': 'c'}, [])
+
+    assert cache.get(first) == []
+    assert cache.get(second) is None
+    assert cache.stats()['evictions'] == 1
+
+# Test de expiración por TTL
+def test_ttl_expiration():
+    cache = QueryCache(max_size=10, ttl=5)
+    with patch('database.query_cache.time.monotonic', return_value=100):
+        key = put(cache, 'users', {'email': 'a'}, [])
+    with patch('database.query_cache.time.monotonic', return_value=106):
+        assert cache.get(key) is None
+
+# Test de invalidación precisa por clave
+def test_invalidate_only_matching_keys():
+    cache = QueryCache(max_size=10, ttl=30)
+    user_a = put(cache, 'users', {'email': 'a'}, [])
+    user_b = put(cache, 'users', {'email': 'b'}, [])
+    tasks_a = put(cache, 'tasks', {'user_email': 'a'}, [])
+
+    cache.invalidate('ToDo', 'users', {'email': 'a'}, changed_fields=['tasks'])
+
+    assert cache.get(user_a) is None
+    assert cache.get(user_b) == []
+    assert cache.get(tasks_a) == []
+
+# Test de invalidación cuando la escritura cambia el campo del filtro
+def test_invalidate_changed_field():
+    cache = QueryCache(max_size=10, ttl=30)
+    key = put(cache, 'tasks', {'name': 'Old'}, [])
+
+    cache.invalidate('ToDo', 'tasks', {'name': 'Other'}, changed_fields=['name'])
+
+    assert cache.get(key) is None
+
+# Test de que no se guardan resultados obsoletos por una escritura concurrente
+def test_put_skips_stale_generation(cache):
+    generation = cache.generation('ToDo', 'users')
+    cache.invalidate('ToDo', 'users', None)
+    key = QueryCache.make_key('ToDo', 'users', {'email': 'a'})
+
+    cache.put(key, {'email': 'a'}, [], generation)
+
+    assert cache.get(key) is None
+
+# Test de lectura a través de la caché en DatabaseManager
+def test_database_manager_read_through():
+    manager = DatabaseManager(cache_size=10, cache_ttl=30, backend=MongoBackend())
+    manager.backend.client = MagicMock()
+    collection = manager.client['ToDo']['users']
+    user = {'_id': ObjectId(), 'email': 'a@example.com'}
+    collection.find.return_value = iter([user])
+
+    first = manager.select(db_name=None, collection_name='users', query={'email': 'a@example.com'})
+    second = manager.select(db_name=None, collection_name='users', query={'email': 'a@example.com'})
+    manager.update(db_name=None, collection_name='users', query={'email': 'a@example.com'},
+                   update_data={'password': None})
+    collection.find.return_value = iter([user])
+    manager.select(db_name=None, collection_name='users', query={'email': 'a@example.com'})
+
+    assert first == second == [user]
+    assert collection.find.call_count == 2
+    assert manager.cache_stats()['hits'] == 1
+
+# Test de caché desactivada por defecto
+def test_database_manager_cache_disabled():
+    manager = DatabaseManager(cache_size=0, backend=MongoBackend())
+    assert manager.cache is None
+    assert manager.cache_stats() is None
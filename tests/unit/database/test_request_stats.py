@@ -0,0 +1,67 @@
+import logging
+import time
+from unittest.mock import MagicMock, patch
+import pytest
+from database.database_manager import DatabaseManager
+from database.request_stats import begin_request_stats, end_request_stats, current_request_stats
+
+
+@pytest.fixture
+def manager():
+    return DatabaseManager(cache_size=0, backend=MagicMock())
+
+
+def test_calls_outside_a_request_are_not_counted(manager):
+    manager.insert(None, 'tasks', {'name': 'Test Task'})
+    assert current_request_stats() is None
+
+
+def test_calls_are_counted_per_operation(manager):
+    stats, token = begin_request_stats()
+    try:
+        manager.find_and_modify(None, 'users', {'email': 'test@example.com'}, {'$push': {'tasks': 1}})
+        manager.insert(None, 'tasks', {'name': 'Test Task'})
+        manager.select(None, 'tasks', {'user_email': 'test@example.com'}, limit=10)
+    finally:
+        end_request_stats(token)
+
+    assert stats.calls == 3
+    assert stats.operations == {'find_and_modify:users': 1, 'insert:tasks': 1, 'find:tasks': 1}
+
+
+# Test de que el tiempo de recorrer el cursor (cuando se ejecuta la consulta) se contabiliza
+def test_find_duration_includes_iteration(manager):
+    def slow_cursor():
+        for i in range(3):
+            time.sleep(0.05)
+            yield {'_id': i}
+    manager.backend.find.return_value = slow_cursor()
+
+    stats, token = begin_request_stats()
+    try:
+        documents = list(manager.select(None, 'tasks', {'user_email': 'test@example.com'}))
+    finally:
+        end_request_stats(token)
+
+    assert len(documents) == 3
+    assert stats.calls == 1
+    assert stats.duration >= 0.15
+
+
+def test_server_timing_header_and_budget_warning(manager, caplog):
+    from app import create_app
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False), \
+            patch('app.db_accounting.Config.DB_ROUND_TRIP_BUDGET', 2):
+        app = create_app()
+
+        @app.route('/n-plus-one')
+        def n_plus_one():
+            for _ in range(3):
+                manager.select(None, 'tasks', {'user_email': 'test@example.com'})
+            return 'ok'
+
+        with caplog.at_level(logging.WARNING):
+            response = app.test_client().get('/n-plus-one')
+
+    assert 'db;desc="3 calls"' in response.headers['Server-Timing']
+    assert 'find:tasks x3' in caplog.text
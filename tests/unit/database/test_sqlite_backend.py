@@ -0,0 +1,158 @@
+import pytest
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(cache_size=0, backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    return manager
+
+def add_tasks(manager, user_email, user_id, count):
+    return [
+        manager.insert(db_name=None, collection_name='tasks',
+                       data={'name': f'Task {i}', 'priority': 'high', 'user_email': user_email, 'user_id': user_id})
+        for i in range(count)
+    ]
+
+# Test de que la base de datos usa el modo WAL
+def test_wal_mode(manager):
+    connection = manager.backend._connection()
+    assert connection.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+# Test de inserción y selección por igualdad, incluido un campo ObjectId
+def test_insert_and_select(manager):
+    user_id = ObjectId()
+    add_tasks(manager, 'a@example.com', user_id, 2)
+    add_tasks(manager, 'b@example.com', ObjectId(), 1)
+
+    tasks = list(manager.select(db_name=None, collection_name='tasks',
+                                query={'user_id': user_id, 'name': 'Task 1'}))
+
+    assert len(tasks) == 1
+    assert tasks[0]['user_id'] == user_id
+    assert isinstance(tasks[0]['_id'], ObjectId)
+
+# Test de paginación por keyset y proyección
+def test_keyset_pagination_and_projection(manager):
+    ids = add_tasks(manager, 'a@example.com', ObjectId(), 5)
+
+    page = list(manager.select(db_name=None, collection_name='tasks', query={'user_email': 'a@example.com'},
+                               projection={'name': 1}, limit=2, after=ids[1]))
+
+    assert [str(task['_id']) for task in page] == ids[2:4]
+    assert set(page[0]) == {'_id', 'name'}
+
+# Test del índice único sobre users.email
+def test_unique_email_index(manager):
+    manager.insert(db_name=None, collection_name='users', data={'email': 'a@example.com', 'tasks': []})
+
+    with pytest.raises(DuplicateKeyError):
+        manager.insert(db_name=None, collection_name='users', data={'email': 'a@example.com', 'tasks': []})
+
+    result = manager.bulk_insert(db_name=None, collection_name='users',
+                                 documents=[{'email': 'b@example.com'}, {'email': 'a@example.com'}])
+    assert result['inserted'] == 1
+    assert result['errors'][0]['index'] == 1
+
+# Test de operadores de actualización atómicos
+def test_find_and_modify_push_and_pull(manager):
+    manager.insert(db_name=None, collection_name='users', data={'email': 'a@example.com', 'tasks': []})
+    task_id = ObjectId()
+
+    previous = manager.find_and_modify(db_name=None, collection_name='users', query={'email': 'a@example.com'},
+                                       update={'$push': {'tasks': task_id}}, projection={'_id': 1})
+    user = next(iter(manager.select(db_name=None, collection_name='users', query={'email': 'a@example.com'})))
+
+    assert set(previous) == {'_id'}
+    assert user['tasks'] == [task_id]
+
+    manager.find_and_modify(db_name=None, collection_name='users', query={'_id': user['_id']},
+                            update={'$pull': {'tasks': task_id}})
+    user = next(iter(manager.select(db_name=None, collection_name='users', query={'_id': user['_id']})))
+    assert user['tasks'] == []
+
+# Test de actualización y eliminación
+def test_update_and_delete(manager):
+    task_id = add_tasks(manager, 'a@example.com', ObjectId(), 1)[0]
+
+    assert manager.update(db_name=None, collection_name='tasks', query={'_id': ObjectId(task_id)},
+                          update_data={'name': 'Edited'}) == 1
+    assert manager.update(db_name=None, collection_name='tasks', query={'_id': ObjectId(task_id)},
+                          update_data={'name': 'Edited'}) == 0
+    assert manager.delete('tasks', {'_id': ObjectId(task_id)}) == 1
+    assert manager.delete('tasks', {'_id': ObjectId(task_id)}) == 0
+
+# Test de update_many con $in y $unset
+def test_update_many_in_and_unset(manager):
+    ids = [manager.insert(db_name=None, collection_name='users',
+                          data={'email': f'{i}@example.com', 'tasks': [ObjectId()]}) for i in range(3)]
+    manager.insert(db_name=None, collection_name='users', data={'email': 'no-tasks@example.com'})
+
+    modified = manager.update_many(db_name=None, collection_name='users',
+                                   query={'_id': {'$in': [ObjectId(user_id) for user_id in ids[:2]]}},
+                                   update={'$unset': {'tasks': ''}})
+    users = {user['email']: user for user in manager.select(db_name=None, collection_name='users', query={})}
+
+    assert modified == 2
+    assert 'tasks' not in users['0@example.com'] and 'tasks' not in users['1@example.com']
+    assert 'tasks' in users['2@example.com']
+    assert manager.update_many(db_name=None, collection_name='users', query={'_id': {'$in': []}},
+                               update={'$unset': {'tasks': ''}}) == 0
+
+# Test de bulk_write ordenado y no ordenado
+@pytest.mark.parametrize('ordered, deleted', [(True, 0), (False, 1)])
+def test_bulk_write(manager, ordered, deleted):
+    first = manager.insert(db_name=None, collection_name='users', data={'email': 'a@example.com'})
+    second = manager.insert(db_name=None, collection_name='users', data={'email': 'b@example.com'})
+
+    result = manager.bulk_write(db_name=None, collection_name='users', ordered=ordered, operations=[
+        {'update_one': {'query': {'_id': ObjectId(first)}, 'update': {'$set': {'name': 'A'}}}},
+        {'update_one': {'query': {'_id': ObjectId(second)}, 'update': {'$set': {'email': 'a@example.com'}}}},
+        {'delete_one': {'query': {'_id': ObjectId(second)}}},
+    ])
+
+    assert (result['matched'], result['modified'], result['deleted']) == (2, 1, deleted)
+    assert [error['index'] for error in result['errors']] == [1]
+    users = list(manager.select(db_name=None, collection_name='users', query={'_id': ObjectId(first)}))
+    assert users[0]['name'] == 'A'
+
+# Test de upsert: crea el documento desde el filtro y $setOnInsert, y no lo repite
+def test_upsert_set_on_insert(manager):
+    update = {'$setOnInsert': {'password': 'hash'}, '$set': {'name': 'A'}}
+    created_id = manager.upsert(db_name=None, collection_name='users', query={'email': 'a@example.com'}, update=update)
+    assert isinstance(created_id, ObjectId)
+
+    update = {'$setOnInsert': {'password': 'other'}, '$set': {'name': 'B'}}
+    assert manager.upsert(db_name=None, collection_name='users', query={'email': 'a@example.com'}, update=update) is None
+    users = list(manager.select(db_name=None, collection_name='users', query={}))
+    assert users == [{'_id': created_id, 'email': 'a@example.com', 'password': 'hash', 'name': 'B'}]
+
+# Test de que los upserts concurrentes del mismo filtro crean un solo documento
+def test_concurrent_upserts(manager):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def upsert(_):
+        return manager.upsert(db_name=None, collection_name='users', query={'email': 'a@example.com'},
+                              update={'$setOnInsert': {'password': None}})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = [created_id for created_id in pool.map(upsert, range(32)) if created_id is not None]
+    assert len(created) == 1
+    assert len(list(manager.select(db_name=None, collection_name='users', query={}))) == 1
+
+# Test de que las consultas registradas usan índices
+def test_query_shapes_use_indexes(manager):
+    report = manager.explain_query_shapes()
+
+    assert report
+    assert not any(entry['collscan'] for entry in report), report
+    assert not any(entry['in_memory_sort'] for entry in report), report
+
+# Test de operadores no soportados
+def test_unsupported_operator(manager):
+    with pytest.raises(NotImplementedError):
+        list(manager.select(db_name=None, collection_name='tasks', query={'name': {'$regex': 'Task'}}))
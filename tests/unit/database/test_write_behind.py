@@ -0,0 +1,179 @@
+import time
+from unittest.mock import patch
+import pytest
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+from database.request_stats import begin_request_stats, end_request_stats
+from database.write_behind import WriteBehindQueue, _merge_update
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    return manager
+
+@pytest.fixture
+def make_queue(manager):
+    queues = []
+
+    def make(**options):
+        options = {'workers': 2, 'max_size': 1000, 'batch_size': 100, 'flush_interval': 60,
+                   'enqueue_timeout': 0.01, **options}
+        queue = WriteBehindQueue(manager, **options)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close(timeout=5)
+
+def seed_users(manager, count):
+    manager.bulk_insert(None, 'users', [{'email': f'user{i}@example.com', 'logins': 0} for i in range(count)])
+
+def user(manager, email):
+    return list(manager.select(db_name=None, collection_name='users', query={'email': email}))[0]
+
+# Test de la combinación de actualizaciones de un mismo documento
+@pytest.mark.parametrize('pending, update, expected', [
+    ({'$set': {'a': 1}}, {'$set': {'a': 2, 'b': 1}}, {'$set': {'a': 2, 'b': 1}}),
+    ({'$inc': {'n': 1}}, {'$inc': {'n': 2}, '$set': {'a': 1}}, {'$inc': {'n': 3}, '$set': {'a': 1}}),
+    ({'$set': {'a': 1}}, {'$unset': {'a': ''}}, {'$unset': {'a': ''}}),
+    ({'$push': {'l': 1}}, {'$push': {'l': {'$each': [2, 3]}}}, {'$push': {'l': {'$each': [1, 2, 3]}}}),
+    ({'$push': {'l': {'e': 1}}}, {'$push': {'l': {'e': 2}}}, {'$push': {'l': {'$each': [{'e': 1}, {'e': 2}]}}}),
+])
+def test_merge_update(pending, update, expected):
+    assert _merge_update(pending, update) is True
+    assert pending == expected
+
+@pytest.mark.parametrize('update', [{'$inc': {'a': 1}}, {'$pull': {'b': 1}}])
+def test_merge_update_conflicts(update):
+    pending = {'$set': {'a': 1}}
+    assert _merge_update(pending, update) is False
+    assert pending == {'$set': {'a': 1}}
+
+# Test de que los $push con modificadores no se combinan
+@pytest.mark.parametrize('pending, update', [
+    ({'$push': {'l': {'$each': [1], '$slice': -5}}}, {'$push': {'l': 2}}),
+    ({'$push': {'l': 1}}, {'$push': {'l': {'$each': [2], '$position': 0}}}),
+])
+def test_merge_update_push_modifiers(pending, update):
+    original = {operator: dict(values) for operator, values in pending.items()}
+    assert _merge_update(pending, update) is False
+    assert pending == original
+
+# Test de que dos $push de documentos a una misma clave se combinan (registros de auditoría)
+def test_push_documents_to_same_key(manager, make_queue):
+    seed_users(manager, 1)
+    queue = make_queue()
+    query = {'email': 'user0@example.com'}
+    queue.update(None, 'users', query, {'$push': {'audit': {'event': 'login'}}})
+    queue.update(None, 'users', query, {'$push': {'audit': {'event': 'logout'}}})
+    assert queue.depth() == 1
+    assert queue.flush(timeout=5)
+    assert user(manager, 'user0@example.com')['audit'] == [{'event': 'login'}, {'event': 'logout'}]
+
+# Test de que las escrituras de una misma clave se combinan en una sola
+def test_writes_to_same_key_are_coalesced(manager, make_queue):
+    seed_users(manager, 1)
+    queue = make_queue()
+    with patch.object(manager, 'bulk_write', wraps=manager.bulk_write) as bulk_write:
+        for i in range(100):
+            queue.update(None, 'users', {'email': 'user0@example.com'},
+                         {'$inc': {'logins': 1}, '$set': {'last_login': i}})
+        assert queue.depth() == 1
+        assert queue.flush(timeout=5)
+    assert bulk_write.call_count == 1
+    document = user(manager, 'user0@example.com')
+    assert document['logins'] == 100 and document['last_login'] == 99
+    assert manager.metrics.write_behind_writes.value(('coalesced',)) == 99
+
+# Test de que las actualizaciones incompatibles de una clave se aplican en orden
+def test_unmergeable_updates_keep_their_order(manager, make_queue):
+    seed_users(manager, 1)
+    queue = make_queue()
+    query = {'email': 'user0@example.com'}
+    queue.update(None, 'users', query, {'$push': {'tags': {'$each': ['a', 'b']}}})
+    queue.update(None, 'users', query, {'$pull': {'tags': 'a'}})
+    queue.update(None, 'users', query, {'$push': {'tags': 'c'}})
+    assert queue.flush(timeout=5)
+    assert user(manager, 'user0@example.com')['tags'] == ['b', 'c']
+
+# Test de que la cola escribe en lotes de batch_size y fuera de la petición
+def test_writes_are_flushed_in_batches(manager, make_queue):
+    seed_users(manager, 50)
+    queue = make_queue(workers=1, batch_size=20)
+    stats, token = begin_request_stats()
+    try:
+        with patch.object(manager, 'bulk_write', wraps=manager.bulk_write) as bulk_write:
+            for i in range(50):
+                queue.update(None, 'users', {'email': f'user{i}@example.com'}, {'$set': {'seen': True}})
+            assert queue.flush(timeout=5)
+    finally:
+        end_request_stats(token)
+    assert [len(call.args[2]) for call in bulk_write.call_args_list] == [20, 20, 10]
+    assert stats.calls == 0
+    assert len(list(manager.select(db_name=None, collection_name='users', query={'seen': True}))) == 50
+
+# Test del envío por tiempo: una escritura sola sale tras flush_interval
+def test_flush_interval(manager, make_queue):
+    seed_users(manager, 1)
+    queue = make_queue(flush_interval=0.05)
+    queue.update(None, 'users', {'email': 'user0@example.com'}, {'$set': {'seen': True}})
+    queue.insert(None, 'audit', {'event': 'login', 'email': 'user0@example.com'})
+    deadline = time.monotonic() + 5
+    while manager.metrics.write_behind_writes.value(('written',)) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert user(manager, 'user0@example.com')['seen'] is True
+    assert len(list(manager.select(db_name=None, collection_name='audit', query={}))) == 1
+
+# Test de la contrapresión: con la cola llena, quien escribe lo hace él mismo
+def test_backpressure_writes_directly(manager, make_queue):
+    seed_users(manager, 3)
+    queue = make_queue(max_size=2)
+    for i in range(3):
+        queue.update(None, 'users', {'email': f'user{i}@example.com'}, {'$set': {'seen': True}})
+    assert queue.depth() == 2
+    assert user(manager, 'user2@example.com')['seen'] is True
+    assert 'seen' not in user(manager, 'user0@example.com')
+    assert manager.metrics.write_behind_writes.value(('direct',)) == 1
+
+# Test del cierre ordenado: lo pendiente se escribe y lo posterior va directo
+def test_close_flushes_pending_writes(manager, make_queue):
+    seed_users(manager, 10)
+    queue = make_queue()
+    for i in range(10):
+        queue.update(None, 'users', {'email': f'user{i}@example.com'}, {'$inc': {'logins': 1}})
+    assert queue.close(timeout=5)
+    assert all(document['logins'] == 1 for document in manager.select(db_name=None, collection_name='users', query={}))
+
+    queue.update(None, 'users', {'email': 'user0@example.com'}, {'$inc': {'logins': 1}})
+    assert user(manager, 'user0@example.com')['logins'] == 2
+
+# Test de las métricas de profundidad de la cola y latencia de los lotes
+def test_metrics(manager, make_queue):
+    seed_users(manager, 1)
+    queue = make_queue()
+    queue.update(None, 'users', {'email': 'user0@example.com'}, {'$set': {'seen': True}})
+    assert 'todo_write_behind_queue_depth 1' in manager.render_metrics()
+    queue.flush(timeout=5)
+    metrics = manager.render_metrics()
+    assert 'todo_write_behind_queue_depth 0' in metrics
+    assert 'todo_write_behind_flush_duration_seconds_count{collection="users"} 1' in metrics
+    assert 'todo_write_behind_writes_total{result="written"} 1' in metrics
+
+# Test de la marca de último acceso: no añade viajes a la base de datos en la petición
+def test_record_login_is_written_behind(manager, make_queue):
+    from app.logic.users_logic import record_login_logic
+    seed_users(manager, 1)
+    queue = make_queue()
+    stats, token = begin_request_stats()
+    try:
+        with patch('app.logic.users_logic.write_behind', queue):
+            record_login_logic('user0@example.com')
+            record_login_logic('user0@example.com')
+    finally:
+        end_request_stats(token)
+    assert stats.calls == 0
+    assert queue.flush(timeout=5)
+    assert 'last_login' in user(manager, 'user0@example.com')
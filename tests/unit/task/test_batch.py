@@ -0,0 +1,129 @@
+from unittest.mock import patch
+import pytest
+from bson import ObjectId
+from app import create_app
+from app.logic.batch_logic import batch_tasks_logic, MAX_BATCH_OPERATIONS
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+
+EMAIL = 'test@example.com'
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    manager.insert(db_name=None, collection_name='users', data={'email': EMAIL, 'password': None})
+    with patch('app.logic.batch_logic.database_manager', manager), \
+            patch('app.logic.etag_logic.database_manager', manager):
+        yield manager
+
+def add_tasks(manager, count, user_email=EMAIL):
+    return [manager.insert(db_name=None, collection_name='tasks',
+                           data={'name': f'Task {i}', 'priority': 'low', 'user_email': user_email})
+            for i in range(count)]
+
+def tasks_by_id(manager):
+    return {str(task['_id']): task for task in manager.select(db_name=None, collection_name='tasks', query={})}
+
+def tasks_version(manager):
+    return next(iter(manager.select(db_name=None, collection_name='users', query={'email': EMAIL})))['tasks_version']
+
+# Test de un lote con ediciones, cambios de prioridad y eliminaciones
+def test_batch_mixed_operations(manager):
+    ids = add_tasks(manager, 3)
+
+    summary = batch_tasks_logic(EMAIL, [
+        {'op': 'edit', 'id': ids[0], 'name': 'Renamed', 'priority': 'HIGH'},
+        {'op': 'priority', 'id': ids[1], 'priority': 'medium'},
+        {'op': 'delete', 'id': ids[2]},
+    ])
+
+    tasks = tasks_by_id(manager)
+    assert [result['status'] for result in summary['results']] == ['ok', 'ok', 'ok']
+    assert (summary['matched'], summary['modified'], summary['deleted']) == (2, 2, 1)
+    assert tasks[ids[0]]['name'] == 'Renamed' and tasks[ids[0]]['priority'] == 'high'
+    assert tasks[ids[1]]['priority'] == 'medium'
+    assert ids[2] not in tasks
+    assert tasks_version(manager) == 1
+
+# Test de que las tareas de otros usuarios se informan como no encontradas
+def test_batch_only_touches_own_tasks(manager):
+    own = add_tasks(manager, 1)[0]
+    other = add_tasks(manager, 1, user_email='other@example.com')[0]
+
+    summary = batch_tasks_logic(EMAIL, [{'op': 'delete', 'id': other}, {'op': 'delete', 'id': own}],
+                                ordered=False)
+
+    assert [result['status'] for result in summary['results']] == ['not_found', 'ok']
+    assert set(tasks_by_id(manager)) == {other}
+
+# Test de que un lote ordenado se detiene en la primera tarea no encontrada
+def test_ordered_batch_stops_at_not_found(manager):
+    ids = add_tasks(manager, 2)
+
+    summary = batch_tasks_logic(EMAIL, [
+        {'op': 'priority', 'id': ids[0], 'priority': 'high'},
+        {'op': 'delete', 'id': str(ObjectId())},
+        {'op': 'delete', 'id': ids[1]},
+    ])
+
+    assert [result['status'] for result in summary['results']] == ['ok', 'not_found', 'skipped']
+    tasks = tasks_by_id(manager)
+    assert tasks[ids[0]]['priority'] == 'high'
+    assert ids[1] in tasks
+
+# Test de lotes ordenados y no ordenados con una operación inválida
+@pytest.mark.parametrize('ordered, statuses', [
+    (True, ['ok', 'invalid', 'skipped']),
+    (False, ['ok', 'invalid', 'ok']),
+])
+def test_batch_invalid_operation(manager, ordered, statuses):
+    ids = add_tasks(manager, 2)
+
+    summary = batch_tasks_logic(EMAIL, [
+        {'op': 'priority', 'id': ids[0], 'priority': 'high'},
+        {'op': 'priority', 'id': ids[1], 'priority': 'urgent'},
+        {'op': 'delete', 'id': ids[1]},
+    ], ordered=ordered)
+
+    assert [result['status'] for result in summary['results']] == statuses
+    assert 'Prioridad inválida' in summary['results'][1]['error']
+    assert (ids[1] in tasks_by_id(manager)) == ordered
+
+# Test de que un lote sin cambios no incrementa la versión de las tareas
+def test_batch_without_matches_keeps_version(manager):
+    summary = batch_tasks_logic(EMAIL, [{'op': 'delete', 'id': str(ObjectId())}, {'op': 'delete', 'id': 'x'}],
+                                ordered=False)
+
+    assert [result['status'] for result in summary['results']] == ['not_found', 'invalid']
+    user = next(iter(manager.select(db_name=None, collection_name='users', query={'email': EMAIL})))
+    assert 'tasks_version' not in user
+
+# Test de los límites del lote
+def test_batch_limits(manager):
+    with pytest.raises(ValueError):
+        batch_tasks_logic(EMAIL, [])
+    with pytest.raises(ValueError):
+        batch_tasks_logic(EMAIL, [{'op': 'delete', 'id': str(ObjectId())}] * (MAX_BATCH_OPERATIONS + 1))
+
+# Test de la ruta con JSON y con el formulario de selección múltiple
+def test_batch_route(manager):
+    ids = add_tasks(manager, 3)
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    client = app.test_client()
+
+    assert client.post('/tasks/batch', json={'operations': []}).status_code == 401
+    with client.session_transaction() as session:
+        session['user_email'] = EMAIL
+
+    response = client.post('/tasks/batch', json={'operations': [{'op': 'delete', 'id': ids[0]}]})
+    assert response.status_code == 200
+    assert response.get_json()['results'] == [{'index': 0, 'id': ids[0], 'status': 'ok'}]
+    assert client.post('/tasks/batch', json={'ops': []}).status_code == 400
+
+    response = client.post('/tasks/batch', data={'action': 'priority', 'priority': 'high', 'task_ids': ids[1:]})
+    assert response.status_code == 302
+    assert {task['priority'] for task in tasks_by_id(manager).values()} == {'high'}
@@ -0,0 +1,66 @@
+from unittest.mock import patch
+import pytest
+from bson import ObjectId
+from app import create_app
+
+
+@pytest.fixture
+def client():
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_email'] = 'test@example.com'
+    return client
+
+
+def mock_version(mock_users_db, version):
+    mock_users_db.select.return_value = [{'_id': ObjectId(), 'tasks_version': version}]
+
+
+def mock_tasks(mock_tasks_db, tasks):
+    mock_tasks_db.select.return_value = tasks
+
+
+@pytest.mark.parametrize('path', ['/home', '/tasks'])
+@patch('app.logic.task_logic.database_manager')
+@patch('app.logic.etag_logic.database_manager')
+def test_unchanged_tasks_return_304_without_querying_tasks(mock_users_db, mock_tasks_db, client, path):
+    mock_version(mock_users_db, 3)
+    mock_tasks(mock_tasks_db, [{'_id': ObjectId(), 'name': 'Test Task', 'priority': 'high'}])
+
+    response = client.get(path)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    mock_tasks_db.select.reset_mock()
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    mock_tasks_db.select.assert_not_called()
+
+
+@patch('app.logic.task_logic.database_manager')
+@patch('app.logic.etag_logic.database_manager')
+def test_new_version_changes_etag(mock_users_db, mock_tasks_db, client):
+    mock_tasks(mock_tasks_db, [])
+    mock_version(mock_users_db, 3)
+    etag = client.get('/home').headers['ETag']
+
+    mock_version(mock_users_db, 4)
+    response = client.get('/home', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+@patch('app.logic.etag_logic.database_manager')
+@patch('app.routes.tasks.update_task')
+def test_edit_task_bumps_version(mock_update_task, mock_db, client):
+    response = client.post(f'/edit-task/{ObjectId()}', data={'new_name': 'Task', 'new_priority': 'low'})
+
+    assert response.status_code == 302
+    mock_db.find_and_modify.assert_called_once()
+    assert mock_db.find_and_modify.call_args.kwargs['query'] == {'email': 'test@example.com'}
+    assert mock_db.find_and_modify.call_args.kwargs['update'] == {'$inc': {'tasks_version': 1}}
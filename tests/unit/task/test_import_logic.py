@@ -0,0 +1,80 @@
+import io
+import json
+import pytest
+from unittest.mock import patch
+from bson import ObjectId
+from app.logic.import_logic import import_tasks_logic, iter_ndjson_rows, iter_csv_rows
+
+
+@pytest.fixture
+def mock_user():
+    return {'_id': ObjectId(), 'email': 'test@example.com'}
+
+def ndjson(*rows):
+    return io.BytesIO('\n'.join(json.dumps(row) for row in rows).encode('utf-8'))
+
+# Test del lector NDJSON con líneas inválidas
+def test_iter_ndjson_rows():
+    stream = io.BytesIO(b'{"name": "a", "priority": "low"}\n\n{bad\n[1]\n')
+
+    rows = list(iter_ndjson_rows(stream))
+
+    assert rows[0] == (1, {'name': 'a', 'priority': 'low'}, None)
+    assert rows[1][0] == 3 and rows[1][2] is not None
+    assert rows[2][0] == 4 and rows[2][2] is not None
+
+# Test del lector CSV con cabecera
+def test_iter_csv_rows():
+    stream = io.BytesIO(b'name,priority\nTask A,high\nTask B,low\n')
+
+    rows = list(iter_csv_rows(stream))
+
+    assert rows == [
+        (2, {'name': 'Task A', 'priority': 'high'}, None),
+        (3, {'name': 'Task B', 'priority': 'low'}, None)
+    ]
+
+# Test de importación en lotes con errores de validación por fila
+@patch('app.logic.import_logic.database_manager')
+def test_import_tasks_in_batches(mock_db, mock_user):
+    mock_db.select.return_value = iter([mock_user])
+    mock_db.bulk_insert.side_effect = lambda **kwargs: {'inserted': len(kwargs['documents']), 'errors': []}
+    stream = ndjson(
+        {'name': 'Task 1', 'priority': 'high'},
+        {'name': '', 'priority': 'high'},
+        {'name': 'Task 2', 'priority': 'urgent'},
+        {'name': 'Task 3', 'priority': 'Low'},
+        {'name': 'Task 4', 'priority': 'medium'}
+    )
+
+    summary = import_tasks_logic(mock_user['email'], iter_ndjson_rows(stream), batch_size=2)
+
+    assert summary['inserted'] == 3
+    assert summary['failed'] == 2
+    assert [error['line'] for error in summary['errors']] == [2, 3]
+    assert mock_db.bulk_insert.call_count == 2
+    documents = mock_db.bulk_insert.call_args_list[0].kwargs['documents']
+    assert [task['name'] for task in documents] == ['Task 1', 'Task 3']
+    assert documents[1]['priority'] == 'low'
+    assert documents[0]['user_id'] == mock_user['_id']
+
+# Test de errores de escritura devueltos por la base de datos
+@patch('app.logic.import_logic.database_manager')
+def test_import_tasks_write_errors(mock_db, mock_user):
+    mock_db.select.return_value = iter([mock_user])
+    mock_db.bulk_insert.return_value = {'inserted': 1, 'errors': [{'index': 1, 'error': 'duplicate key'}]}
+    stream = ndjson({'name': 'Task 1', 'priority': 'high'}, {'name': 'Task 2', 'priority': 'high'})
+
+    summary = import_tasks_logic(mock_user['email'], iter_ndjson_rows(stream))
+
+    assert summary == {'inserted': 1, 'failed': 1, 'errors': [{'line': 2, 'error': 'duplicate key'}]}
+    assert mock_db.find_and_modify.call_args.kwargs['update'] == {'$inc': {'tasks_version': 1}}
+
+# Test de usuario inexistente
+@patch('app.logic.import_logic.database_manager')
+def test_import_tasks_user_not_found(mock_db):
+    mock_db.select.return_value = iter([])
+
+    with pytest.raises(ValueError, match="Usuario no encontrado."):
+        import_tasks_logic('nonexistent@example.com', iter([]))
+    mock_db.bulk_insert.assert_not_called()
@@ -0,0 +1,99 @@
+import json
+import bson
+import pytest
+from unittest.mock import patch
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+from app.logic.json_stream import iter_ndjson, iter_json_array
+from app import create_app
+from app.logic.task_logic import iter_tasks
+from app.logic.records import Task
+
+
+@pytest.fixture
+def raw_tasks():
+    tasks = [
+        {'_id': ObjectId(), 'name': 'Task 1', 'priority': 'high', 'user_id': ObjectId()},
+        {'_id': ObjectId(), 'name': 'Tarea 2', 'priority': 'low', 'user_id': ObjectId()}
+    ]
+    return tasks, [RawBSONDocument(bson.encode(task)) for task in tasks]
+
+# Test de NDJSON: una línea por documento y ObjectId como string
+def test_iter_ndjson(raw_tasks):
+    tasks, raw = raw_tasks
+
+    lines = list(iter_ndjson(raw))
+
+    assert len(lines) == 2
+    assert all(line.endswith('\n') for line in lines)
+    decoded = json.loads(lines[0])
+    assert decoded['_id'] == str(tasks[0]['_id'])
+    assert decoded['user_id'] == str(tasks[0]['user_id'])
+
+# Test del array JSON en streaming
+def test_iter_json_array(raw_tasks):
+    tasks, raw = raw_tasks
+
+    decoded = json.loads(''.join(iter_json_array(raw)))
+
+    assert [task['name'] for task in decoded] == ['Task 1', 'Tarea 2']
+    assert json.loads(''.join(iter_json_array([]))) == []
+
+# Test de que el generador consume el cursor de forma perezosa
+def test_iter_ndjson_is_lazy(raw_tasks):
+    _, raw = raw_tasks
+    cursor = iter(raw)
+
+    stream = iter_ndjson(cursor)
+    next(stream)
+
+    assert next(cursor, None) is raw[1]
+
+# Test del cursor en modo raw
+@patch('app.logic.task_logic.database_manager')
+def test_iter_tasks_uses_raw_cursor(mock_db):
+    after = ObjectId()
+
+    iter_tasks('test@example.com', after=str(after))
+
+    mock_db.select.assert_called_once_with(
+        db_name=None,
+        collection_name='tasks',
+        query={'user_email': 'test@example.com'},
+        projection=Task.FIELDS,
+        after=after,
+        raw=True
+    )
+
+def test_iter_tasks_invalid_cursor():
+    with pytest.raises(ValueError):
+        iter_tasks('test@example.com', after='not-an-id')
+
+@pytest.fixture
+def client():
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    return app.test_client()
+
+# Test de que la exportación exige sesión y solo recorre las tareas del usuario
+@pytest.mark.parametrize('output_format', ['ndjson', 'stream'])
+@patch('app.logic.task_logic.database_manager')
+def test_stream_tasks_requires_session(mock_db, client, output_format):
+    response = client.get(f'/tasks?format={output_format}')
+
+    assert response.status_code == 401
+    mock_db.select.assert_not_called()
+
+@patch('app.logic.task_logic.database_manager')
+def test_stream_tasks_only_returns_user_tasks(mock_db, client, raw_tasks):
+    tasks, raw = raw_tasks
+    mock_db.select.return_value = iter(raw)
+    with client.session_transaction() as session:
+        session['user_email'] = 'test@example.com'
+
+    response = client.get('/tasks?format=ndjson')
+
+    assert response.status_code == 200
+    assert [json.loads(line)['name'] for line in response.data.splitlines()] == ['Task 1', 'Tarea 2']
+    assert mock_db.select.call_args.kwargs['query'] == {'user_email': 'test@example.com'}
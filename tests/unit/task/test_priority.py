@@ -0,0 +1,83 @@
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.logic.records import priority_rank, UNKNOWN_PRIORITY_RANK
+from app.logic.task_logic import get_tasks_page, get_top_tasks, MAX_TOP_K
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+from database.migrations import MigrationRunner
+from database.migrations.m0003_task_priority_rank import BackfillTaskPriorityRank
+
+EMAIL = 'test@example.com'
+PRIORITIES = ['low', 'high', 'medium', 'high', 'low', 'medium', 'high']
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    manager.bulk_insert(db_name=None, collection_name='tasks', documents=[
+        {'name': f'Task {i}', 'priority': priority, 'priority_rank': priority_rank(priority), 'user_email': EMAIL}
+        for i, priority in enumerate(PRIORITIES)
+    ] + [{'name': 'Other', 'priority': 'high', 'priority_rank': 0, 'user_email': 'other@example.com'}])
+    with patch('app.logic.task_logic.database_manager', manager):
+        yield manager
+
+# Test del rango numérico de la prioridad
+def test_priority_rank():
+    assert [priority_rank(p) for p in ('High', 'medium', 'LOW')] == [0, 1, 2]
+    assert priority_rank('urgent') == priority_rank(None) == UNKNOWN_PRIORITY_RANK
+
+# Test de las tareas más urgentes: por prioridad y, a igual prioridad, por antigüedad
+def test_get_top_tasks(manager):
+    assert [task.name for task in get_top_tasks(EMAIL, 4)] == ['Task 1', 'Task 3', 'Task 6', 'Task 2']
+    assert len(get_top_tasks(EMAIL, MAX_TOP_K + 1)) == len(PRIORITIES)
+    for k in (0, 'x', None):
+        with pytest.raises(ValueError):
+            get_top_tasks(EMAIL, k)
+
+# Test de la paginación por prioridad con cursor (rango, _id)
+def test_priority_pagination(manager):
+    names, after = [], None
+    while True:
+        tasks, after = get_tasks_page(user_email=EMAIL, limit=3, after=after, order='priority')
+        names += [task.name for task in tasks]
+        if after is None:
+            break
+    assert names == ['Task 1', 'Task 3', 'Task 6', 'Task 2', 'Task 5', 'Task 0', 'Task 4']
+    for after in ('x', '1:x', 'abc:' + '0' * 24):
+        with pytest.raises(ValueError):
+            get_tasks_page(user_email=EMAIL, after=after, order='priority')
+
+# Test de que el orden por prioridad usa el índice sin ordenar en memoria
+def test_top_tasks_use_index(manager):
+    plan = next(entry for entry in manager.explain_query_shapes() if entry['name'] == 'tasks.top_by_priority')
+    assert not plan['collscan']
+    assert not plan['in_memory_sort']
+
+# Test de la migración 0003: rellena priority_rank en las tareas antiguas
+def test_backfill_task_priority_rank(manager):
+    manager.update_many(db_name=None, collection_name='tasks', query={}, update={'$unset': {'priority_rank': ''}})
+    manager.update(db_name=None, collection_name='tasks', query={'name': 'Task 0'}, update_data={'priority': 'urgent'})
+
+    assert MigrationRunner(manager, [BackfillTaskPriorityRank()], batch_size=3, pause=0).run() == ['0003']
+    ranks = {task.name: task.priority_rank for task in get_top_tasks(EMAIL, MAX_TOP_K)}
+    assert ranks == {'Task 0': UNKNOWN_PRIORITY_RANK, 'Task 1': 0, 'Task 2': 1, 'Task 3': 0,
+                     'Task 4': 2, 'Task 5': 1, 'Task 6': 0}
+
+# Test de la ruta /tasks/top
+def test_top_tasks_route(manager):
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    client = app.test_client()
+
+    assert client.get('/tasks/top').status_code == 401
+    with client.session_transaction() as session:
+        session['user_email'] = EMAIL
+
+    response = client.get('/tasks/top?k=2')
+    assert response.status_code == 200
+    assert [task['name'] for task in response.get_json()['tasks']] == ['Task 1', 'Task 3']
+    assert response.get_json()['tasks'][0]['priority_rank'] == 0
+    assert client.get('/tasks/top?k=0').status_code == 400
@@ -0,0 +1,28 @@
+from bson import ObjectId
+from app.logic.records import Task, User
+
+
+def test_task_from_projected_document():
+    task_id = ObjectId()
+    task = Task.from_document({'_id': task_id, 'name': 'Test Task', 'priority': 'high'})
+
+    assert task.id == task_id
+    assert task.name == 'Test Task'
+    assert task.user_email is None
+    assert not hasattr(task, '__dict__')
+
+
+def test_task_to_dict_only_includes_loaded_fields():
+    task_id, user_id = ObjectId(), ObjectId()
+    task = Task(task_id, 'Test Task', 'low', user_id=user_id)
+
+    assert task.to_dict() == {'_id': str(task_id), 'name': 'Test Task', 'priority': 'low', 'user_id': str(user_id)}
+
+
+def test_user_ignores_tasks_array():
+    user_id = ObjectId()
+    user = User.from_document({'_id': user_id, 'email': 'test@example.com', 'password': 'hash',
+                               'tasks': [ObjectId()]})
+
+    assert user == User(user_id, 'test@example.com', 'hash')
+    assert not hasattr(user, '__dict__')
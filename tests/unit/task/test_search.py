@@ -0,0 +1,77 @@
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.logic.search_logic import search_tasks, autocomplete_tasks, task_name_key, MAX_SEARCH_LIMIT
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+
+EMAIL = 'test@example.com'
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    names = ['Buy milk', 'Buy bread and milk', 'Call the bank', 'Bank transfer', 'buying list']
+    manager.bulk_insert(db_name=None, collection_name='tasks', documents=[
+        {'name': name, 'name_key': task_name_key(name), 'priority': 'low', 'user_email': EMAIL} for name in names
+    ] + [{'name': 'Buy milk', 'name_key': 'buy milk', 'priority': 'low', 'user_email': 'other@example.com'}])
+    with patch('app.logic.search_logic.database_manager', manager):
+        yield manager
+
+# Test de la clave normalizada del nombre
+def test_task_name_key():
+    assert task_name_key('  Buy   MILK ') == 'buy milk'
+
+# Test de búsqueda por palabras completas, limitada al usuario y ordenada por relevancia
+def test_search_tasks(manager):
+    results = search_tasks(EMAIL, 'milk')
+
+    assert [task.name for task, _ in results] == ['Buy milk', 'Buy bread and milk']
+    assert results[0][1] > results[1][1]
+    assert [task.name for task, _ in search_tasks(EMAIL, 'bank')] == ['Bank transfer', 'Call the bank']
+    assert search_tasks(EMAIL, 'mil') == []
+
+# Test de que el índice de texto sigue a las actualizaciones y eliminaciones
+def test_search_follows_writes(manager):
+    task = search_tasks(EMAIL, 'bread')[0][0]
+
+    manager.update(db_name=None, collection_name='tasks', query={'_id': task.id}, update_data={'name': 'Buy eggs'})
+    assert search_tasks(EMAIL, 'bread') == []
+    assert [found.name for found, _ in search_tasks(EMAIL, 'eggs')] == ['Buy eggs']
+
+    manager.delete('tasks', {'_id': task.id})
+    assert search_tasks(EMAIL, 'eggs') == []
+
+# Test de autocompletado por prefijo, sin distinguir mayúsculas y en orden alfabético
+def test_autocomplete_tasks(manager):
+    assert [task.name for task in autocomplete_tasks(EMAIL, 'BUY')] == ['Buy bread and milk', 'Buy milk', 'buying list']
+    assert [task.name for task in autocomplete_tasks(EMAIL, 'buy ', limit=1)] == ['Buy bread and milk']
+    assert autocomplete_tasks(EMAIL, 'zzz') == []
+
+# Test de parámetros inválidos
+@pytest.mark.parametrize('function, text, limit', [
+    (search_tasks, ' ', 10), (autocomplete_tasks, '', 10), (search_tasks, 'milk', 0), (autocomplete_tasks, 'b', 'x'),
+])
+def test_invalid_parameters(manager, function, text, limit):
+    with pytest.raises(ValueError):
+        function(EMAIL, text, limit)
+
+# Test de las rutas
+def test_search_routes(manager):
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    client = app.test_client()
+
+    assert client.get('/tasks/search?q=milk').status_code == 401
+    with client.session_transaction() as session:
+        session['user_email'] = EMAIL
+
+    response = client.get('/tasks/search?q=milk&limit=1')
+    assert response.status_code == 200
+    assert [task['name'] for task in response.get_json()['tasks']] == ['Buy milk']
+    assert 'score' in response.get_json()['tasks'][0]
+    response = client.get(f'/tasks/autocomplete?prefix=ca&limit={MAX_SEARCH_LIMIT + 1}')
+    assert [task['name'] for task in response.get_json()['tasks']] == ['Call the bank']
+    assert client.get('/tasks/search').status_code == 400
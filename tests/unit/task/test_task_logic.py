@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import MagicMock, patch
 from bson import ObjectId
 from app.logic.task_logic import add_task_logic, get_task_by_name, update_task
+from app.logic.records import Task
 
 
 @pytest.fixture
@@ -25,25 +26,36 @@ def mock_task_data():
 # Test for adding a task
 @patch('app.logic.task_logic.database_manager')
 def test_add_task_logic(mock_db, mock_user_data):
-    # Mock user query result
-    mock_cursor = MagicMock()
-    mock_cursor.__iter__.return_value = iter([mock_user_data])
-    mock_db.select.return_value = mock_cursor
+    # Mock user lookup
+    mock_db.select.return_value = [{"_id": mock_user_data["_id"]}]
 
     # Mock insert operation
     mock_db.insert.return_value = ObjectId()
 
-    # Mock update operation
-    mock_db.update.return_value = 1
-
     # Call the function
     result = add_task_logic(mock_user_data["email"], "Test Task", "High")
 
     # Assertions
     assert result is not None
-    mock_db.select.assert_called_once_with(db_name=None, collection_name='users', query={'email': mock_user_data["email"]})
+    kwargs = mock_db.find_and_modify.call_args.kwargs
+    task_data = mock_db.insert.call_args.kwargs['data']
+    assert kwargs['query'] == {'_id': mock_user_data["_id"]}
+    assert kwargs['update'] == {'$inc': {'tasks_version': 1}}
+    assert mock_db.select.call_args.kwargs['query'] == {'email': mock_user_data["email"]}
+    assert task_data['user_id'] == mock_user_data["_id"]
     mock_db.insert.assert_called_once()
-    mock_db.update.assert_called_once()
+    mock_db.update.assert_not_called()
+
+# Test for an insert failure: nothing to roll back and the ETag version is not bumped
+@patch('app.logic.task_logic.database_manager')
+def test_add_task_logic_insert_failure(mock_db, mock_user_data):
+    mock_db.select.return_value = [{"_id": mock_user_data["_id"]}]
+    mock_db.insert.side_effect = RuntimeError("insert failed")
+
+    with pytest.raises(RuntimeError):
+        add_task_logic(mock_user_data["email"], "Test Task", "High")
+
+    mock_db.find_and_modify.assert_not_called()
 
 # Test for getting a task by name
 @patch('app.logic.task_logic.database_manager')
@@ -57,9 +69,11 @@ def test_get_task_by_name(mock_db, mock_user_data, mock_task_data):
     result = get_task_by_name(mock_user_data["email"], "Test Task")
 
     # Assertions
-    assert result == mock_task_data
-    mock_db.select.assert_any_call(db_name=None, collection_name='users', query={'email': mock_user_data["email"]})
-    mock_db.select.assert_any_call(db_name=None, collection_name='tasks', query={'name': "Test Task", 'user_id': mock_user_data["_id"]})
+    assert result == Task.from_document(mock_task_data)
+    mock_db.select.assert_any_call(db_name=None, collection_name='users', query={'email': mock_user_data["email"]},
+                                   projection={'_id': 1})
+    mock_db.select.assert_any_call(db_name=None, collection_name='tasks', query={'name': "Test Task", 'user_id': mock_user_data["_id"]},
+                                   projection=Task.FIELDS)
 
 # Test for updating a task
 @patch('app.logic.task_logic.database_manager')
@@ -76,7 +90,7 @@ def test_update_task(mock_db, mock_task_data):
         db_name=None,
         collection_name='tasks',
         query={'_id': mock_task_data["_id"]},
-        update_data={'name': "Updated Task", 'priority': "Medium"}
+        update_data={'name': "Updated Task", 'name_key': "updated task", 'priority': "Medium", 'priority_rank': 1}
     )
 
 # Test for update task with no changes
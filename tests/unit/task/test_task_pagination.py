@@ -0,0 +1,89 @@
+import pytest
+from unittest.mock import patch
+from bson import ObjectId
+from app import create_app
+from app.logic.task_logic import get_tasks_page, MAX_PAGE_SIZE
+from app.logic.records import Task
+
+
+def make_tasks(count):
+    return [{'_id': ObjectId(), 'name': f'Task {i}', 'priority': 'high'} for i in range(count)]
+
+# Test para una página intermedia: se pide un documento extra y se devuelve el cursor
+@patch('app.logic.task_logic.database_manager')
+def test_get_tasks_page_has_next(mock_db):
+    tasks = make_tasks(3)
+    mock_db.select.return_value = iter(tasks)
+
+    result, next_after = get_tasks_page('test@example.com', limit=2)
+
+    assert result == [Task.from_document(task) for task in tasks[:2]]
+    assert next_after == str(tasks[1]['_id'])
+    mock_db.select.assert_called_once_with(
+        db_name=None,
+        collection_name='tasks',
+        query={'user_email': 'test@example.com'},
+        projection=Task.LIST_FIELDS,
+        limit=3,
+        after=None
+    )
+
+# Test para la última página
+@patch('app.logic.task_logic.database_manager')
+def test_get_tasks_page_last_page(mock_db):
+    tasks = make_tasks(2)
+    mock_db.select.return_value = iter(tasks)
+    after = ObjectId()
+
+    result, next_after = get_tasks_page(limit=2, after=str(after))
+
+    assert result == [Task.from_document(task) for task in tasks]
+    assert next_after is None
+    assert mock_db.select.call_args.kwargs['query'] == {}
+    assert mock_db.select.call_args.kwargs['after'] == after
+
+# Test para el límite máximo de página
+@patch('app.logic.task_logic.database_manager')
+def test_get_tasks_page_caps_limit(mock_db):
+    mock_db.select.return_value = iter([])
+
+    get_tasks_page(limit=MAX_PAGE_SIZE * 10)
+
+    assert mock_db.select.call_args.kwargs['limit'] == MAX_PAGE_SIZE + 1
+
+# Test para parámetros inválidos
+@pytest.mark.parametrize('limit, after', [(0, None), ('abc', None), (10, 'not-an-id')])
+@patch('app.logic.task_logic.database_manager')
+def test_get_tasks_page_invalid_params(mock_db, limit, after):
+    with pytest.raises(ValueError):
+        get_tasks_page(limit=limit, after=after)
+    mock_db.select.assert_not_called()
+
+@pytest.fixture
+def client():
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    return app.test_client()
+
+# Test de que el listado paginado exige sesión
+@patch('app.logic.task_logic.database_manager')
+def test_list_tasks_requires_session(mock_db, client):
+    response = client.get('/tasks?limit=2')
+
+    assert response.status_code == 401
+    mock_db.select.assert_not_called()
+
+# Test de que el enlace a la página siguiente conserva el tamaño de página
+@patch('app.logic.task_logic.database_manager')
+@patch('app.logic.etag_logic.database_manager')
+def test_home_next_page_keeps_limit(mock_users_db, mock_tasks_db, client):
+    mock_users_db.select.return_value = [{'_id': ObjectId(), 'tasks_version': 1}]
+    mock_tasks_db.select.return_value = [{**task, 'priority_rank': 0} for task in make_tasks(3)]
+    with client.session_transaction() as session:
+        session['user_email'] = 'test@example.com'
+
+    response = client.get('/home?limit=2')
+
+    assert response.status_code == 200
+    assert b'limit=2' in response.data
@@ -1,6 +1,7 @@
 import pytest
 from app.logic.users_logic import login_user_logic
 from unittest.mock import MagicMock, patch
+from bson import ObjectId
 
 @pytest.fixture
 def mock_user_data():
@@ -23,9 +24,11 @@ def test_login_user_valid_credentials(mock_db, mock_user_data):
     mock_db.select.return_value = mock_cursor
     
     # Mock the password check to return True
-    with patch('app.logic.users_logic.check_password_hash', return_value=True):
+    with patch('app.logic.users_logic.verify_password', return_value=True), \
+            patch('app.logic.users_logic.needs_rehash', return_value=False):
         result = login_user_logic(mock_user_data["email"], mock_user_data["password"])
         assert result is True
+    mock_db.update.assert_not_called()
 
 # Test for invalid credentials
 @patch('app.logic.users_logic.database_manager')
@@ -52,4 +55,44 @@ def test_login_user_without_password(mock_db, mock_user_data):
     mock_db.select.return_value = mock_cursor
     
     result = login_user_logic(mock_user_data["email"], mock_user_data["password"])
-    assert result is False
\ No newline at end of file
+    assert result is False
+
+# Test for rehashing an outdated password hash on login
+@patch('app.logic.users_logic.database_manager')
+def test_login_user_rehashes_outdated_hash(mock_db, mock_user_data):
+    user_id = ObjectId()
+    mock_cursor = MagicMock()
+    mock_cursor.__iter__.return_value = iter([{
+        "_id": user_id,
+        "email": mock_user_data["email"],
+        "password": "pbkdf2:sha256:1000$salt$hash"
+    }])
+    mock_db.select.return_value = mock_cursor
+
+    with patch('app.logic.users_logic.verify_password', return_value=True), \
+            patch('app.logic.users_logic.hash_password', return_value="new_hash"):
+        result = login_user_logic(mock_user_data["email"], mock_user_data["password"])
+
+    assert result is True
+    mock_db.update.assert_called_once_with(
+        db_name=None,
+        collection_name='users',
+        query={'_id': user_id},
+        update_data={'password': "new_hash"}
+    )
+
+# Test for a wrong password: no rehash
+@patch('app.logic.users_logic.database_manager')
+def test_login_user_wrong_password(mock_db, mock_user_data):
+    mock_cursor = MagicMock()
+    mock_cursor.__iter__.return_value = iter([{
+        "email": mock_user_data["email"],
+        "password": "pbkdf2:sha256:1000$salt$hash"
+    }])
+    mock_db.select.return_value = mock_cursor
+
+    with patch('app.logic.users_logic.verify_password', return_value=False):
+        result = login_user_logic(mock_user_data["email"], "wrongpassword")
+
+    assert result is False
+    mock_db.update.assert_not_called()
@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from unittest.mock import patch
+import pytest
+from authlib.jose import JsonWebKey, jwt
+from app import create_app
+from app.oidc import OIDCClient, OIDCError, CachedDocument, create_http_session
+
+CLIENT_ID = 'test-client'
+CLIENT_SECRET = 'test-secret'
+EMAIL = 'test@example.com'
+
+
+class Provider:
+    """
+    Proveedor OIDC local: descubrimiento, JWKS y endpoint de tokens que firma ID
+    tokens con una clave RSA propia. Cuenta peticiones y conexiones.
+    """
+
+    def __init__(self):
+        self.key = JsonWebKey.generate_key('RSA', 2048, is_private=True, options={'kid': 'key-1'})
+        self.requests = []
+        self.connections = 0
+        self.codes = {}
+        self.overrides = {}
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                provider.connections += 1
+                super().setup()
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                provider.requests.append(('GET', self.path))
+                if self.path == '/.well-known/openid-configuration':
+                    self.reply(200, provider.metadata())
+                elif self.path == '/.well-known/jwks.json':
+                    self.reply(200, {'keys': [provider.key.as_dict(is_private=False)]})
+                else:
+                    self.reply(404, {'error': 'not_found'})
+
+            def do_POST(self):
+                provider.requests.append(('POST', self.path))
+                form = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+                nonce = provider.codes.pop(form.get('code', [''])[0], None)
+                if self.path != '/oauth/token' or nonce is None or form['client_secret'] != [CLIENT_SECRET]:
+                    self.reply(403, {'error': 'invalid_grant'})
+                    return
+                self.reply(200, {'access_token': 'access', 'token_type': 'Bearer',
+                                 'id_token': provider.id_token(nonce=nonce)})
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.issuer = f'http://127.0.0.1:{self.server.server_port}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def metadata(self):
+        return {'issuer': self.issuer, 'authorization_endpoint': self.issuer + 'authorize',
+                'token_endpoint': self.issuer + 'oauth/token', 'jwks_uri': self.issuer + '.well-known/jwks.json',
+                **self.overrides}
+
+    def id_token(self, key=None, **overrides):
+        now = int(time.time())
+        claims = {'iss': self.issuer, 'sub': 'auth0|1', 'aud': CLIENT_ID, 'iat': now, 'exp': now + 300,
+                  'email': EMAIL, 'name': 'Test User', **overrides}
+        key = key or self.key
+        return jwt.encode({'alg': 'RS256', 'kid': key.kid}, claims, key).decode()
+
+
+@pytest.fixture(scope='module')
+def provider():
+    provider = Provider()
+    yield provider
+    provider.server.shutdown()
+
+@pytest.fixture
+def client(provider, tmp_path):
+    provider.requests.clear()
+    return OIDCClient(provider.issuer, CLIENT_ID, CLIENT_SECRET, cache_dir=str(tmp_path))
+
+# Test de la caché del descubrimiento y del JWKS, en memoria y en disco
+def test_metadata_and_jwks_are_cached(provider, client, tmp_path):
+    for _ in range(3):
+        client.verify_id_token(provider.id_token(nonce='n'), 'n')
+    assert provider.requests == [('GET', '/.well-known/openid-configuration'), ('GET', '/.well-known/jwks.json')]
+
+    # Otro proceso (o un reinicio) con la misma carpeta no vuelve a descargarlos
+    restarted = OIDCClient(provider.issuer, CLIENT_ID, CLIENT_SECRET, cache_dir=str(tmp_path))
+    restarted.verify_id_token(provider.id_token(nonce='n'), 'n')
+    assert len(provider.requests) == 2
+
+# Test de que la caché en disco ignora ficheros que otros usuarios pueden escribir
+def test_disk_cache_rejects_writable_files(provider, client, tmp_path):
+    client.verify_id_token(provider.id_token(nonce='n'), 'n')
+    assert oct(os.stat(tmp_path).st_mode & 0o777) == '0o700'
+    for name in os.listdir(tmp_path):
+        os.chmod(tmp_path / name, 0o666)
+
+    restarted = OIDCClient(provider.issuer, CLIENT_ID, CLIENT_SECRET, cache_dir=str(tmp_path))
+    restarted.verify_id_token(provider.id_token(nonce='n'), 'n')
+    assert len(provider.requests) == 4
+
+# Test de que un descubrimiento con endpoints fuera del emisor se rechaza sin enviar el secreto
+@pytest.mark.parametrize('overrides', [
+    {'token_endpoint': 'http://127.0.0.1:1/oauth/token'},
+    {'jwks_uri': 'https://evil.example.com/jwks.json'},
+    {'issuer': 'https://evil.example.com/'},
+])
+def test_discovery_endpoints_must_match_issuer(provider, tmp_path, overrides):
+    provider.requests.clear()
+    provider.overrides = overrides
+    try:
+        client = OIDCClient(provider.issuer, CLIENT_ID, CLIENT_SECRET)
+        with pytest.raises(OIDCError):
+            client.exchange_code('code', 'http://localhost/auth/callback')
+        with pytest.raises(OIDCError):
+            client.verify_id_token(provider.id_token(nonce='n'), 'n')
+    finally:
+        provider.overrides = {}
+    assert provider.requests == [('GET', '/.well-known/openid-configuration')]
+
+# Test de la renovación en segundo plano: se sirve la copia anterior mientras se descarga
+def test_background_refresh(provider):
+    provider.requests.clear()
+    document = CachedDocument(create_http_session(), provider.issuer + '.well-known/openid-configuration',
+                              ttl=60, refresh_after=0)
+    assert document.get()['issuer'] == provider.issuer
+    assert document.get()['issuer'] == provider.issuer
+    document.wait_for_refresh(5)
+    assert document.fetches == 2
+
+# Test de la verificación local del ID token
+@pytest.mark.parametrize('overrides, nonce', [
+    ({'nonce': 'n', 'aud': 'other-client'}, 'n'),
+    ({'nonce': 'n', 'iss': 'https://evil.example.com/'}, 'n'),
+    ({'nonce': 'n', 'exp': int(time.time()) - 3600}, 'n'),
+    ({'nonce': 'other'}, 'n'),
+    ({}, 'n'),
+])
+def test_invalid_id_tokens_are_rejected(provider, client, overrides, nonce):
+    with pytest.raises(OIDCError):
+        client.verify_id_token(provider.id_token(**overrides), nonce)
+
+# Test de que un token firmado con una clave desconocida no se acepta
+def test_foreign_key_is_rejected(provider, client):
+    foreign = JsonWebKey.generate_key('RSA', 2048, is_private=True, options={'kid': 'key-1'})
+    with pytest.raises(OIDCError):
+        client.verify_id_token(provider.id_token(key=foreign, nonce='n'), 'n')
+
+# Test de la rotación de claves: un `kid` nuevo provoca una sola descarga del JWKS
+def test_key_rotation_refreshes_jwks(provider, client):
+    client.verify_id_token(provider.id_token(nonce='n'), 'n')
+    old_key = provider.key
+    provider.key = JsonWebKey.generate_key('RSA', 2048, is_private=True, options={'kid': 'key-2'})
+    try:
+        assert client.verify_id_token(provider.id_token(nonce='n'), 'n')['email'] == EMAIL
+    finally:
+        provider.key = old_key
+    assert provider.requests.count(('GET', '/.well-known/jwks.json')) == 2
+
+# Test del inicio de sesión completo contra el proveedor local: sin /userinfo y con
+# una sola conexión HTTP reutilizada
+def test_login_flow(provider, tmp_path):
+    provider.requests.clear()
+    connections = provider.connections
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False), \
+            patch('config.Config.AUTH0_ISSUER', provider.issuer), \
+            patch('config.Config.AUTH0_CLIENT_ID', CLIENT_ID), \
+            patch('config.Config.AUTH0_CLIENT_SECRET', CLIENT_SECRET), \
+            patch('config.Config.OIDC_CACHE_DIR', str(tmp_path)), \
+            patch('app.routes.user.register_user_logic') as register, \
+            patch('app.routes.user.record_login_logic') as record_login:
+        app = create_app()
+        app.config['SECRET_KEY'] = 'test'
+        browser = app.test_client()
+
+        for _ in range(2):
+            response = browser.get('/login')
+            location = urlparse(response.headers['Location'])
+            params = {key: values[0] for key, values in parse_qs(location.query).items()}
+            assert location.path == '/authorize' and params['client_id'] == CLIENT_ID
+            # /login descarga el JWKS en segundo plano
+            deadline = time.time() + 5
+            while not app.extensions['oidc'].jwks.cached and time.time() < deadline:
+                time.sleep(0.01)
+
+            # El proveedor redirige de vuelta con un código ligado al nonce
+            provider.codes['code-1'] = params['nonce']
+            response = browser.get(f"/auth/callback?code=code-1&state={params['state']}")
+            assert response.headers['Location'].endswith('/home')
+            with browser.session_transaction() as session:
+                assert session['user_email'] == EMAIL
+                assert session['user'] == {'sub': 'auth0|1', 'email': EMAIL, 'name': 'Test User'}
+
+        # Un callback con un state que no corresponde no inicia sesión
+        browser.get('/logout')
+        provider.codes['code-2'] = 'x'
+        response = browser.get('/auth/callback?code=code-2&state=forged')
+        with browser.session_transaction() as session:
+            assert 'user_email' not in session
+
+    assert register.call_count == 2
+    assert record_login.call_count == 2
+    assert ('GET', '/userinfo') not in provider.requests
+    assert provider.requests.count(('POST', '/oauth/token')) == 2
+    assert provider.requests.count(('GET', '/.well-known/jwks.json')) == 1
+    assert provider.connections - connections == 1
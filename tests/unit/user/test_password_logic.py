@@ -0,0 +1,44 @@
+import pytest
+from unittest.mock import patch
+from werkzeug.security import check_password_hash, generate_password_hash
+from app.logic import password_logic
+from app.logic.password_logic import hash_password, verify_password, needs_rehash
+
+FAST_METHOD = 'pbkdf2:sha256:1000'
+
+# Test de hash y verificación a través del pool de procesos
+def test_hash_and_verify_in_process_pool():
+    hashed = hash_password('password123', method=FAST_METHOD)
+
+    assert hashed.startswith(FAST_METHOD + '$')
+    assert check_password_hash(hashed, 'password123')
+    assert verify_password(hashed, 'password123') is True
+    assert verify_password(hashed, 'wrong') is False
+
+# Test de ejecución en el hilo actual cuando el pool está desactivado
+def test_hash_inline_when_pool_disabled():
+    with patch.object(password_logic, 'PASSWORD_HASH_WORKERS', 0), \
+            patch.object(password_logic, '_get_pool') as get_pool:
+        hashed = hash_password('password123', method=FAST_METHOD)
+
+    get_pool.assert_not_called()
+    assert check_password_hash(hashed, 'password123')
+
+@pytest.mark.parametrize('stored_hash, expected', [
+    ('scrypt:32768:8:1$salt$hash', False),
+    ('pbkdf2:sha256:1000$salt$hash', True),
+    ('scrypt:16384:8:1$salt$hash', True)
+])
+def test_needs_rehash(stored_hash, expected):
+    assert needs_rehash(stored_hash, method='scrypt:32768:8:1') is expected
+
+# Test de que los nombres cortos del método ('pbkdf2', 'scrypt') no provocan un rehash
+# en cada inicio de sesión: werkzeug guarda en el hash todos sus parámetros
+@pytest.mark.parametrize('method, other', [
+    ('pbkdf2', 'pbkdf2:sha256:1000'),
+    ('pbkdf2:sha256', 'pbkdf2:sha512'),
+    ('scrypt', 'scrypt:16384:8:1'),
+])
+def test_needs_rehash_with_short_method_names(method, other):
+    assert needs_rehash(generate_password_hash('x', method), method) is False
+    assert needs_rehash(generate_password_hash('x', other), method) is True
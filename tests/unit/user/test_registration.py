@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import pytest
+from app import create_app
+from app.logic.users_logic import register_user_logic
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+from database.request_stats import begin_request_stats, end_request_stats
+
+EMAIL = 'test@example.com'
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    with patch('app.logic.users_logic.database_manager', manager):
+        yield manager
+
+def users(manager):
+    return list(manager.select(db_name=None, collection_name='users', query={}))
+
+# Test de que registrar es un único viaje a la base de datos, exista o no el usuario
+def test_register_is_one_round_trip(manager):
+    for expected in (True, False):
+        stats, token = begin_request_stats()
+        try:
+            assert register_user_logic(EMAIL) is expected
+        finally:
+            end_request_stats(token)
+        assert stats.operations == {'upsert:users': 1}
+    assert [user['email'] for user in users(manager)] == [EMAIL]
+
+# Test de que un registro repetido no sobrescribe la contraseña existente
+def test_register_keeps_existing_password(manager):
+    with patch('app.logic.users_logic.hash_password', side_effect=['hash-1', 'hash-2']):
+        assert register_user_logic(EMAIL, 'secret') is True
+        assert register_user_logic(EMAIL, 'other') is False
+    assert users(manager)[0]['password'] == 'hash-1'
+
+# Test de que los primeros inicios de sesión simultáneos crean un solo usuario
+def test_concurrent_first_logins(manager):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        created = list(pool.map(lambda _: register_user_logic(EMAIL), range(32)))
+    assert created.count(True) == 1
+    assert len(users(manager)) == 1
+
+# Test de que /register informa de un email ya registrado en lugar de dar el alta por buena
+def test_register_route_rejects_existing_email(manager):
+    with patch('config.Config.ENSURE_INDEXES_ON_STARTUP', False):
+        app = create_app()
+    app.config['SECRET_KEY'] = 'test'
+    client = app.test_client()
+    form = {'email': EMAIL, 'password': 'secret'}
+
+    with patch('app.logic.users_logic.hash_password', return_value='hash'):
+        first = client.post('/register', data=form)
+        second = client.post('/register', data=form)
+
+    assert first.headers['Location'].endswith('/')
+    assert second.headers['Location'].endswith('/register')
+    with client.session_transaction() as session:
+        assert session['_flashes'][-1] == ('error', 'Ya existe un usuario registrado con ese email.')
+    assert len(users(manager)) == 1
@@ -0,0 +1,152 @@
+from datetime import timedelta
+from unittest.mock import patch
+import pytest
+from flask import Flask, session
+from app.sessions import (ServerSideSessionInterface, DatabaseSessionStore, MemorySessionStore, CachedSessionStore,
+                          SESSIONS_COLLECTION, _now, regenerate_session)
+from database.backends.sqlite_backend import SqliteBackend
+from database.database_manager import DatabaseManager
+
+LIFETIME = 3600
+USERINFO = {'email': 'test@example.com', 'name': 'Test User', 'picture': 'https://example.com/' + 'x' * 500}
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = DatabaseManager(backend=SqliteBackend(str(tmp_path / 'todo.sqlite3')))
+    manager.ensure_indexes()
+    return manager
+
+def make_app(store):
+    app = Flask(__name__)
+    app.session_interface = ServerSideSessionInterface(store, lifetime=LIFETIME)
+
+    @app.route('/visit')
+    def visit():
+        session['visited'] = True
+        return 'ok'
+
+    @app.route('/login')
+    def login():
+        regenerate_session(session)
+        session['user_email'] = USERINFO['email']
+        session['user'] = USERINFO
+        return 'ok'
+
+    @app.route('/me')
+    def me():
+        return session.get('user_email', '-')
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        regenerate_session(session)
+        return 'ok'
+
+    return app
+
+def stored_sessions(manager):
+    return list(manager.select(db_name=None, collection_name=SESSIONS_COLLECTION, query={}))
+
+def session_cookie(response):
+    return response.headers['Set-Cookie'].split(';')[0].split('=', 1)[1]
+
+# Test de que la cookie solo lleva el identificador y los datos quedan en el servidor
+def test_cookie_carries_only_session_id(manager):
+    client = make_app(DatabaseSessionStore(manager)).test_client()
+
+    response = client.get('/login')
+    cookie = session_cookie(response)
+    assert len(cookie) < 64
+    assert 'test@example.com' not in response.headers['Set-Cookie']
+    assert [document['_id'] for document in stored_sessions(manager)] == [cookie]
+    assert stored_sessions(manager)[0]['data']['user'] == USERINFO
+    assert client.get('/me').get_data(as_text=True) == 'test@example.com'
+
+# Test de la fijación de sesión: iniciar sesión cambia el identificador y anula el anterior
+def test_login_regenerates_session_id(manager):
+    app = make_app(DatabaseSessionStore(manager))
+    client = app.test_client()
+    fixed_sid = session_cookie(client.get('/visit'))
+
+    login_sid = session_cookie(client.get('/login'))
+    assert login_sid != fixed_sid
+    assert [document['_id'] for document in stored_sessions(manager)] == [login_sid]
+    assert stored_sessions(manager)[0]['data']['visited'] is True
+
+    # Quien conocía el identificador anterior no obtiene la sesión autenticada
+    attacker = app.test_client()
+    attacker.set_cookie('session', fixed_sid)
+    assert attacker.get('/me').get_data(as_text=True) == '-'
+
+    client.get('/logout')
+    assert stored_sessions(manager) == []
+
+# Test de que una sesión sin cambios no se reescribe y una vacía no se guarda
+def test_unchanged_session_is_not_written(manager):
+    client = make_app(DatabaseSessionStore(manager)).test_client()
+    assert client.get('/me').get_data(as_text=True) == '-'
+    assert stored_sessions(manager) == []
+
+    client.get('/login')
+    with patch.object(manager, 'update', wraps=manager.update) as update:
+        client.get('/me')
+        update.assert_not_called()
+
+# Test de que cerrar la sesión la borra del almacén y del navegador
+def test_logout_deletes_session(manager):
+    client = make_app(DatabaseSessionStore(manager)).test_client()
+    client.get('/login')
+
+    response = client.get('/logout')
+    assert 'Expires=Thu, 01 Jan 1970' in response.headers['Set-Cookie']
+    assert stored_sessions(manager) == []
+    assert client.get('/me').get_data(as_text=True) == '-'
+
+# Test de la caché de lectura: las peticiones seguidas no vuelven a leer la sesión
+def test_cached_store_reads_through(manager):
+    store = CachedSessionStore(DatabaseSessionStore(manager), ttl=60)
+    client = make_app(store).test_client()
+    client.get('/login')
+
+    with patch.object(manager, 'select', wraps=manager.select) as select:
+        for _ in range(3):
+            assert client.get('/me').get_data(as_text=True) == 'test@example.com'
+        select.assert_not_called()
+    assert store.hits == 3
+
+    client.get('/logout')
+    assert client.get('/me').get_data(as_text=True) == '-'
+
+# Test de la expiración en bloque: sesiones caducadas y todas las de un usuario
+@pytest.mark.parametrize('make_store', [
+    lambda manager: DatabaseSessionStore(manager),
+    lambda manager: CachedSessionStore(DatabaseSessionStore(manager)),
+    lambda manager: MemorySessionStore(),
+])
+def test_bulk_expiry(manager, make_store):
+    store = make_store(manager)
+    now = _now()
+    for i in range(5):
+        store.save(f'old-{i}', {'user_email': 'a@example.com'}, now - timedelta(seconds=1), new=True)
+    store.save('current-a', {'user_email': 'a@example.com'}, now + timedelta(hours=1), new=True)
+    store.save('current-b', {'user_email': 'b@example.com'}, now + timedelta(hours=1), new=True)
+
+    assert store.expire() == 5
+    assert store.load('old-0') is None
+    assert store.load('current-a')[0] == {'user_email': 'a@example.com'}
+    assert store.expire(user_email='a@example.com') == 1
+    assert store.load('current-a') is None
+    assert store.load('current-b') is not None
+
+# Test de la expulsión LRU del almacén en memoria
+def test_memory_store_evicts_least_recently_used():
+    store = MemorySessionStore(max_size=2)
+    expires_at = _now() + timedelta(hours=1)
+    store.save('a', {'n': 1}, expires_at)
+    store.save('b', {'n': 2}, expires_at)
+    store.load('a')
+    store.save('c', {'n': 3}, expires_at)
+
+    assert store.load('b') is None
+    assert store.load('a') is not None and store.load('c') is not None